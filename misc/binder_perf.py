@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Measure the speed of type checking code that narrows many variables.
+
+Generates a function with a few hundred isinstance branches on
+variables with union types, nested a few levels deep and inside loops,
+type checks it several times and reports the best time.  This mostly
+exercises the conditional type binder (mypy.binder).
+
+Usage:
+
+  python3 misc/binder_perf.py [--branches N] [--variables N] [--depth N] [--trials N]
+
+Run it at two revisions to compare them.
+"""
+
+from typing import List
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mypy import build
+from mypy.build import BuildSource
+from mypy.options import Options
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+builtins_fixture = os.path.join(root_dir, 'test-data', 'unit', 'fixtures', 'isinstance.pyi')
+
+CLASSES = 8
+
+
+def generate_program(branches: int, variables: int, depth: int) -> str:
+    lines = ['from typing import Union']
+    for i in range(CLASSES):
+        lines.append('class A{}:'.format(i))
+        lines.append('    def m{}(self) -> int: pass'.format(i))
+    union = 'Union[{}]'.format(', '.join('A{}'.format(i) for i in range(CLASSES)))
+    args = ', '.join('v{}: {}'.format(i, union) for i in range(variables))
+    lines.append('def f(n: int, {}) -> int:'.format(args))
+    for i in range(branches):
+        if i % 50 == 0:
+            lines.append('    while n:')
+        # Each branch narrows a chain of 'depth' variables and uses them.
+        indent = '        '
+        for j in range(depth):
+            var = 'v{}'.format((i + j) % variables)
+            cls = (i + j * 3) % CLASSES
+            lines.append('{}if isinstance({}, A{}):'.format(indent, var, cls))
+            lines.append('{}    n = n + {}.m{}()'.format(indent, var, cls))
+            indent += '    '
+        lines.append('{}{} = A{}()'.format(indent, 'v{}'.format(i % variables), i % CLASSES))
+        if i % 7 == 0:
+            lines.append('{}break'.format(indent))
+    lines.append('    return n')
+    return '\n'.join(lines) + '\n'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--branches', type=int, default=200, metavar='N',
+                        help="number of top-level branches (default 200)")
+    parser.add_argument('--variables', type=int, default=40, metavar='N',
+                        help="number of narrowed variables (default 40)")
+    parser.add_argument('--depth', type=int, default=12, metavar='N',
+                        help="nesting depth of each branch (default 12)")
+    parser.add_argument('--trials', type=int, default=5, metavar='N',
+                        help="number of builds (default 5)")
+    args = parser.parse_args()
+
+    program = generate_program(args.branches, args.variables, args.depth)
+    options = Options()
+    options.use_builtins_fixtures = True
+
+    # The default builtins stubs don't define isinstance().
+    lib_dir = tempfile.mkdtemp()
+    try:
+        shutil.copy(builtins_fixture, os.path.join(lib_dir, 'builtins.pyi'))
+        times = []  # type: List[float]
+        for i in range(args.trials):
+            start = time.time()
+            result = build.build([BuildSource('main', '__main__', program)], options,
+                                 alt_lib_path=lib_dir)
+            times.append(time.time() - start)
+            assert not result.errors, result.errors
+    finally:
+        shutil.rmtree(lib_dir)
+
+    print('Best of {}: {:.3f} s'.format(args.trials, min(times)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Measure the speed of type checking code that does many joins.
+
+Generates a program with a deep class hierarchy and functions that
+pick between instances of its leaf classes in long chains of
+conditional expressions, type checks it several times and reports the
+best time and the hit rates of the type operation caches (see
+mypy.typeintern).
+
+Usage:
+
+  python3 misc/join_perf.py [--depth N] [--leaves N] [--functions N] [--trials N]
+
+Run it at two revisions to compare them.
+"""
+
+from typing import List
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mypy import build
+from mypy.build import BuildSource
+from mypy.options import Options
+from mypy.typeintern import type_cache_stats
+
+
+def generate_program(depth: int, leaves: int, functions: int) -> str:
+    lines = ['class C0: pass']
+    for i in range(1, depth):
+        lines.append('class C{}(C{}): pass'.format(i, i - 1))
+    for i in range(leaves):
+        lines.append('class L{}(C{}): pass'.format(i, depth - 1))
+    for i in range(functions):
+        lines.append('def f{}(n: int) -> C0:'.format(i))
+        # x = L0() if n else L1() if n else ... L<leaves - 1>()
+        choices = ' if n else '.join('L{}()'.format(j) for j in range(leaves))
+        lines.append('    x = {}'.format(choices))
+        lines.append('    y = x if n else C{}()'.format(i % depth))
+        lines.append('    return y')
+    return '\n'.join(lines) + '\n'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--depth', type=int, default=15, metavar='N',
+                        help="depth of the class hierarchy (default 15)")
+    parser.add_argument('--leaves', type=int, default=20, metavar='N',
+                        help="number of leaf classes (default 20)")
+    parser.add_argument('--functions', type=int, default=300, metavar='N',
+                        help="number of functions (default 300)")
+    parser.add_argument('--trials', type=int, default=5, metavar='N',
+                        help="number of builds (default 5)")
+    args = parser.parse_args()
+
+    program = generate_program(args.depth, args.leaves, args.functions)
+    options = Options()
+    options.use_builtins_fixtures = True
+
+    times = []  # type: List[float]
+    for i in range(args.trials):
+        start = time.time()
+        result = build.build([BuildSource('main', '__main__', program)], options)
+        times.append(time.time() - start)
+        assert not result.errors, result.errors
+
+    print('Best of {}: {:.3f} s'.format(args.trials, min(times)))
+    for line in type_cache_stats():
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
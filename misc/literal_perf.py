@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Measure the speed of type checking large collection literals.
+
+Generates a module with list and dict literals of constants
+(like the lookup tables found in generated code), type checks it several
+times and reports the best time.
+
+Usage:
+
+  python3 misc/literal_perf.py [--size N] [--trials N]
+
+Run it at two revisions to compare them.
+"""
+
+from typing import List
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mypy import build
+from mypy.build import BuildSource
+from mypy.options import Options
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+builtins_fixture = os.path.join(root_dir, 'test-data', 'unit', 'fixtures', 'dict.pyi')
+
+
+def generate_program(size: int) -> str:
+    lines = []  # type: List[str]
+    lines.append('a = [{}]'.format(', '.join('{}'.format(i) for i in range(size))))
+    lines.append('b = [{}]'.format(', '.join("'s{}'".format(i) for i in range(size))))
+    lines.append('c = {{{}}}'.format(', '.join("{}: ('s{}', {})".format(i, i, i)
+                                              for i in range(size))))
+    return '\n'.join(lines) + '\n'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=10000, metavar='N',
+                        help="number of items in each literal (default 10000)")
+    parser.add_argument('--trials', type=int, default=3, metavar='N',
+                        help="number of builds (default 3)")
+    args = parser.parse_args()
+
+    program = generate_program(args.size)
+    options = Options()
+    options.use_builtins_fixtures = True
+
+    # The default builtins stubs don't define list or dict.
+    lib_dir = tempfile.mkdtemp()
+    try:
+        shutil.copy(builtins_fixture, os.path.join(lib_dir, 'builtins.pyi'))
+        times = []  # type: List[float]
+        for i in range(args.trials):
+            start = time.time()
+            result = build.build([BuildSource('main', '__main__', program)], options,
+                                 alt_lib_path=lib_dir)
+            times.append(time.time() - start)
+            assert not result.errors, result.errors
+    finally:
+        shutil.rmtree(lib_dir)
+
+    print('Best of {}: {:.3f} s'.format(args.trials, min(times)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Measure the memory used by parse trees.
+
+Parses every .py file under the given directories (by default the mypy
+package itself and test-data/stdlib-samples), keeping all the trees
+alive, and reports the number of node objects, the memory they use
+(including their __dict__, if any) and the peak RSS of the process.
+Use --copies to parse the sources several times to simulate a larger
+program.
+
+Usage:
+
+  python3 misc/node_memory.py [--fast-parser] [--copies N] [DIR ...]
+
+Run it at two revisions to compare them.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+import argparse
+import gc
+import os
+import resource
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mypy.errors import Errors
+from mypy.nodes import Node, MypyFile
+from mypy.options import Options
+from mypy.parse import parse
+
+
+DEFAULT_DIRS = ['mypy', os.path.join('test-data', 'stdlib-samples')]
+
+
+def find_sources(dirs: List[str]) -> List[Tuple[str, str]]:
+    """Return (path, source) for all Python files in dirs."""
+    sources = []
+    for dir in dirs:
+        for dirpath, dirnames, filenames in os.walk(dir):
+            for filename in sorted(filenames):
+                if filename.endswith('.py'):
+                    path = os.path.join(dirpath, filename)
+                    with open(path, encoding='utf-8') as f:
+                        sources.append((path, f.read()))
+    return sources
+
+
+def node_sizes() -> Dict[str, Tuple[int, int]]:
+    """Return map from node class name to (number of instances, total size in bytes)."""
+    stats = {}  # type: Dict[str, Tuple[int, int]]
+    for obj in gc.get_objects():
+        if isinstance(obj, Node):
+            size = sys.getsizeof(obj)
+            if hasattr(obj, '__dict__'):
+                size += sys.getsizeof(obj.__dict__)
+            name = type(obj).__name__
+            count, total = stats.get(name, (0, 0))
+            stats[name] = (count + 1, total + size)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--fast-parser', action='store_true',
+                        help="use the typed_ast based parser")
+    parser.add_argument('--copies', type=int, default=1, metavar='N',
+                        help="parse each file N times (default 1)")
+    parser.add_argument('--top', type=int, default=10, metavar='N',
+                        help="show the N node classes that use the most memory")
+    parser.add_argument('dirs', nargs='*', default=DEFAULT_DIRS, metavar='DIR')
+    args = parser.parse_args()
+
+    options = Options()
+    options.fast_parser = args.fast_parser
+
+    sources = find_sources(args.dirs)
+    trees = []  # type: List[MypyFile]
+    for i in range(args.copies):
+        for path, source in sources:
+            trees.append(parse(source, path, Errors(), options))
+    gc.collect()
+
+    stats = node_sizes()
+    count = sum(n for n, _ in stats.values())
+    total = sum(size for _, size in stats.values())
+    print('{} files, {} nodes, {:.1f} MB in nodes ({:.0f} bytes/node)'.format(
+        len(trees), count, total / 2**20, total / count))
+    for name, (n, size) in sorted(stats.items(), key=lambda x: -x[1][1])[:args.top]:
+        print('  {:<24} {:>9} {:>8.1f} MB'.format(name, n, size / 2**20))
+    # ru_maxrss is in kilobytes on Linux but in bytes on OS X.
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        maxrss //= 1024
+    print('Peak RSS: {:.1f} MB'.format(maxrss / 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Measure parser throughput on the stdlib samples.
+
+Parses every .py file under test-data/stdlib-samples (or the given
+directories) several times and reports the number of syntax nodes
+converted per second.  The node count is taken from the stdlib 'ast'
+module, so the numbers are comparable between parsers and between
+revisions of mypy.
+
+Usage:
+
+  python3 misc/parse_perf.py [--fast-parser] [--trials N] [DIR ...]
+
+Run it at two revisions to compare them.
+"""
+
+from typing import List, Tuple
+
+import argparse
+import ast
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mypy.errors import Errors
+from mypy.options import Options
+from mypy.parse import parse
+
+
+DEFAULT_DIR = os.path.join('test-data', 'stdlib-samples')
+
+
+def find_sources(dirs: List[str]) -> List[Tuple[str, str]]:
+    """Return (path, source) for all Python files in dirs that can be parsed."""
+    sources = []
+    for dir in dirs:
+        for dirpath, dirnames, filenames in os.walk(dir):
+            for filename in sorted(filenames):
+                if filename.endswith('.py'):
+                    path = os.path.join(dirpath, filename)
+                    with open(path, encoding='utf-8') as f:
+                        sources.append((path, f.read()))
+    return sources
+
+
+def count_nodes(source: str) -> int:
+    return sum(1 for _ in ast.walk(ast.parse(source)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--fast-parser', action='store_true',
+                        help="use the typed_ast based parser")
+    parser.add_argument('--trials', type=int, default=5, metavar='N',
+                        help="number of passes over the sources (default 5)")
+    parser.add_argument('dirs', nargs='*', default=[DEFAULT_DIR], metavar='DIR')
+    args = parser.parse_args()
+
+    options = Options()
+    options.fast_parser = args.fast_parser
+
+    sources = []  # type: List[Tuple[str, str, int]]
+    for path, source in find_sources(args.dirs):
+        try:
+            sources.append((path, source, count_nodes(source)))
+        except SyntaxError:
+            print('Skipping {} (not valid in this Python version)'.format(path))
+    nodes = sum(count for _, _, count in sources)
+    print('{} files, {} nodes'.format(len(sources), nodes))
+
+    times = []  # type: List[float]
+    for i in range(args.trials):
+        start = time.time()
+        for path, source, _ in sources:
+            parse(source, path, Errors(), options)
+        times.append(time.time() - start)
+
+    best = min(times)
+    print('Best of {}: {:.3f} s ({:.0f} nodes/s)'.format(args.trials, best, nodes / best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Count duplicate type objects after a build.
+
+Runs mypy on a program (taking the same arguments as mypy itself) and
+then looks at all type objects that are still alive, reporting how many
+of them are structurally equal to another live type object, and how
+many types ended up in the intern table (see mypy.typeintern).
+
+Usage:
+
+  python3 misc/type_duplicates.py [mypy options] FILE/DIR ...
+
+For example, 'python3 misc/type_duplicates.py -p mypy'.  Run it at two
+revisions to compare them.
+"""
+
+from typing import Dict, Optional
+
+import gc
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mypy import build
+from mypy.errors import CompileError
+from mypy.main import process_options
+from mypy.types import Type
+from mypy.typeintern import type_key, interned_types
+
+
+def main() -> None:
+    sources, options = process_options(sys.argv[1:])
+    try:
+        result = build.build(sources, options)  # type: Optional[build.BuildResult]
+    except CompileError as e:
+        print('Build failed with {} error lines'.format(len(e.messages)))
+        result = None
+    print('{} types interned'.format(len(interned_types)))
+    gc.collect()
+
+    # Map from type class name to map from type key to number of objects
+    counts = {}  # type: Dict[str, Dict[object, int]]
+    total = 0
+    unkeyed = 0
+    for obj in gc.get_objects():
+        if isinstance(obj, Type):
+            total += 1
+            key = type_key(obj)
+            if key is None:
+                unkeyed += 1
+                continue
+            keys = counts.setdefault(type(obj).__name__, {})
+            keys[key] = keys.get(key, 0) + 1
+    distinct = sum(len(keys) for keys in counts.values())
+    print('{} type objects, {} of them structurally distinct ({} could not be compared)'.format(
+        total, distinct, unkeyed))
+    print('{} duplicate type objects'.format(total - unkeyed - distinct))
+    for name, keys in sorted(counts.items(), key=lambda x: len(x[1]) - sum(x[1].values())):
+        objects = sum(keys.values())
+        print('  {:<16} {:>8} objects {:>8} distinct {:>8} duplicates'.format(
+            name, objects, len(keys), objects - len(keys)))
+    del result
+
+
+if __name__ == '__main__':
+    main()
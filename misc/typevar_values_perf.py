@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Measure the speed of type checking functions with value-restricted type variables.
+
+Each function that uses a type variable with a value restriction (such
+as AnyStr) is checked once for each combination of values.  This type
+checks a program several times (taking the same arguments as mypy
+itself) and reports the best time and the number of times such
+functions were checked.  By default it checks test-data/stdlib-samples/3.2/posixpath.py,
+which uses AnyStr throughout.
+
+Usage:
+
+  python3 misc/typevar_values_perf.py [--trials N] [mypy options] [FILE/DIR ...]
+
+Run it at two revisions to compare them.
+"""
+
+from typing import List
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mypy import build
+from mypy.main import process_options
+from mypy.nodes import FuncDef
+from mypy.traverser import TraverserVisitor
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+default_program = os.path.join(root_dir, 'test-data', 'stdlib-samples', '3.2', 'posixpath.py')
+
+
+class ExpansionCounter(TraverserVisitor):
+    def __init__(self) -> None:
+        self.functions = 0
+        self.checks = 0
+
+    def visit_func_def(self, o: FuncDef) -> None:
+        if len(o.expansions) > 1:
+            self.functions += 1
+            self.checks += len(o.expansions)
+        super().visit_func_def(o)
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    trials = 5
+    if args[:1] == ['--trials']:
+        trials = int(args[1])
+        args = args[2:]
+    if not any(not arg.startswith('-') for arg in args):
+        args.append(default_program)
+    sources, options = process_options(args)
+
+    times = []  # type: List[float]
+    for i in range(trials):
+        start = time.time()
+        result = build.build(sources, options)
+        times.append(time.time() - start)
+
+    counter = ExpansionCounter()
+    for source in sources:
+        result.files[source.module].accept(counter)
+    print('Best of {}: {:.3f} s'.format(trials, min(times)))
+    print('{} functions checked {} times'.format(counter.functions, counter.checks))
+
+
+if __name__ == '__main__':
+    main()
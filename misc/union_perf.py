@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Measure how union simplification scales with the number of items.
+
+Builds unions of instances of N distinct classes that derive from a
+common base class (plus a few subclasses of some of them, which get
+removed) for growing N, and reports the time taken by
+UnionType.make_simplified_union() for each size.  With sub-quadratic
+simplification, the time per item should stay roughly constant.
+
+Usage:
+
+  python3 misc/union_perf.py [--sizes N,N,...] [--trials N]
+
+Run it at two revisions to compare them.
+"""
+
+from typing import List
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mypy.types import Type, Instance, UnionType
+from mypy.typefixture import TypeFixture
+
+
+def make_items(fx: TypeFixture, size: int) -> List[Type]:
+    base = fx.make_type_info('Message')
+    items = []  # type: List[Type]
+    for i in range(size):
+        info = fx.make_type_info('Message{}'.format(i), mro=[base, fx.oi])
+        items.append(Instance(info, []))
+        if i % 10 == 0:
+            sub = fx.make_type_info('SubMessage{}'.format(i), mro=[info, base, fx.oi])
+            items.append(Instance(sub, []))
+    return items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='100,200,400,800,1600',
+                        help="comma-separated union sizes (default 100,200,400,800,1600)")
+    parser.add_argument('--trials', type=int, default=3, metavar='N',
+                        help="number of simplifications per size (default 3)")
+    args = parser.parse_args()
+
+    fx = TypeFixture()
+    for size in [int(n) for n in args.sizes.split(',')]:
+        items = make_items(fx, size)
+        times = []  # type: List[float]
+        for i in range(args.trials):
+            start = time.time()
+            result = UnionType.make_simplified_union(list(items))
+            times.append(time.time() - start)
+        assert isinstance(result, UnionType) and len(result.items) == size
+        best = min(times)
+        print('{:>6} items: {:.4f} s ({:.1f} us/item)'.format(
+            len(items), best, best / len(items) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Strip function bodies from a parse tree, leaving only its interface.
+
+This is used for modules that are only needed for their public
+signatures (see the --interface-only-deps option).  Module top levels,
+class bodies and function signatures (including default argument
+values and decorators) are kept; function bodies are replaced with
+'pass'.
+
+Methods that define instance attributes through assignments to 'self.x'
+keep their bodies, since these assignments are part of the interface of
+the class and their types may need to be inferred.
+"""
+
+from typing import List
+
+from mypy.nodes import (
+    MypyFile, Block, ClassDef, FuncDef, PassStmt, AssignmentStmt,
+    ForStmt, WithStmt, Expression, MemberExpr, NameExpr, TupleExpr, ListExpr, StarExpr
+)
+from mypy.traverser import TraverserVisitor
+
+
+def strip_function_bodies(file: MypyFile) -> None:
+    """Replace the bodies of all functions defined in a module with 'pass'."""
+    file.accept(FunctionBodyStripper())
+    # The index refers to nodes within the removed bodies.
+    file.node_index = None
+
+
+class FunctionBodyStripper(TraverserVisitor):
+    """Visit module and class level definitions and strip function bodies.
+
+    Nested functions and classes disappear together with the body of the
+    enclosing function.
+    """
+
+    def __init__(self) -> None:
+        # Is the innermost enclosing definition a class?
+        self.in_class = [False]
+
+    def visit_class_def(self, o: ClassDef) -> None:
+        self.in_class.append(True)
+        super().visit_class_def(o)
+        self.in_class.pop()
+
+    def visit_func_def(self, o: FuncDef) -> None:
+        if self.in_class[-1] and o.arguments and defines_self_attributes(
+                o.body, o.arguments[0].variable.name()):
+            return
+        body = Block([PassStmt()])
+        body.set_line(o.body)
+        body.body[0].set_line(o.body)
+        o.body = body
+
+
+def defines_self_attributes(body: Block, self_name: str) -> bool:
+    """Does a method body assign to attributes of its first argument?"""
+    finder = SelfAttributeFinder(self_name)
+    body.accept(finder)
+    return finder.found
+
+
+class SelfAttributeFinder(TraverserVisitor):
+    def __init__(self, self_name: str) -> None:
+        self.self_name = self_name
+        self.found = False
+
+    def visit_assignment_stmt(self, o: AssignmentStmt) -> None:
+        self.check_lvalues(o.lvalues)
+
+    def visit_for_stmt(self, o: ForStmt) -> None:
+        self.check_lvalues([o.index])
+        super().visit_for_stmt(o)
+
+    def visit_with_stmt(self, o: WithStmt) -> None:
+        self.check_lvalues([t for t in o.target if t is not None])
+        super().visit_with_stmt(o)
+
+    def check_lvalues(self, lvalues: List[Expression]) -> None:
+        for lvalue in lvalues:
+            if isinstance(lvalue, MemberExpr):
+                if isinstance(lvalue.expr, NameExpr) and lvalue.expr.name == self.self_name:
+                    self.found = True
+            elif isinstance(lvalue, (TupleExpr, ListExpr)):
+                self.check_lvalues(lvalue.items)
+            elif isinstance(lvalue, StarExpr):
+                self.check_lvalues([lvalue.expr])
@@ -1,4 +1,5 @@
 from typing import (Dict, List, Set, Iterator, Union)
+from bisect import bisect_right, insort
 from contextlib import contextmanager
 
 from mypy.types import Type, AnyType, PartialType
@@ -18,7 +19,9 @@ class Frame(Dict[Key, Type]):
 
     This information is not copied into a new Frame when it is pushed
     onto the stack, so a given Frame only has information about types
-    that were assigned in that frame.
+    that were assigned in that frame.  The binder keeps an index of the
+    frames that contain each key, so frames must only be modified
+    through the binder.
     """
 
     def __init__(self) -> None:
@@ -55,6 +58,15 @@ class ConditionalTypeBinder:
         # on top of the stack.
         self.frames = [Frame()]
 
+        # Maps each key to the (increasing) indexes of the frames that
+        # contain it, so that lookups don't need to walk the stack.
+        self.key_frames = {}  # type: Dict[Key, List[int]]
+
+        # For each frame except the top one, whether it or any frame
+        # below it is unreachable.  Only the top frame can become
+        # unreachable, so this is computed when a frame is pushed.
+        self.unreachable_below = []  # type: List[bool]
+
         # For frames higher in the stack, we record the set of
         # Frames that can escape there, either by falling off
         # the end of the frame or by a loop control construct
@@ -88,20 +100,31 @@ class ConditionalTypeBinder:
     def push_frame(self) -> Frame:
         """Push a new frame into the binder."""
         f = Frame()
+        self.unreachable_below.append(self.is_unreachable())
         self.frames.append(f)
         self.options_on_return.append([])
         return f
 
     def _push(self, key: Key, type: Type, index: int=-1) -> None:
-        self.frames[index][key] = type
+        if index < 0:
+            index += len(self.frames)
+        frame = self.frames[index]
+        if key not in frame:
+            insort(self.key_frames.setdefault(key, []), index)
+        frame[key] = type
 
     def _get(self, key: Key, index: int=-1) -> Type:
+        indexes = self.key_frames.get(key)
+        if not indexes:
+            return None
         if index < 0:
             index += len(self.frames)
-        for i in range(index, -1, -1):
-            if key in self.frames[i]:
-                return self.frames[i][key]
-        return None
+        if indexes[-1] <= index:
+            return self.frames[indexes[-1]][key]
+        i = bisect_right(indexes, index)
+        if i == 0:
+            return None
+        return self.frames[indexes[i - 1]][key]
 
     def push(self, node: Node, typ: Type) -> None:
         if not node.literal:
@@ -119,9 +142,8 @@ class ConditionalTypeBinder:
         return self._get(expr.literal_hash)
 
     def is_unreachable(self) -> bool:
-        # TODO: Copy the value of unreachable into new frames to avoid
-        # this traversal on every statement?
-        return any(f.unreachable for f in self.frames)
+        return self.frames[-1].unreachable or bool(self.unreachable_below and
+                                                   self.unreachable_below[-1])
 
     def cleanse(self, expr: Expression) -> None:
         """Remove all references to a Node from the binder."""
@@ -129,9 +151,8 @@ class ConditionalTypeBinder:
 
     def _cleanse_key(self, key: Key) -> None:
         """Remove all references to a key from the binder."""
-        for frame in self.frames:
-            if key in frame:
-                del frame[key]
+        for i in self.key_frames.pop(key, []):
+            del self.frames[i][key]
 
     def update_from_options(self, frames: List[Frame]) -> bool:
         """Update the frame to reflect that each key will be updated
@@ -153,6 +174,9 @@ class ConditionalTypeBinder:
                 # (current_value must be None), and we still don't
                 # know anything about key in at least one possible frame.
                 continue
+            if all(x is current_value for x in resulting_values):
+                # Only the frames that changed key need to be merged.
+                continue
 
             if isinstance(self.declarations.get(key), AnyType):
                 type = resulting_values[0]
@@ -161,8 +185,9 @@ class ConditionalTypeBinder:
             else:
                 type = resulting_values[0]
                 for other in resulting_values[1:]:
-                    type = join_simple(self.declarations[key], type, other)
-            if not is_same_type(type, current_value):
+                    if other is not type:
+                        type = join_simple(self.declarations[key], type, other)
+            if type is not current_value and not is_same_type(type, current_value):
                 self._push(key, type)
                 changed = True
 
@@ -180,6 +205,12 @@ class ConditionalTypeBinder:
             self.allow_jump(-fall_through)
 
         result = self.frames.pop()
+        self.unreachable_below.pop()
+        for key in result:
+            indexes = self.key_frames[key]
+            indexes.pop()
+            if not indexes:
+                del self.key_frames[key]
         options = self.options_on_return.pop()
 
         if can_skip:
@@ -250,10 +281,10 @@ class ConditionalTypeBinder:
         if isinstance(type, AnyType):
             return self.get_declaration(expr)
         key = expr.literal_hash
-        enclosers = ([self.get_declaration(expr)] +
-                     [f[key] for f in self.frames
-                      if key in f and is_subtype(type, f[key])])
-        return enclosers[-1]
+        for i in reversed(self.key_frames.get(key, [])):
+            if is_subtype(type, self.frames[i][key]):
+                return self.frames[i][key]
+        return self.get_declaration(expr)
 
     def allow_jump(self, index: int) -> None:
         # self.frames and self.options_on_return have different lengths
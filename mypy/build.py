@@ -20,10 +20,11 @@ import sys
 import time
 from os.path import dirname, basename
 
-from typing import (AbstractSet, Dict, Iterable, Iterator, List,
+from typing import (Any, AbstractSet, Dict, Iterable, Iterator, List,
                     NamedTuple, Optional, Set, Tuple, Union)
 
-from mypy.nodes import (MypyFile, Import, ImportFrom, ImportAll)
+from mypy.nodes import (MypyFile, Import, ImportFrom, ImportAll, SymbolTableNode)
+from mypy.aststrip import strip_function_bodies
 from mypy.semanal import FirstPass, SemanticAnalyzer, ThirdPass
 from mypy.checker import TypeChecker
 from mypy.indirection import TypeIndirectionVisitor
@@ -35,8 +36,9 @@ from mypy.fixup import fixup_module_pass_one, fixup_module_pass_two
 from mypy.nodes import Expression
 from mypy.options import Options
 from mypy.parse import parse
-from mypy.stats import dump_type_stats
+from mypy.stats import dump_type_stats, print_type_stats
 from mypy.types import Type
+from mypy.typeintern import reset_interned_types, reset_type_cache_stats, type_cache_stats
 from mypy.version import __version__
 
 
@@ -93,11 +95,14 @@ class BuildSourceSet:
                 self.source_modules.add(source.module)
 
     def is_source(self, file: MypyFile) -> bool:
-        if file.path and file.path in self.source_paths:
+        return self.is_source_module(file._fullname, file.path)
+
+    def is_source_module(self, id: str, path: Optional[str]) -> bool:
+        if path and path in self.source_paths:
             return True
-        elif file._fullname in self.source_modules:
+        elif id in self.source_modules:
             return True
-        elif file.path is None and self.source_text_present:
+        elif path is None and self.source_text_present:
             return True
         else:
             return False
@@ -127,6 +132,8 @@ def build(sources: List[BuildSource],
     data_dir = default_data_dir(bin_dir)
 
     find_module_clear_caches()
+    reset_interned_types()
+    reset_type_cache_stats()
 
     # Determine the default module search path.
     lib_path = default_lib_path(data_dir,
@@ -161,7 +168,8 @@ def build(sources: List[BuildSource],
     if alt_lib_path:
         lib_path.insert(0, alt_lib_path)
 
-    reports = Reports(data_dir, options.report_dirs)
+    reports = Reports(data_dir, options.report_dirs, options.validate_xml_reports,
+                      options.report_jobs)
 
     source_set = BuildSourceSet(sources)
 
@@ -185,6 +193,9 @@ def build(sources: List[BuildSource],
                      len(manager.modules),
                      len(manager.all_types),
                      manager.errors.num_messages()))
+        for line in type_cache_stats():
+            manager.log(line)
+        manager.log(manager.semantic_analyzer.format_lookup_stats())
         # Finish the HTML or XML reports even if CompileError was raised.
         reports.finish()
 
@@ -295,6 +306,9 @@ CacheMeta = NamedTuple('CacheMeta',
                         ('dep_prios', List[int]),
                         ('interface_hash', str),  # hash representing the public interface
                         ('version_id', str),  # mypy version for cache invalidation
+                        ('interface_only', bool),  # function bodies were not analyzed
+                        ('report_keys', List[str]),  # keys of the cached report data
+                        ('report_json', str),  # path of <id>.report.json
                         ])
 # NOTE: dependencies + suppressed == all reachable imports;
 # suppressed contains those reachable imports that were prevented by
@@ -357,6 +371,9 @@ class BuildManager:
         self.semantic_analyzer_pass3 = ThirdPass(self.modules, self.errors)
         self.all_types = {}  # type: Dict[Expression, Type]
         self.indirection_detector = TypeIndirectionVisitor()
+        # Targets of cross-references in modules loaded from the cache, by
+        # full name (see fixup_module_pass_one)
+        self.cross_ref_index = {}  # type: Dict[str, SymbolTableNode]
         self.missing_modules = set()  # type: Set[str]
         self.stale_modules = set()  # type: Set[str]
         self.rechecked_modules = set()  # type: Set[str]
@@ -467,9 +484,12 @@ class BuildManager:
                                'or using the "--silent-imports" flag would help)',
                                severity='note', only_once=True)
 
-    def report_file(self, file: MypyFile, type_map: Dict[Expression, Type]) -> None:
+    def report_file(self, file: MypyFile,
+                    type_map: Dict[Expression, Type]) -> Optional[Dict[str, Any]]:
+        """Report on a file if it is a build source, and return the data collected about it."""
         if self.source_set.is_source(file):
-            self.reports.file(file, type_map)
+            return self.reports.file(file, type_map)
+        return None
 
     def log(self, *message: str) -> None:
         if self.options.verbosity >= 1:
@@ -707,6 +727,11 @@ def get_cache_names(id: str, path: str, cache_dir: str,
     return (prefix + '.meta.json', prefix + '.data.json')
 
 
+def get_report_cache_name(meta_json: str) -> str:
+    """Return the file name for the cached report data, given that of the meta JSON."""
+    return meta_json[:-len('.meta.json')] + '.report.json'
+
+
 def find_cache_meta(id: str, path: str, manager: BuildManager) -> Optional[CacheMeta]:
     """Find cache data for a module.
 
@@ -748,6 +773,9 @@ def find_cache_meta(id: str, path: str, manager: BuildManager) -> Optional[Cache
         meta.get('dep_prios', []),
         meta.get('interface_hash', ''),
         meta.get('version_id'),
+        meta.get('interface_only', False),
+        meta.get('report_keys', []),
+        get_report_cache_name(meta_json),
     )
     if (m.id != id or m.path != path or
             m.mtime is None or m.size is None or
@@ -806,7 +834,9 @@ def compute_hash(text: str) -> str:
 def write_cache(id: str, path: str, tree: MypyFile,
                 dependencies: List[str], suppressed: List[str],
                 child_modules: List[str], dep_prios: List[int],
-                old_interface_hash: str, manager: BuildManager) -> str:
+                old_interface_hash: str, interface_only: bool,
+                report_data: Optional[Dict[str, Any]],
+                manager: BuildManager) -> str:
     """Write cache files for a module.
 
     Args:
@@ -817,6 +847,8 @@ def write_cache(id: str, path: str, tree: MypyFile,
       suppressed: module IDs which were suppressed as dependencies
       dep_prios: priorities (parallel array to dependencies)
       old_interface_hash: the hash from the previous version of the data cache file
+      interface_only: whether function bodies were skipped (--interface-only-deps)
+      report_data: the data collected for the reports, if the module was reported on
       manager: the build manager (for pyversion, log/trace)
 
     Return:
@@ -838,6 +870,8 @@ def write_cache(id: str, path: str, tree: MypyFile,
     nonce = '.' + random_string()
     data_json_tmp = data_json + nonce
     meta_json_tmp = meta_json + nonce
+    report_json = get_report_cache_name(meta_json)
+    report_json_tmp = report_json + nonce
 
     # Serialize data and analyze interface
     data = tree.serialize()
@@ -861,6 +895,12 @@ def write_cache(id: str, path: str, tree: MypyFile,
         os.replace(data_json_tmp, data_json)
         manager.trace("Interface for {} has changed".format(id))
 
+    # Write the report data, so the module can be reported on when it is fresh
+    if report_data is not None:
+        with open(report_json_tmp, 'w') as f:
+            json.dump(report_data, f)
+        os.replace(report_json_tmp, report_json)
+
     # Obtain and set up metadata
     st = manager.get_stat(path)  # TODO: Handle errors
     mtime = st.st_mtime
@@ -878,6 +918,8 @@ def write_cache(id: str, path: str, tree: MypyFile,
             'dep_prios': dep_prios,
             'interface_hash': interface_hash,
             'version_id': manager.version_id,
+            'interface_only': interface_only,
+            'report_keys': sorted(report_data) if report_data is not None else [],
             }
 
     # Write meta cache file
@@ -1084,6 +1126,13 @@ class State:
     # Options, specialized for this file
     options = None  # type: Options
 
+    # If True, only the interface of this module is analyzed (function
+    # bodies are skipped), since it's not a build source
+    interface_only = False
+
+    # The data collected for the reports, if the module was reported on
+    report_data = None  # type: Optional[Dict[str, Any]]
+
     def __init__(self,
                  id: Optional[str],
                  path: Optional[str],
@@ -1106,6 +1155,8 @@ class State:
             self.import_context = []
         self.id = id or '__main__'
         self.options = manager.options.clone_for_file(path or '')
+        self.interface_only = (self.options.interface_only_deps and
+                               (caller_state is not None or ancestor_for is not None))
         if not path and source is None:
             file_id = id
             if id == 'builtins' and self.options.python_version[0] == 2:
@@ -1162,6 +1213,17 @@ class State:
         if path and source is None and self.options.incremental:
             self.meta = find_cache_meta(self.id, self.path, manager)
             # TODO: Get mtime if not cached.
+            if self.meta is not None and self.meta.interface_only and not self.interface_only:
+                # The cached module was only partially analyzed, but now it is
+                # a build source and must be checked in full.
+                manager.log('Metadata abandoned for {}: cache is interface only'.format(self.id))
+                self.meta = None
+            if (self.meta is not None
+                    and not self.report_data_keys() <= set(self.meta.report_keys)):
+                # The module is reported on, but the cache has no data for
+                # (some of) the reports or statistics.
+                manager.log('Metadata abandoned for {}: report data is missing'.format(self.id))
+                self.meta = None
             if self.meta is not None:
                 self.interface_hash = self.meta.interface_hash
         self.add_ancestors()
@@ -1279,8 +1341,45 @@ class State:
         self.tree = MypyFile.deserialize(data)
         self.manager.modules[self.id] = self.tree
 
+    def report_data_keys(self) -> Set[str]:
+        """Return the keys of the report data needed for this module."""
+        keys = set()  # type: Set[str]
+        if (self.manager.reports.reporters
+                and self.manager.source_set.is_source_module(self.id, self.path)):
+            keys.update(self.manager.reports.data_keys())
+        if self.options.dump_type_stats:
+            keys.add('type_stats')
+        if self.options.dump_inference_stats:
+            keys.add('inference_stats')
+        return keys
+
+    def add_report_data(self, data: Dict[str, Any]) -> None:
+        if self.report_data is None:
+            self.report_data = {}
+        self.report_data.update(data)
+
+    def report_cached(self) -> None:
+        """Report on the module using the report data in the cache.
+
+        This prints the cached statistics and adds the module to the reports.
+        """
+        reported = (self.manager.reports.reporters
+                    and self.manager.source_set.is_source_module(self.id, self.path))
+        keys = self.report_data_keys()
+        if not reported and not keys:
+            return
+        data = {}  # type: Dict[str, Any]
+        if self.meta.report_keys:
+            with open(self.meta.report_json) as f:
+                data = json.load(f)
+        for key in 'type_stats', 'inference_stats':
+            if key in keys:
+                print_type_stats(data[key])
+        if reported:
+            self.manager.reports.add_file(self.xpath, self.id, data)
+
     def fix_cross_refs(self) -> None:
-        fixup_module_pass_one(self.tree, self.manager.modules)
+        fixup_module_pass_one(self.tree, self.manager.modules, self.manager.cross_ref_index)
 
     def calculate_mros(self) -> None:
         fixup_module_pass_two(self.tree, self.manager.modules)
@@ -1344,6 +1443,8 @@ class State:
                     raise CompileError([
                         "mypy: can't decode file '{}': {}".format(self.path, str(decodeerr))])
             self.tree = manager.parse_file(self.id, self.xpath, source)
+            if self.interface_only and not self.tree.is_stub:
+                strip_function_bodies(self.tree)
 
         modules[self.id] = self.tree
 
@@ -1411,7 +1512,7 @@ class State:
         with self.wrap_context():
             self.manager.semantic_analyzer_pass3.visit_file(self.tree, self.xpath, self.options)
             if self.options.dump_type_stats:
-                dump_type_stats(self.tree, self.xpath)
+                self.add_report_data({'type_stats': dump_type_stats(self.tree, self.xpath)})
 
     def type_check_first_pass(self) -> None:
         manager = self.manager
@@ -1440,9 +1541,12 @@ class State:
                                                   self.type_checker.type_map)
 
             if self.options.dump_inference_stats:
-                dump_type_stats(self.tree, self.xpath, inferred=True,
-                                typemap=self.type_checker.type_map)
-            manager.report_file(self.tree, self.type_checker.type_map)
+                lines = dump_type_stats(self.tree, self.xpath, inferred=True,
+                                        typemap=self.type_checker.type_map)
+                self.add_report_data({'inference_stats': lines})
+            report_data = manager.report_file(self.tree, self.type_checker.type_map)
+            if report_data is not None:
+                self.add_report_data(report_data)
 
     def _patch_indirect_dependencies(self,
                                      module_refs: Set[str],
@@ -1478,8 +1582,8 @@ class State:
             new_interface_hash = write_cache(
                 self.id, self.path, self.tree,
                 list(self.dependencies), list(self.suppressed), list(self.child_modules),
-                dep_prios, self.interface_hash,
-                self.manager)
+                dep_prios, self.interface_hash, self.interface_only,
+                self.report_data, self.manager)
             if new_interface_hash == self.interface_hash:
                 self.manager.log("Cached module {} has same interface".format(self.id))
             else:
@@ -1493,9 +1597,27 @@ def dispatch(sources: List[BuildSource], manager: BuildManager) -> None:
     graph = load_graph(sources, manager)
     manager.log("Loaded graph with %d nodes" % len(graph))
     process_graph(graph, manager)
+    report_fresh_modules(graph, manager)
     if manager.options.warn_unused_ignores:
         # TODO: This could also be a per-file option.
-        manager.errors.generate_unused_ignore_notes()
+        # Ignore comments in skipped function bodies are never used, so don't
+        # report any for modules that were only partially analyzed.
+        manager.errors.generate_unused_ignore_notes(
+            {st.xpath for st in graph.values() if st.interface_only})
+
+
+def report_fresh_modules(graph: Graph, manager: BuildManager) -> None:
+    """Report on the modules that weren't rechecked, using their cached report data.
+
+    The statistics of fresh modules are printed after those of the rechecked
+    modules.
+    """
+    if (not manager.reports.reporters and not manager.options.dump_type_stats
+            and not manager.options.dump_inference_stats):
+        return
+    for id, state in graph.items():
+        if id not in manager.rechecked_modules and state.meta is not None:
+            state.report_cached()
 
 
 def load_graph(sources: List[BuildSource], manager: BuildManager) -> Graph:
@@ -23,7 +23,7 @@ from mypy.nodes import (
     YieldFromExpr, NamedTupleExpr, TypedDictExpr, SetComprehension,
     DictionaryComprehension, ComplexExpr, EllipsisExpr, TypeAliasExpr,
     RefExpr, YieldExpr, BackquoteExpr, ImportFrom, ImportAll, ImportBase,
-    AwaitExpr,
+    AwaitExpr, ExecStmt, Node,
     CONTRAVARIANT, COVARIANT
 )
 from mypy.nodes import function_type, method_type, method_type_with_fallback
@@ -35,6 +35,7 @@ from mypy.types import (
     true_only, false_only
 )
 from mypy.sametypes import is_same_type
+from mypy.typeintern import intern_type, intern_copy
 from mypy.messages import MessageBuilder
 import mypy.checkexpr
 from mypy.checkmember import map_type_from_supertype
@@ -49,7 +50,7 @@ from mypy.erasetype import erase_typevars
 from mypy.expandtype import expand_type
 from mypy.visitor import NodeVisitor
 from mypy.join import join_types
-from mypy.treetransform import TransformVisitor
+from mypy.traverser import TraverserVisitor
 from mypy.meet import meet_simple, is_overlapping_types
 from mypy.binder import ConditionalTypeBinder
 from mypy.options import Options
@@ -101,6 +102,9 @@ class TypeChecker(NodeVisitor[Type]):
     dynamic_funcs = None  # type: List[bool]
     # Stack of functions being type checked
     function_stack = None  # type: List[FuncItem]
+    # Stack of functions being type checked once for each combination of values
+    # of type variables with value restrictions
+    expanded_funcs = None  # type: List[FuncItem]
     # Stack of collections of variables with partial types
     partial_types = None  # type: List[Dict[Var, Context]]
     globals = None  # type: SymbolTable
@@ -115,6 +119,9 @@ class TypeChecker(NodeVisitor[Type]):
     current_node_deferred = False
     # Is this file a typeshed stub?
     is_typeshed_stub = False
+    # Map from signature of a method in a base class to the signature without
+    # self (see base_method_type)
+    base_method_types = None  # type: Dict[FunctionLike, FunctionLike]
     # Should strict Optional-related errors be suppressed in this file?
     suppress_none_errors = False  # TODO: Get it from options instead
     options = None  # type: Options
@@ -142,9 +149,11 @@ class TypeChecker(NodeVisitor[Type]):
         self.type_context = []
         self.dynamic_funcs = []
         self.function_stack = []
+        self.expanded_funcs = []
         self.partial_types = []
         self.deferred_nodes = []
         self.type_map = {}
+        self.base_method_types = {}
         self.module_refs = set()
         self.pass_num = 0
         self.current_node_deferred = False
@@ -212,8 +221,13 @@ class TypeChecker(NodeVisitor[Type]):
 
     def handle_cannot_determine_type(self, name: str, context: Context) -> None:
         if self.pass_num < LAST_PASS and self.function_stack:
-            # Don't report an error yet. Just defer.
-            node = self.function_stack[-1]
+            # Don't report an error yet. Just defer.  Functions checked for
+            # each combination of type variable values are deferred as a
+            # whole, since the nodes within them depend on the combination.
+            if self.expanded_funcs:
+                node = self.expanded_funcs[0]
+            else:
+                node = self.function_stack[-1]
             if self.errors.type_name:
                 type_name = self.errors.type_name[-1]
             else:
@@ -285,14 +299,24 @@ class TypeChecker(NodeVisitor[Type]):
         self.check_overlapping_overloads(defn)
 
     def check_overlapping_overloads(self, defn: OverloadedFuncDef) -> None:
-        for i, item in enumerate(defn.items):
-            for j, item2 in enumerate(defn.items[i + 1:]):
-                # TODO overloads involving decorators
-                sig1 = self.function_type(item.func)
-                sig2 = self.function_type(item2.func)
-                if is_unsafe_overlapping_signatures(sig1, sig2):
-                    self.msg.overloaded_signatures_overlap(i + 1, i + j + 2,
-                                                           item.func)
+        # TODO overloads involving decorators
+        sigs = [self.function_type(item.func) for item in defn.items]
+        # Signatures can only overlap if their argument counts overlap, so
+        # visit them ordered by the minimum argument count and only compare
+        # each signature with those that can take as few arguments as it.
+        arg_counts = [(sig.min_args, len(sig.arg_types)) if isinstance(sig, CallableType)
+                      else (0, 0) for sig in sigs]
+        order = sorted(range(len(sigs)), key=lambda i: arg_counts[i][0])
+        overlapping = []  # type: List[Tuple[int, int]]
+        for a, i in enumerate(order):
+            for j in order[a + 1:]:
+                if arg_counts[j][0] > arg_counts[i][1]:
+                    break
+                first, second = min(i, j), max(i, j)
+                if is_unsafe_overlapping_signatures(sigs[first], sigs[second]):
+                    overlapping.append((first, second))
+        for i, j in sorted(overlapping):
+            self.msg.overloaded_signatures_overlap(i + 1, j + 1, defn.items[i].func)
 
     # Here's the scoop about generators and coroutines.
     #
@@ -521,127 +545,153 @@ class TypeChecker(NodeVisitor[Type]):
     def check_func_def(self, defn: FuncItem, typ: CallableType, name: str) -> None:
         """Type check a function definition."""
         # Expand type variables with value restrictions to ordinary types.
-        for item, typ in self.expand_typevars(defn, typ):
-            old_binder = self.binder
-            self.binder = ConditionalTypeBinder()
-            with self.binder.top_frame_context():
-                defn.expanded.append(item)
-
-                # We may be checking a function definition or an anonymous
-                # function. In the first case, set up another reference with the
-                # precise type.
-                if isinstance(item, FuncDef):
-                    fdef = item
-                else:
-                    fdef = None
-
-                if fdef:
-                    # Check if __init__ has an invalid, non-None return type.
-                    if (fdef.info and fdef.name() == '__init__' and
-                            not isinstance(typ.ret_type, (Void, NoneTyp)) and
-                            not self.dynamic_funcs[-1]):
-                        self.fail(messages.INIT_MUST_HAVE_NONE_RETURN_TYPE,
-                                  item.type)
-
-                    show_untyped = not self.is_typeshed_stub or self.options.warn_incomplete_stub
-                    if self.options.disallow_untyped_defs and show_untyped:
-                        # Check for functions with unspecified/not fully specified types.
-                        def is_implicit_any(t: Type) -> bool:
-                            return isinstance(t, AnyType) and t.implicit
-
-                        if fdef.type is None:
-                            self.fail(messages.FUNCTION_TYPE_EXPECTED, fdef)
-                        elif isinstance(fdef.type, CallableType):
-                            if is_implicit_any(fdef.type.ret_type):
-                                self.fail(messages.RETURN_TYPE_EXPECTED, fdef)
-                            if any(is_implicit_any(t) for t in fdef.type.arg_types):
-                                self.fail(messages.ARGUMENT_TYPE_EXPECTED, fdef)
-
-                if name in nodes.reverse_op_method_set:
-                    self.check_reverse_op_method(item, typ, name)
-                elif name == '__getattr__':
-                    self.check_getattr_method(typ, defn)
-
-                # Refuse contravariant return type variable
-                if isinstance(typ.ret_type, TypeVarType):
-                    if typ.ret_type.variance == CONTRAVARIANT:
-                        self.fail(messages.RETURN_TYPE_CANNOT_BE_CONTRAVARIANT,
-                             typ.ret_type)
-
-                # Check that Generator functions have the appropriate return type.
-                if defn.is_generator:
-                    if not self.is_generator_return_type(typ.ret_type, defn.is_coroutine):
-                        self.fail(messages.INVALID_RETURN_TYPE_FOR_GENERATOR, typ)
-
-                    # Python 2 generators aren't allowed to return values.
-                    if (self.options.python_version[0] == 2 and
-                            isinstance(typ.ret_type, Instance) and
-                            typ.ret_type.type.fullname() == 'typing.Generator'):
-                        if not isinstance(typ.ret_type.args[2], (Void, NoneTyp, AnyType)):
-                            self.fail(messages.INVALID_GENERATOR_RETURN_ITEM_TYPE, typ)
-
-                # Fix the type if decorated with `@types.coroutine` or `@asyncio.coroutine`.
-                if defn.is_awaitable_coroutine:
-                    # Update the return type to AwaitableGenerator.
-                    # (This doesn't exist in typing.py, only in typing.pyi.)
-                    t = typ.ret_type
-                    c = defn.is_coroutine
-                    ty = self.get_generator_yield_type(t, c)
-                    tc = self.get_generator_receive_type(t, c)
-                    tr = self.get_generator_return_type(t, c)
-                    ret_type = self.named_generic_type('typing.AwaitableGenerator',
-                                                       [ty, tc, tr, t])
-                    typ = typ.copy_modified(ret_type=ret_type)
-                    defn.type = typ
-
-                # Push return type.
-                self.return_types.append(typ.ret_type)
-
-                # Store argument types.
-                for i in range(len(typ.arg_types)):
-                    arg_type = typ.arg_types[i]
-
-                    # Refuse covariant parameter type variables
-                    if isinstance(arg_type, TypeVarType):
-                        if arg_type.variance == COVARIANT:
-                            self.fail(messages.FUNCTION_PARAMETER_CANNOT_BE_COVARIANT,
-                                      arg_type)
-
-                    if typ.arg_kinds[i] == nodes.ARG_STAR:
-                        # builtins.tuple[T] is typing.Tuple[T, ...]
-                        arg_type = self.named_generic_type('builtins.tuple',
-                                                           [arg_type])
-                    elif typ.arg_kinds[i] == nodes.ARG_STAR2:
-                        arg_type = self.named_generic_type('builtins.dict',
-                                                           [self.str_type(),
-                                                            arg_type])
-                    item.arguments[i].variable.type = arg_type
-
-                # Type check initialization expressions.
-                for arg in item.arguments:
-                    init = arg.initialization_statement
-                    if init:
-                        self.accept(init)
-
-            # Type check body in a new scope.
-            with self.binder.top_frame_context():
-                self.accept(item.body)
-                unreachable = self.binder.is_unreachable()
-
-            if (self.options.warn_no_return and not unreachable
-                    and not isinstance(self.return_types[-1], (Void, AnyType))
-                    and not defn.is_generator):
-                # Control flow fell off the end of a function that was
-                # declared to return a non-None type.
-                # Allow functions that are entirely pass/Ellipsis.
-                if self.is_trivial_body(defn.body):
-                    pass
-                else:
-                    self.msg.note(messages.MISSING_RETURN_STATEMENT, defn)
+        expansions = self.expand_typevars(defn, typ)
+        if not expansions[0][0]:
+            # There are no type variables with value restrictions.
+            self.check_func_body(defn, typ, name)
+            return
+
+        # Check the same body once for each combination of values.  The type
+        # checker stores some results on the nodes themselves, so these are
+        # reset for each combination and restored afterwards, and the types
+        # of expressions are recorded separately for each combination.
+        state = ExpandedFuncState(defn)
+        type_map = self.type_map
+        defn.expansions = []
+        self.expanded_funcs.append(defn)
+        for mapping, expanded in expansions:
+            state.expand(mapping)
+            self.type_map = {}
+            self.enter_partial_types()
+            self.check_func_body(defn, expanded, name)
+            self.leave_partial_types()
+            defn.expansions.append((mapping, self.type_map))
+        self.expanded_funcs.pop()
+        self.type_map = type_map
+        state.restore()
+        for _, types in defn.expansions:
+            self.type_map.update(types)
+
+    def check_func_body(self, defn: FuncItem, typ: CallableType, name: str) -> None:
+        """Type check a function definition with the given signature."""
+        old_binder = self.binder
+        self.binder = ConditionalTypeBinder()
+        with self.binder.top_frame_context():
+            # We may be checking a function definition or an anonymous
+            # function. In the first case, set up another reference with the
+            # precise type.
+            if isinstance(defn, FuncDef):
+                fdef = defn
+            else:
+                fdef = None
+
+            if fdef:
+                # Check if __init__ has an invalid, non-None return type.
+                if (fdef.info and fdef.name() == '__init__' and
+                        not isinstance(typ.ret_type, (Void, NoneTyp)) and
+                        not self.dynamic_funcs[-1]):
+                    self.fail(messages.INIT_MUST_HAVE_NONE_RETURN_TYPE,
+                              defn.type)
+
+                show_untyped = not self.is_typeshed_stub or self.options.warn_incomplete_stub
+                if self.options.disallow_untyped_defs and show_untyped:
+                    # Check for functions with unspecified/not fully specified types.
+                    def is_implicit_any(t: Type) -> bool:
+                        return isinstance(t, AnyType) and t.implicit
+
+                    if fdef.type is None:
+                        self.fail(messages.FUNCTION_TYPE_EXPECTED, fdef)
+                    elif isinstance(fdef.type, CallableType):
+                        if is_implicit_any(fdef.type.ret_type):
+                            self.fail(messages.RETURN_TYPE_EXPECTED, fdef)
+                        if any(is_implicit_any(t) for t in fdef.type.arg_types):
+                            self.fail(messages.ARGUMENT_TYPE_EXPECTED, fdef)
+
+            if name in nodes.reverse_op_method_set:
+                self.check_reverse_op_method(defn, typ, name)
+            elif name == '__getattr__':
+                self.check_getattr_method(typ, defn)
+
+            # Refuse contravariant return type variable
+            if isinstance(typ.ret_type, TypeVarType):
+                if typ.ret_type.variance == CONTRAVARIANT:
+                    self.fail(messages.RETURN_TYPE_CANNOT_BE_CONTRAVARIANT,
+                         typ.ret_type)
+
+            # Check that Generator functions have the appropriate return type.
+            if defn.is_generator:
+                if not self.is_generator_return_type(typ.ret_type, defn.is_coroutine):
+                    self.fail(messages.INVALID_RETURN_TYPE_FOR_GENERATOR, typ)
+
+                # Python 2 generators aren't allowed to return values.
+                if (self.options.python_version[0] == 2 and
+                        isinstance(typ.ret_type, Instance) and
+                        typ.ret_type.type.fullname() == 'typing.Generator'):
+                    if not isinstance(typ.ret_type.args[2], (Void, NoneTyp, AnyType)):
+                        self.fail(messages.INVALID_GENERATOR_RETURN_ITEM_TYPE, typ)
+
+            # Fix the type if decorated with `@types.coroutine` or `@asyncio.coroutine`.
+            if defn.is_awaitable_coroutine:
+                # Update the return type to AwaitableGenerator.
+                # (This doesn't exist in typing.py, only in typing.pyi.)
+                t = typ.ret_type
+                c = defn.is_coroutine
+                ty = self.get_generator_yield_type(t, c)
+                tc = self.get_generator_receive_type(t, c)
+                tr = self.get_generator_return_type(t, c)
+                ret_type = self.named_generic_type('typing.AwaitableGenerator',
+                                                   [ty, tc, tr, t])
+                typ = typ.copy_modified(ret_type=ret_type)
+                defn.type = typ
+
+            # Push return type.
+            self.return_types.append(typ.ret_type)
+
+            # Store argument types.
+            for i in range(len(typ.arg_types)):
+                arg_type = typ.arg_types[i]
+
+                # Refuse covariant parameter type variables
+                if isinstance(arg_type, TypeVarType):
+                    if arg_type.variance == COVARIANT:
+                        self.fail(messages.FUNCTION_PARAMETER_CANNOT_BE_COVARIANT,
+                                  arg_type)
+
+                if typ.arg_kinds[i] == nodes.ARG_STAR:
+                    # builtins.tuple[T] is typing.Tuple[T, ...]
+                    arg_type = self.named_generic_type('builtins.tuple',
+                                                       [arg_type])
+                elif typ.arg_kinds[i] == nodes.ARG_STAR2:
+                    arg_type = self.named_generic_type('builtins.dict',
+                                                       [self.str_type(),
+                                                        arg_type])
+                defn.arguments[i].variable.type = arg_type
+
+            # Type check initialization expressions.
+            for arg in defn.arguments:
+                init = arg.initialization_statement
+                if init:
+                    self.accept(init)
+
+        # Type check body in a new scope.
+        with self.binder.top_frame_context():
+            self.accept(defn.body)
+            unreachable = self.binder.is_unreachable()
+
+        if (self.options.warn_no_return and not unreachable
+                and not isinstance(self.return_types[-1], (Void, AnyType))
+                and not defn.is_generator):
+            # Control flow fell off the end of a function that was
+            # declared to return a non-None type.
+            # Allow functions that are entirely pass/Ellipsis.
+            if self.is_trivial_body(defn.body):
+                pass
+            else:
+                self.msg.note(messages.MISSING_RETURN_STATEMENT, defn)
 
-            self.return_types.pop()
+        self.return_types.pop()
 
-            self.binder = old_binder
+        self.binder = old_binder
 
     def is_trivial_body(self, block: Block) -> bool:
         body = block.body
@@ -815,7 +865,7 @@ class TypeChecker(NodeVisitor[Type]):
             self.msg.invalid_signature(typ, context)
 
     def expand_typevars(self, defn: FuncItem,
-                        typ: CallableType) -> List[Tuple[FuncItem, CallableType]]:
+                        typ: CallableType) -> List[Tuple[Dict[TypeVarId, Type], CallableType]]:
         # TODO use generator
         subst = []  # type: List[List[Tuple[TypeVarId, Type]]]
         tvars = typ.variables or []
@@ -828,72 +878,88 @@ class TypeChecker(NodeVisitor[Type]):
                 subst.append([(tvar.id, value)
                               for value in tvar.values])
         if subst:
-            result = []  # type: List[Tuple[FuncItem, CallableType]]
+            result = []  # type: List[Tuple[Dict[TypeVarId, Type], CallableType]]
             for substitutions in itertools.product(*subst):
                 mapping = dict(substitutions)
                 expanded = cast(CallableType, expand_type(typ, mapping))
-                result.append((expand_func(defn, mapping), expanded))
+                result.append((mapping, expanded))
             return result
         else:
-            return [(defn, typ)]
+            return [({}, typ)]
 
     def check_method_override(self, defn: FuncBase) -> None:
         """Check if function definition is compatible with base classes."""
+        name = defn.name()
+        if name in ('__init__', '__new__'):
+            # __init__ and __new__ are special.
+            return
+        names = [name]
+        if name in nodes.inplace_operator_methods:
+            # An inplace operator method such as __iadd__ might not be
+            # always introduced safely if a base class defined __add__.
+            # TODO can't come up with an example where this is
+            #      necessary; now it's "just in case"
+            names.append('__' + name[3:])
+        # The type of the overriding method, constructed when first needed
+        typ = None  # type: FunctionLike
         # Check against definitions in base classes.
         for base in defn.info.mro[1:]:
-            self.check_method_or_accessor_override_for_base(defn, base)
-
-    def check_method_or_accessor_override_for_base(self, defn: FuncBase,
-                                                   base: TypeInfo) -> None:
-        """Check if method definition is compatible with a base class."""
-        if base:
-            name = defn.name()
-            if name not in ('__init__', '__new__'):
-                # Check method override (__init__ and __new__ are special).
-                self.check_method_override_for_base_with_name(defn, name, base)
-                if name in nodes.inplace_operator_methods:
-                    # Figure out the name of the corresponding operator method.
-                    method = '__' + name[3:]
-                    # An inplace operator method such as __iadd__ might not be
-                    # always introduced safely if a base class defined __add__.
-                    # TODO can't come up with an example where this is
-                    #      necessary; now it's "just in case"
-                    self.check_method_override_for_base_with_name(defn, method,
-                                                                  base)
+            for name_in_base in names:
+                base_attr = base.names.get(name_in_base)
+                if base_attr:
+                    if typ is None:
+                        typ = self.method_type(defn)
+                    self.check_method_override_for_base_with_name(defn, typ, name_in_base,
+                                                                  base_attr, base)
 
     def check_method_override_for_base_with_name(
-            self, defn: FuncBase, name: str, base: TypeInfo) -> None:
-        base_attr = base.names.get(name)
-        if base_attr:
-            # The name of the method is defined in the base class.
-
-            # Construct the type of the overriding method.
-            typ = self.method_type(defn)
-            # Map the overridden method type to subtype context so that
-            # it can be checked for compatibility.
-            original_type = base_attr.type
-            if original_type is None:
-                if isinstance(base_attr.node, FuncDef):
-                    original_type = self.function_type(base_attr.node)
-                elif isinstance(base_attr.node, Decorator):
-                    original_type = self.function_type(base_attr.node.func)
-                else:
-                    assert False, str(base_attr.node)
-            if isinstance(original_type, FunctionLike):
-                original = map_type_from_supertype(
-                    method_type(original_type),
-                    defn.info, base)
-                # Check that the types are compatible.
-                # TODO overloaded signatures
-                self.check_override(typ,
-                                    cast(FunctionLike, original),
-                                    defn.name(),
-                                    name,
-                                    base.name(),
-                                    defn)
+            self, defn: FuncBase, typ: FunctionLike, name: str,
+            base_attr: SymbolTableNode, base: TypeInfo) -> None:
+        """Check a method against a definition of name in a base class.
+
+        typ is the type of the overriding method.
+        """
+        # Map the overridden method type to subtype context so that
+        # it can be checked for compatibility.
+        original_type = base_attr.type
+        if original_type is None:
+            if isinstance(base_attr.node, FuncDef):
+                original_type = self.function_type(base_attr.node)
+            elif isinstance(base_attr.node, Decorator):
+                original_type = self.function_type(base_attr.node.func)
             else:
-                self.msg.signature_incompatible_with_supertype(
-                    defn.name(), name, base.name(), defn)
+                assert False, str(base_attr.node)
+        if isinstance(original_type, FunctionLike):
+            original = map_type_from_supertype(
+                self.base_method_type(original_type, base_attr.type is not None),
+                defn.info, base)
+            # Check that the types are compatible.
+            # TODO overloaded signatures
+            self.check_override(typ,
+                                cast(FunctionLike, original),
+                                defn.name(),
+                                name,
+                                base.name(),
+                                defn)
+        else:
+            self.msg.signature_incompatible_with_supertype(
+                defn.name(), name, base.name(), defn)
+
+    def base_method_type(self, sig: FunctionLike, memoize: bool = True) -> FunctionLike:
+        """Return the signature of a method in a base class without self.
+
+        Each definition is compared with the overriding definitions in all
+        subclasses, so the result is memoized by signature object.  Signatures
+        constructed for unannotated definitions are new objects for each
+        comparison, so the result isn't memoized for them (memoize=False).
+        """
+        if not memoize:
+            return method_type(sig)
+        result = self.base_method_types.get(sig)
+        if result is None:
+            result = method_type(sig)
+            self.base_method_types[sig] = result
+        return result
 
     def check_override(self, override: FunctionLike, original: FunctionLike,
                        name: str, name_in_super: str, supertype: str,
@@ -980,13 +1046,19 @@ class TypeChecker(NodeVisitor[Type]):
             return
         # Verify that inherited attributes are compatible.
         mro = typ.mro[1:]
-        for i, base in enumerate(mro):
+        # Map each name to the bases that define it, in MRO order.
+        definitions = {}  # type: Dict[str, List[TypeInfo]]
+        for base in mro:
             for name in base.names:
-                for base2 in mro[i + 1:]:
+                definitions.setdefault(name, []).append(base)
+        for base in mro:
+            for name in base.names:
+                bases = definitions[name]
+                for base2 in bases[bases.index(base) + 1:]:
                     # We only need to check compatibility of attributes from classes not
                     # in a subclass relationship. For subclasses, normal (single inheritance)
                     # checks suffice (these are implemented elsewhere).
-                    if name in base2.names and base2 not in base.mro:
+                    if not base.has_base(base2.fullname()):
                         self.check_compatibility(name, base, base2, typ)
 
     def check_compatibility(self, name: str, base1: TypeInfo,
@@ -1012,8 +1084,8 @@ class TypeChecker(NodeVisitor[Type]):
         if (isinstance(first_type, FunctionLike) and
                 isinstance(second_type, FunctionLike)):
             # Method override
-            first_sig = method_type(first_type)
-            second_sig = method_type(second_type)
+            first_sig = self.base_method_type(first_type, first.type is not None)
+            second_sig = self.base_method_type(second_type, second.type is not None)
             ok = is_subtype(first_sig, second_sig)
         elif first_type and second_type:
             ok = is_equivalent(first_type, second_type)
@@ -2151,7 +2223,8 @@ class TypeChecker(NodeVisitor[Type]):
                       supertype_label: str = None) -> bool:
         """Generate an error if the subtype is not compatible with
         supertype."""
-        if is_subtype(subtype, supertype):
+        # Interning the types lets repeated checks use the subtype cache.
+        if is_subtype(intern_copy(subtype), intern_copy(supertype)):
             return True
         else:
             if self.is_unusable_type(subtype):
@@ -2185,19 +2258,21 @@ class TypeChecker(NodeVisitor[Type]):
     def named_type(self, name: str) -> Instance:
         """Return an instance type with type given by the name and no
         type arguments. For example, named_type('builtins.object')
-        produces the object type.
+        produces the object type. The result is interned, so it must not
+        be modified.
         """
         # Assume that the name refers to a type.
         sym = self.lookup_qualified(name)
-        return Instance(cast(TypeInfo, sym.node), [])
+        return cast(Instance, intern_type(Instance(cast(TypeInfo, sym.node), [])))
 
     def named_generic_type(self, name: str, args: List[Type]) -> Instance:
         """Return an instance with the given name and type arguments.
 
         Assume that the number of arguments is correct.  Assume that
-        the name refers to a compatible generic type.
+        the name refers to a compatible generic type.  The result is
+        interned, so it must not be modified.
         """
-        return Instance(self.lookup_typeinfo(name), args)
+        return cast(Instance, intern_type(Instance(self.lookup_typeinfo(name), args)))
 
     def lookup_typeinfo(self, fullname: str) -> TypeInfo:
         # Assume that the name refers to a class.
@@ -2584,20 +2659,142 @@ def get_isinstance_type(expr: Expression, type_map: Dict[Expression, Type]) -> T
         return UnionType(types)
 
 
-def expand_func(defn: FuncItem, map: Dict[TypeVarId, Type]) -> FuncItem:
-    visitor = TypeTransformVisitor(map)
-    ret = defn.accept(visitor)
-    assert isinstance(ret, FuncItem)
-    return ret
-
+class ExpandedFuncState(TraverserVisitor):
+    """The state of a function that depends on the values of type variables.
 
-class TypeTransformVisitor(TransformVisitor):
-    def __init__(self, map: Dict[TypeVarId, Type]) -> None:
-        super().__init__()
-        self.map = map
+    A function using type variables with value restrictions is type checked
+    once for each combination of values.  This finds the declared types
+    within the function and the nodes on which the type checker stores
+    results, so that they can be set up for each combination with expand()
+    and put back as they were with restore().
+    """
 
-    def type(self, type: Type) -> Type:
-        return expand_type(type, self.map)
+    def __init__(self, defn: FuncItem) -> None:
+        # Attributes that refer to a type or a list of types
+        self.types = []  # type: List[Tuple[Node, str, Type]]
+        self.type_lists = []  # type: List[Tuple[Node, str, List[Type]]]
+        # Other attributes set by the type checker
+        self.values = []  # type: List[Tuple[Node, str, object]]
+        self.vars = set()  # type: Set[Var]
+        # The signature of defn itself is expanded by the caller.
+        self.visit_func(defn)
+
+    def expand(self, mapping: Dict[TypeVarId, Type]) -> None:
+        for node, attr, typ in self.types:
+            setattr(node, attr, expand_type(typ, mapping) if typ is not None else None)
+        for node, attr, types in self.type_lists:
+            setattr(node, attr, [expand_type(t, mapping) if t is not None else None
+                                 for t in types])
+        for node, attr, value in self.values:
+            setattr(node, attr, value)
+
+    def restore(self) -> None:
+        for node, attr, typ in self.types:
+            setattr(node, attr, typ)
+        for node, attr, types in self.type_lists:
+            setattr(node, attr, types)
+        for node, attr, value in self.values:
+            setattr(node, attr, value)
+
+    def visit_var(self, o: Var) -> None:
+        if o not in self.vars:
+            self.vars.add(o)
+            self.types.append((o, 'type', o.type))
+            self.values.append((o, 'is_ready', o.is_ready))
+
+    def visit_func_def(self, o: FuncDef) -> None:
+        self.visit_nested_func(o)
+        super().visit_func_def(o)
+
+    def visit_func_expr(self, o: FuncExpr) -> None:
+        self.visit_nested_func(o)
+        super().visit_func_expr(o)
+
+    def visit_nested_func(self, o: FuncItem) -> None:
+        self.types.append((o, 'type', o.type))
+        self.values.append((o, 'expansions', o.expansions))
+
+    def visit_overloaded_func_def(self, o: OverloadedFuncDef) -> None:
+        self.types.append((o, 'type', o.type))
+        super().visit_overloaded_func_def(o)
+
+    def visit_name_expr(self, o: NameExpr) -> None:
+        # Only local variables (and attributes defined in the bodies of local
+        # classes) get their types from the function.
+        if isinstance(o.node, Var) and o.kind in (nodes.LDEF, nodes.MDEF):
+            self.visit_var(o.node)
+
+    def visit_member_expr(self, o: MemberExpr) -> None:
+        if o.def_var:
+            self.visit_var(o.def_var)
+        super().visit_member_expr(o)
+
+    def visit_op_expr(self, o: OpExpr) -> None:
+        self.types.append((o, 'method_type', o.method_type))
+        super().visit_op_expr(o)
+
+    def visit_unary_expr(self, o: UnaryExpr) -> None:
+        self.types.append((o, 'method_type', o.method_type))
+        super().visit_unary_expr(o)
+
+    def visit_index_expr(self, o: IndexExpr) -> None:
+        self.types.append((o, 'method_type', o.method_type))
+        super().visit_index_expr(o)
+
+    def visit_comparison_expr(self, o: ComparisonExpr) -> None:
+        self.type_lists.append((o, 'method_types', o.method_types))
+        super().visit_comparison_expr(o)
+
+    def visit_cast_expr(self, o: CastExpr) -> None:
+        self.types.append((o, 'type', o.type))
+        super().visit_cast_expr(o)
+
+    def visit_type_application(self, o: TypeApplication) -> None:
+        self.type_lists.append((o, 'types', o.types))
+        super().visit_type_application(o)
+
+    def visit_temp_node(self, o: TempNode) -> None:
+        self.types.append((o, 'type', o.type))
+
+    # TraverserVisitor doesn't go into these.
+
+    def visit_try_stmt(self, o: TryStmt) -> None:
+        for var in o.vars:
+            if var is not None:
+                var.accept(self)
+        super().visit_try_stmt(o)
+
+    def visit_print_stmt(self, o: PrintStmt) -> None:
+        for arg in o.args:
+            arg.accept(self)
+        if o.target:
+            o.target.accept(self)
+
+    def visit_exec_stmt(self, o: ExecStmt) -> None:
+        for expr in (o.expr, o.variables1, o.variables2):
+            if expr is not None:
+                expr.accept(self)
+
+    def visit_star_expr(self, o: StarExpr) -> None:
+        o.expr.accept(self)
+
+    def visit_await_expr(self, o: AwaitExpr) -> None:
+        o.expr.accept(self)
+
+    def visit_backquote_expr(self, o: BackquoteExpr) -> None:
+        o.expr.accept(self)
+
+    def visit_set_comprehension(self, o: SetComprehension) -> None:
+        o.generator.accept(self)
+
+    def visit_dictionary_comprehension(self, o: DictionaryComprehension) -> None:
+        for index, sequence, conditions in zip(o.indices, o.sequences, o.condlists):
+            sequence.accept(self)
+            index.accept(self)
+            for cond in conditions:
+                cond.accept(self)
+        o.key.accept(self)
+        o.value.accept(self)
 
 
 def is_unsafe_overlapping_signatures(signature: Type, other: Type) -> bool:
@@ -29,6 +29,7 @@ from mypy import messages
 from mypy.infer import infer_type_arguments, infer_function_type_arguments
 from mypy import join
 from mypy.subtypes import is_subtype, is_equivalent
+from mypy.typeintern import intern_copy, is_interned, TypeCache
 from mypy import applytype
 from mypy import erasetype
 from mypy.checkmember import analyze_member_access, type_object_type
@@ -45,6 +46,13 @@ from mypy import experiments
 ArgChecker = Callable[[Type, Type, int, Type, int, int, CallableType, Context, MessageBuilder],
                       None]
 
+# Items of an interned overloaded type that can accept a call with the given
+# argument kinds and names (see overload_items_for_call)
+overload_shape_cache = TypeCache('Overload shape')
+# Item chosen by overload_call_target for an interned overloaded type and
+# interned argument types
+overload_target_cache = TypeCache('Overload target')
+
 
 def extract_refexpr_names(expr: RefExpr) -> Set[str]:
     """Recursively extracts all module references from a reference expression.
@@ -745,7 +753,7 @@ class ExpressionChecker:
             messages.does_not_return_value(caller_type, context)
         elif isinstance(caller_type, DeletedType):
             messages.deleted_as_rvalue(caller_type, context)
-        elif not is_subtype(caller_type, callee_type):
+        elif not is_subtype(intern_copy(caller_type), intern_copy(callee_type)):
             if self.chk.should_suppress_optional_error([caller_type, callee_type]):
                 return
             messages.incompatible_argument(n, m, callee, original_caller_type,
@@ -761,11 +769,38 @@ class ExpressionChecker:
         could not be determined).
         """
         messages = messages or self.msg
+        overload = cast(Overloaded, intern_copy(overload))
+        arg_types = [intern_copy(t) for t in arg_types]
+        key = None  # type: tuple
+        # Matching *args and **kwargs arguments may report errors, so the
+        # target must be looked up again for each call.
+        if (is_interned(overload) and all(is_interned(t) for t in arg_types)
+                and nodes.ARG_STAR not in arg_kinds and nodes.ARG_STAR2 not in arg_kinds):
+            key = (overload, tuple(arg_types), tuple(arg_kinds),
+                   tuple(arg_names) if arg_names else None, self.chk.in_checked_function())
+            target = overload_target_cache.get(key)
+            if target is not None:
+                return target
+        else:
+            overload_target_cache.uncached += 1
+        target = self.find_overload_target(arg_types, arg_kinds, arg_names, overload, context)
+        if target is None:
+            if not self.chk.should_suppress_optional_error(arg_types):
+                messages.no_variant_matches_arguments(overload, arg_types, context)
+            return AnyType()
+        if key is not None:
+            overload_target_cache.set(key, target)
+        return target
+
+    def find_overload_target(self, arg_types: List[Type], arg_kinds: List[int],
+                             arg_names: List[str], overload: Overloaded,
+                             context: Context) -> Optional[Type]:
+        """Find the overload item to call, or return None if no item matches."""
         # TODO: For overlapping signatures we should try to get a more precise
         #       result than 'Any'.
         match = []  # type: List[CallableType]
         best_match = 0
-        for typ in overload.items():
+        for typ in overload_items_for_call(overload, arg_kinds, arg_names):
             similarity = self.erased_signature_similarity(arg_types, arg_kinds, arg_names,
                                                           typ, context=context)
             if similarity > 0 and similarity >= best_match:
@@ -796,9 +831,7 @@ class ExpressionChecker:
                     match.append(typ)
                 best_match = max(best_match, similarity)
         if not match:
-            if not self.chk.should_suppress_optional_error(arg_types):
-                messages.no_variant_matches_arguments(overload, arg_types, context)
-            return AnyType()
+            return None
         else:
             if len(match) == 1:
                 return match[0]
@@ -1396,6 +1429,11 @@ class ExpressionChecker:
         # Used for list and set expressions, as well as for tuples
         # containing star expressions that don't refer to a
         # Tuple. (Note: "lst" stands for list-set-tuple. :-)
+        if (items and self.chk.type_context[-1] is None and
+                all(is_context_free_literal(item) for item in items)):
+            # The call would infer the join of the item types; get it
+            # directly, since large literals of constants are common.
+            return self.literal_type(fullname, [self.join_item_types(items)])
         tvdef = TypeVarDef('T', -1, [], self.chk.object_type())
         tv = TypeVarType(tvdef)
         constructor = CallableType(
@@ -1413,6 +1451,29 @@ class ExpressionChecker:
                                 for i in items],
                                context)[0]
 
+    def join_item_types(self, items: List[Expression]) -> Type:
+        """Type check expressions and return the join of their types."""
+        result = None  # type: Type
+        for item in items:
+            # Interning makes repeated item types identical, so they don't
+            # need to be joined.
+            typ = intern_copy(self.accept(item))
+            if result is None:
+                result = typ
+            elif typ is not result:
+                result = join.join_types(result, typ)
+        return result
+
+    def literal_type(self, fullname: str, args: List[Type]) -> Type:
+        """Return the type of a collection literal with the given inferred type arguments.
+
+        This is the same as the result of the generic constructor call.
+        """
+        tvars = [TypeVarType(TypeVarDef('T', -1 - i, [], self.chk.object_type()))
+                 for i in range(len(args))]
+        return expand_type(self.chk.named_generic_type(fullname, cast(List[Type], tvars)),
+                           {tv.id: arg for tv, arg in zip(tvars, args)})
+
     def visit_tuple_expr(self, e: TupleExpr) -> Type:
         """Type check a tuple expression."""
         # Try to determine type context for type inference.
@@ -1486,6 +1547,13 @@ class ExpressionChecker:
                 stargs.append(value)
             else:
                 args.append(TupleExpr([key, value]))
+        if (args and not stargs and self.chk.type_context[-1] is None and
+                all(is_context_free_literal(key) and is_context_free_literal(value)
+                    for key, value in e.items)):
+            # Like list literals in check_lst_expr.
+            return self.literal_type('builtins.dict',
+                                     [self.join_item_types([key for key, _ in e.items]),
+                                      self.join_item_types([value for _, value in e.items])])
         # Define type variables (used in constructors below).
         ktdef = TypeVarDef('KT', -1, [], self.chk.object_type())
         vtdef = TypeVarDef('VT', -2, [], self.chk.object_type())
@@ -1731,7 +1799,8 @@ class ExpressionChecker:
             # branch's type.
             else_type = self.analyze_cond_branch(else_map, e.else_expr, context=if_type)
 
-        res = join.join_types(if_type, else_type)
+        # The joins of interned copies of the branch types are memoized.
+        res = join.join_types(intern_copy(if_type), intern_copy(else_type))
 
         return res
 
@@ -1817,6 +1886,48 @@ class ExpressionChecker:
         self.chk.handle_cannot_determine_type(name, context)
 
 
+def overload_items_for_call(overload: Overloaded, arg_kinds: List[int],
+                            arg_names: List[str]) -> List[CallableType]:
+    """Return the items of an overloaded type that may accept the given arguments.
+
+    Without *args and **kwargs arguments, the mapping of arguments to
+    formals only depends on the argument kinds and names.  Leave out the
+    items that would get an extra argument or miss a required one, as
+    erased_signature_similarity() would reject them.  The result is
+    memoized for interned overloaded types.
+    """
+    if any(kind not in (ARG_POS, ARG_NAMED) for kind in arg_kinds):
+        return overload.items()
+    if not is_interned(overload):
+        overload_shape_cache.uncached += 1
+        return filter_items_by_shape(overload.items(), arg_kinds, arg_names)
+    key = (overload, tuple(arg_kinds), tuple(arg_names) if arg_names else None)
+    items = overload_shape_cache.get(key)
+    if items is None:
+        items = filter_items_by_shape(overload.items(), arg_kinds, arg_names)
+        overload_shape_cache.set(key, items)
+    return items
+
+
+def filter_items_by_shape(items: List[CallableType], arg_kinds: List[int],
+                          arg_names: List[str]) -> List[CallableType]:
+    result = []  # type: List[CallableType]
+    for item in items:
+        formal_to_actual = map_actuals_to_formals(arg_kinds, arg_names,
+                                                  item.arg_kinds, item.arg_names,
+                                                  lambda i: AnyType())
+        mapped = set()  # type: Set[int]
+        for actuals in formal_to_actual:
+            mapped.update(actuals)
+        if len(mapped) < len(arg_kinds):
+            continue
+        if any(kind == nodes.ARG_POS and not actuals
+               for kind, actuals in zip(item.arg_kinds, formal_to_actual)):
+            continue
+        result.append(item)
+    return result
+
+
 def map_actuals_to_formals(caller_kinds: List[int],
                            caller_names: List[str],
                            callee_kinds: List[int],
@@ -1885,6 +1996,22 @@ def map_actuals_to_formals(caller_kinds: List[int],
     return map
 
 
+def is_context_free_literal(e: Expression) -> bool:
+    """Is e a literal whose type doesn't depend on the type context?
+
+    These are constants, and tuples of them.
+    """
+    if isinstance(e, (IntExpr, StrExpr, BytesExpr, UnicodeExpr, FloatExpr, ComplexExpr)):
+        return True
+    if isinstance(e, UnaryExpr):
+        return e.op in ('-', '+') and isinstance(e.expr, (IntExpr, FloatExpr, ComplexExpr))
+    if isinstance(e, NameExpr):
+        return e.fullname in ('builtins.None', 'builtins.True', 'builtins.False')
+    if isinstance(e, TupleExpr):
+        return all(is_context_free_literal(item) for item in e.items)
+    return False
+
+
 def is_empty_tuple(t: Type) -> bool:
     return isinstance(t, TupleType) and not t.items
 
@@ -1916,29 +2043,11 @@ class ArgInferSecondPassQuery(types.TypeQuery):
         super().__init__(False, types.ANY_TYPE_STRATEGY)
 
     def visit_callable_type(self, t: CallableType) -> bool:
-        return self.query_types(t.arg_types) or t.accept(HasTypeVarQuery())
-
-
-class HasTypeVarQuery(types.TypeQuery):
-    """Visitor for querying whether a type has a type variable component."""
-    def __init__(self) -> None:
-        super().__init__(False, types.ANY_TYPE_STRATEGY)
-
-    def visit_type_var(self, t: TypeVarType) -> bool:
-        return True
+        return self.query_types(t.arg_types) or t.has_type_vars()
 
 
 def has_erased_component(t: Type) -> bool:
-    return t is not None and t.accept(HasErasedComponentsQuery())
-
-
-class HasErasedComponentsQuery(types.TypeQuery):
-    """Visitor for querying whether a type has an erased component."""
-    def __init__(self) -> None:
-        super().__init__(False, types.ANY_TYPE_STRATEGY)
-
-    def visit_erased_type(self, t: ErasedType) -> bool:
-        return True
+    return t is not None and bool(t.properties() & types.HAS_ERASED)
 
 
 def overload_arg_similarity(actual: Type, formal: Type) -> int:
@@ -3,7 +3,7 @@ import sys
 import traceback
 from collections import OrderedDict, defaultdict
 
-from typing import Tuple, List, TypeVar, Set, Dict
+from typing import AbstractSet, Tuple, List, TypeVar, Set, Dict
 
 from mypy.options import Options
 
@@ -113,11 +113,18 @@ class Errors:
         self.show_column_numbers = show_column_numbers
 
     def copy(self) -> 'Errors':
+        """Return an Errors object without errors in the current error context.
+
+        This is used for speculative checking, so only the parts of the
+        context used by report() are copied.  The import context is shared,
+        since it is never modified in place.
+        """
         new = Errors(self.hide_error_context, self.show_column_numbers)
         new.file = self.file
-        new.import_ctx = self.import_ctx[:]
-        new.type_name = self.type_name[:]
-        new.function_or_member = self.function_or_member[:]
+        new.import_ctx = self.import_ctx
+        new.type_name = self.type_name[-1:]
+        # Enough of the function stack to tell whether functions are nested.
+        new.function_or_member = self.function_or_member[-3:]
         return new
 
     def set_ignore_prefix(self, prefix: str) -> None:
@@ -202,9 +209,9 @@ class Errors:
             self.only_once_messages.add(info.message)
         self.error_info.append(info)
 
-    def generate_unused_ignore_notes(self) -> None:
+    def generate_unused_ignore_notes(self, skipped_files: AbstractSet[str] = frozenset()) -> None:
         for file, ignored_lines in self.ignored_lines.items():
-            if not self.is_typeshed_file(file):
+            if not self.is_typeshed_file(file) and file not in skipped_files:
                 for line in ignored_lines - self.used_ignored_lines[file]:
                     # Don't use report since add_error_info will ignore the error!
                     info = ErrorInfo(self.import_context(), file, None, None,
@@ -3,15 +3,21 @@ from typing import Dict, Tuple, List, cast
 from mypy.types import (
     Type, Instance, CallableType, TypeVisitor, UnboundType, ErrorType, AnyType,
     Void, NoneTyp, TypeVarType, Overloaded, TupleType, UnionType, ErasedType, TypeList,
-    PartialType, DeletedType, UninhabitedType, TypeType, TypeVarId
+    PartialType, DeletedType, UninhabitedType, TypeType, TypeVarId,
+    HAS_TYPE_VARS, HAS_ERASED, HAS_ERASED_INSTANCE, HAS_UNION
 )
 
 
 def expand_type(typ: Type, env: Dict[TypeVarId, Type]) -> Type:
     """Substitute any type variable references in a type given by a type
     environment.
-    """
 
+    Return typ itself if expansion wouldn't change it.  Besides type
+    variables, expansion simplifies unions and clears the erased flag of
+    instances.
+    """
+    if not typ.properties() & (HAS_TYPE_VARS | HAS_ERASED | HAS_ERASED_INSTANCE | HAS_UNION):
+        return typ
     return typ.accept(ExpandTypeVisitor(env))
 
 
@@ -1,7 +1,6 @@
-from functools import wraps
 import sys
 
-from typing import Tuple, Union, TypeVar, Callable, Sequence, Optional, Any, cast, List
+from typing import Tuple, Union, TypeVar, Callable, Sequence, Optional, Any, cast, List, Dict
 from mypy.nodes import (
     MypyFile, Node, ImportBase, Import, ImportAll, ImportFrom, FuncDef, OverloadedFuncDef,
     ClassDef, Decorator, Block, Var, OperatorAssignmentStmt,
@@ -15,7 +14,7 @@ from mypy.nodes import (
     StarExpr, YieldFromExpr, NonlocalDecl, DictionaryComprehension,
     SetComprehension, ComplexExpr, EllipsisExpr, YieldExpr, Argument,
     AwaitExpr, TempNode, Expression, Statement,
-    ARG_POS, ARG_OPT, ARG_STAR, ARG_NAMED, ARG_STAR2
+    NodeIndex, ARG_POS, ARG_OPT, ARG_STAR, ARG_NAMED, ARG_STAR2
 )
 from mypy.types import (
     Type, CallableType, AnyType, UnboundType, TupleType, TypeList, EllipsisType,
@@ -44,6 +43,9 @@ V = TypeVar('V')
 TYPE_COMMENT_SYNTAX_ERROR = 'syntax error in type comment'
 TYPE_COMMENT_AST_ERROR = 'invalid type comment'
 
+# Maximum number of distinct type comments to keep parsed (see parse_type_comment_ast)
+TYPE_COMMENT_CACHE_SIZE = 10000
+
 
 def parse(source: Union[str, bytes], fnam: str = None, errors: Errors = None,
           pyversion: Tuple[int, int] = defaults.PYTHON3_VERSION,
@@ -77,9 +79,32 @@ def parse(source: Union[str, bytes], fnam: str = None, errors: Errors = None,
     return MypyFile([], [], False, set())
 
 
+# Parse trees of type comments, keyed by (comment, parse mode).  The same
+# comments (such as '(...) -> None' or 'List[str]') occur over and over, and
+# the parse trees are never modified, so each one is only parsed once.  The
+# types are still converted separately for each use, since they are mutable
+# and carry line numbers.
+type_comment_cache = {}  # type: Dict[Tuple[str, str], ast35.AST]
+
+
+def parse_type_comment_ast(type_comment: str, mode: str) -> ast35.AST:
+    """Parse a type comment in the given mode ('eval' or 'func_type').
+
+    Raise SyntaxError if the type comment is invalid.
+    """
+    key = (type_comment, mode)
+    tree = type_comment_cache.get(key)
+    if tree is None:
+        tree = ast35.parse(type_comment, '<type_comment>', mode)
+        if len(type_comment_cache) >= TYPE_COMMENT_CACHE_SIZE:
+            type_comment_cache.clear()
+        type_comment_cache[key] = tree
+    return tree
+
+
 def parse_type_comment(type_comment: str, line: int) -> Type:
     try:
-        typ = ast35.parse(type_comment, '<type_comment>', 'eval')
+        typ = parse_type_comment_ast(type_comment, 'eval')
     except SyntaxError as e:
         raise TypeCommentParseError(TYPE_COMMENT_SYNTAX_ERROR, line, e.offset)
     else:
@@ -88,12 +113,14 @@ def parse_type_comment(type_comment: str, line: int) -> Type:
 
 
 def with_line(f: Callable[['ASTConverter', T], U]) -> Callable[['ASTConverter', T], U]:
-    @wraps(f)
-    def wrapper(self: 'ASTConverter', ast: T) -> U:
-        node = f(self, ast)
-        node.set_line(ast.lineno, ast.col_offset)
-        return node
-    return wrapper
+    """Mark a visit method whose result gets the line and column of the AST node.
+
+    The line is set by ASTConverter.visit() when it calls the method, which is
+    cheaper than wrapping each method in another function.  Methods that are
+    called directly must set the line themselves.
+    """
+    f.with_line = True  # type: ignore
+    return f
 
 
 def find(f: Callable[[V], bool], seq: Sequence[V]) -> V:
@@ -110,17 +137,44 @@ class ASTConverter(ast35.NodeTransformer):
                  custom_typing_module: str = None) -> None:
         self.class_nesting = 0
         self.imports = []  # type: List[ImportBase]
+        self.node_index = NodeIndex()
 
         self.pyversion = pyversion
         self.is_stub = is_stub
         self.custom_typing_module = custom_typing_module
+        self.visitor_cache = self.visitor_caches.setdefault(type(self), {})
+
+    # Map from converter class to a map from AST node type to (visit method,
+    # does the method have @with_line?).  A subclass may override visit
+    # methods, so each class needs its own map.
+    visitor_caches = {}  # type: Dict[type, Dict[type, Tuple[Callable[..., Any], bool]]]
+
+    def visit(self, node: Optional[ast35.AST]) -> Any:
+        """Convert an AST node (or None) to the corresponding mypy node.
+
+        This is called for every AST node, so instead of building the method
+        name and calling getattr() each time like NodeTransformer.visit(), it
+        caches visit methods by node type.
+        """
+        if node is None:
+            return None
+        typeobj = type(node)
+        entry = self.visitor_cache.get(typeobj)
+        if entry is None:
+            cls = type(self)
+            method = getattr(cls, 'visit_' + typeobj.__name__, cls.generic_visit)
+            entry = (method, getattr(method, 'with_line', False))
+            self.visitor_cache[typeobj] = entry
+        method, set_line = entry
+        result = method(self, node)
+        if set_line:
+            result.line = node.lineno
+            result.column = node.col_offset
+        return result
 
     def generic_visit(self, node: ast35.AST) -> None:
         raise RuntimeError('AST node not implemented: ' + str(type(node)))
 
-    def visit_NoneType(self, n: Any) -> Optional[Node]:
-        return None
-
     def translate_expr_list(self, l: Sequence[ast35.AST]) -> List[Expression]:
         res = []  # type: List[Expression]
         for e in l:
@@ -234,24 +288,24 @@ class ASTConverter(ast35.NodeTransformer):
     def visit_Module(self, mod: ast35.Module) -> MypyFile:
         body = self.fix_function_overloads(self.translate_stmt_list(mod.body))
 
-        return MypyFile(body,
+        tree = MypyFile(body,
                         self.imports,
                         False,
                         {ti.lineno for ti in mod.type_ignores},
                         )
+        tree.node_index = self.node_index
+        return tree
 
     # --- stmt ---
     # FunctionDef(identifier name, arguments args,
     #             stmt* body, expr* decorator_list, expr? returns, string? type_comment)
     # arguments = (arg* args, arg? vararg, arg* kwonlyargs, expr* kw_defaults,
     #              arg? kwarg, expr* defaults)
-    @with_line
     def visit_FunctionDef(self, n: ast35.FunctionDef) -> Union[FuncDef, Decorator]:
         return self.do_func_def(n)
 
     # AsyncFunctionDef(identifier name, arguments args,
     #                  stmt* body, expr* decorator_list, expr? returns, string? type_comment)
-    @with_line
     def visit_AsyncFunctionDef(self, n: ast35.AsyncFunctionDef) -> Union[FuncDef, Decorator]:
         return self.do_func_def(n, is_coroutine=True)
 
@@ -265,7 +319,7 @@ class ASTConverter(ast35.NodeTransformer):
         arg_types = None  # type: List[Type]
         if n.type_comment is not None:
             try:
-                func_type_ast = ast35.parse(n.type_comment, '<func_type>', 'func_type')
+                func_type_ast = parse_type_comment_ast(n.type_comment, 'func_type')
             except SyntaxError:
                 raise TypeCommentParseError(TYPE_COMMENT_SYNTAX_ERROR, n.lineno, n.col_offset)
             assert isinstance(func_type_ast, ast35.FunctionType)
@@ -302,10 +356,14 @@ class ASTConverter(ast35.NodeTransformer):
                                      return_type if return_type is not None else AnyType(),
                                      None)
 
+        self.node_index.func_depth += 1
+        body = self.as_block(n.body, n.lineno)
+        self.node_index.func_depth -= 1
         func_def = FuncDef(n.name,
                        args,
-                       self.as_block(n.body, n.lineno),
+                       body,
                        func_type)
+        self.node_index.add_func_def(func_def)
         if is_coroutine:
             # A coroutine is also a generator, mostly for internal reasons.
             func_def.is_generator = func_def.is_coroutine = True
@@ -321,8 +379,12 @@ class ASTConverter(ast35.NodeTransformer):
             func_def.is_decorated = True
             func_def.set_line(n.lineno + len(n.decorator_list))
             func_def.body.set_line(func_def.get_line())
-            return Decorator(func_def, self.translate_expr_list(n.decorator_list), var)
+            dec = Decorator(func_def, self.translate_expr_list(n.decorator_list), var)
+            dec.set_line(n.lineno, n.col_offset)
+            return dec
         else:
+            # Use set_line() since it also sets the line of the arguments.
+            func_def.set_line(n.lineno, n.col_offset)
             return func_def
 
     def set_type_optional(self, type: Type, initializer: Expression) -> None:
@@ -391,13 +453,17 @@ class ASTConverter(ast35.NodeTransformer):
             if metaclass is None:
                 metaclass = '<error>'  # To be reported later
 
+        self.node_index.class_depth += 1
+        body = self.as_block(n.body, n.lineno)
+        self.node_index.class_depth -= 1
         cdef = ClassDef(n.name,
-                        self.as_block(n.body, n.lineno),
+                        body,
                         None,
                         self.translate_expr_list(n.bases),
                         metaclass=metaclass)
         cdef.decorators = self.translate_expr_list(n.decorator_list)
         self.class_nesting -= 1
+        self.node_index.add_class_def(cdef)
         return cdef
 
     # Return(expr? value)
@@ -633,14 +699,18 @@ class ASTConverter(ast35.NodeTransformer):
         return UnaryExpr(op, self.visit(n.operand))
 
     # Lambda(arguments args, expr body)
-    @with_line
     def visit_Lambda(self, n: ast35.Lambda) -> FuncExpr:
         body = ast35.Return(n.body)
         body.lineno = n.lineno
         body.col_offset = n.col_offset
 
-        return FuncExpr(self.transform_args(n.args, n.lineno),
-                        self.as_block([body], n.lineno))
+        args = self.transform_args(n.args, n.lineno)
+        self.node_index.func_depth += 1
+        e = FuncExpr(args, self.as_block([body], n.lineno))
+        self.node_index.func_depth -= 1
+        # Use set_line() since it also sets the line of the arguments.
+        e.set_line(n.lineno, n.col_offset)
+        return e
 
     # IfExp(expr test, expr body, expr orelse)
     @with_line
@@ -683,15 +753,17 @@ class ASTConverter(ast35.NodeTransformer):
                                        ifs_list)
 
     # GeneratorExp(expr elt, comprehension* generators)
-    @with_line
+    # (Also called directly for ListComp and SetComp, so set the line here.)
     def visit_GeneratorExp(self, n: ast35.GeneratorExp) -> GeneratorExpr:
         targets = [self.visit(c.target) for c in n.generators]
         iters = [self.visit(c.iter) for c in n.generators]
         ifs_list = [self.translate_expr_list(c.ifs) for c in n.generators]
-        return GeneratorExpr(self.visit(n.elt),
-                             targets,
-                             iters,
-                             ifs_list)
+        e = GeneratorExpr(self.visit(n.elt),
+                          targets,
+                          iters,
+                          ifs_list)
+        e.set_line(n.lineno, n.col_offset)
+        return e
 
     # Await(expr value)
     @with_line
@@ -728,10 +800,12 @@ class ASTConverter(ast35.NodeTransformer):
             [k.value for k in n.keywords])
         arg_kinds = ([ARG_STAR if isinstance(a, ast35.Starred) else ARG_POS for a in n.args] +
                      [ARG_STAR2 if is_star2arg(k) else ARG_NAMED for k in n.keywords])
-        return CallExpr(self.visit(n.func),
-                        arg_types,
-                        arg_kinds,
-                        cast("List[str]", [None for _ in n.args]) + [k.arg for k in n.keywords])
+        e = CallExpr(self.visit(n.func),
+                     arg_types,
+                     arg_kinds,
+                     cast("List[str]", [None for _ in n.args]) + [k.arg for k in n.keywords])
+        self.node_index.add_call_expr(e)
+        return e
 
     # Num(object n) -- a number as a PyObject.
     @with_line
@@ -838,6 +912,7 @@ class ASTConverter(ast35.NodeTransformer):
 class TypeConverter(ast35.NodeTransformer):
     def __init__(self, line: int = -1) -> None:
         self.line = line
+        self.visitor_cache = self.visitor_caches.setdefault(type(self), {})
 
     def visit_raw_str(self, s: str) -> Type:
         # An escape hatch that allows the AST walker in fastparse2 to
@@ -845,13 +920,25 @@ class TypeConverter(ast35.NodeTransformer):
         # without needing to create an intermediary `ast35.Str` object.
         return parse_type_comment(s.strip(), line=self.line)
 
+    # Map from converter class to a map from AST node type to visit method
+    # (see ASTConverter.visit)
+    visitor_caches = {}  # type: Dict[type, Dict[type, Callable[..., Type]]]
+
+    def visit(self, node: Optional[ast35.AST]) -> Type:
+        if node is None:
+            return None
+        typeobj = type(node)
+        method = self.visitor_cache.get(typeobj)
+        if method is None:
+            cls = type(self)
+            method = getattr(cls, 'visit_' + typeobj.__name__, cls.generic_visit)
+            self.visitor_cache[typeobj] = method
+        return method(self, node)
+
     def generic_visit(self, node: ast35.AST) -> None:
         raise TypeCommentParseError(TYPE_COMMENT_AST_ERROR, self.line,
                                     getattr(node, 'col_offset', -1))
 
-    def visit_NoneType(self, n: Any) -> Type:
-        return None
-
     def translate_expr_list(self, l: Sequence[ast35.AST]) -> List[Type]:
         return [self.visit(e) for e in l]
 
@@ -14,10 +14,9 @@ of redundancy is because the Python 2 AST and the Python 3 AST nodes belong to t
 different class heirarchies, which made it difficult to write a shared visitor between the
 two in a typesafe way.
 """
-from functools import wraps
 import sys
 
-from typing import Tuple, Union, TypeVar, Callable, Sequence, Optional, Any, cast, List
+from typing import Tuple, Union, TypeVar, Callable, Sequence, Optional, Any, cast, List, Dict
 from mypy.nodes import (
     MypyFile, Node, ImportBase, Import, ImportAll, ImportFrom, FuncDef, OverloadedFuncDef,
     ClassDef, Decorator, Block, Var, OperatorAssignmentStmt,
@@ -30,7 +29,7 @@ from mypy.nodes import (
     UnaryExpr, FuncExpr, ComparisonExpr, DictionaryComprehension,
     SetComprehension, ComplexExpr, EllipsisExpr, YieldExpr, Argument,
     Expression, Statement,
-    ARG_POS, ARG_OPT, ARG_STAR, ARG_NAMED, ARG_STAR2
+    NodeIndex, ARG_POS, ARG_OPT, ARG_STAR, ARG_NAMED, ARG_STAR2
 )
 from mypy.types import (
     Type, CallableType, AnyType, UnboundType,
@@ -38,7 +37,9 @@ from mypy.types import (
 from mypy import defaults
 from mypy import experiments
 from mypy.errors import Errors
-from mypy.fastparse import TypeConverter, TypeCommentParseError
+from mypy.fastparse import (
+    TypeConverter, TypeCommentParseError, parse_type_comment, parse_type_comment_ast
+)
 
 try:
     from typed_ast import ast27
@@ -94,23 +95,15 @@ def parse(source: Union[str, bytes], fnam: str = None, errors: Errors = None,
     return MypyFile([], [], False, set())
 
 
-def parse_type_comment(type_comment: str, line: int) -> Type:
-    try:
-        typ = ast35.parse(type_comment, '<type_comment>', 'eval')
-    except SyntaxError as e:
-        raise TypeCommentParseError(TYPE_COMMENT_SYNTAX_ERROR, line, e.offset)
-    else:
-        assert isinstance(typ, ast35.Expression)
-        return TypeConverter(line=line).visit(typ.body)
-
-
 def with_line(f: Callable[['ASTConverter', T], U]) -> Callable[['ASTConverter', T], U]:
-    @wraps(f)
-    def wrapper(self: 'ASTConverter', ast: T) -> U:
-        node = f(self, ast)
-        node.set_line(ast.lineno, ast.col_offset)
-        return node
-    return wrapper
+    """Mark a visit method whose result gets the line and column of the AST node.
+
+    The line is set by ASTConverter.visit() when it calls the method, which is
+    cheaper than wrapping each method in another function.  Methods that are
+    called directly must set the line themselves.
+    """
+    f.with_line = True  # type: ignore
+    return f
 
 
 def find(f: Callable[[V], bool], seq: Sequence[V]) -> V:
@@ -127,17 +120,44 @@ class ASTConverter(ast27.NodeTransformer):
                  custom_typing_module: str = None) -> None:
         self.class_nesting = 0
         self.imports = []  # type: List[ImportBase]
+        self.node_index = NodeIndex()
 
         self.pyversion = pyversion
         self.is_stub = is_stub
         self.custom_typing_module = custom_typing_module
+        self.visitor_cache = self.visitor_caches.setdefault(type(self), {})
+
+    # Map from converter class to a map from AST node type to (visit method,
+    # does the method have @with_line?).  A subclass may override visit
+    # methods, so each class needs its own map.
+    visitor_caches = {}  # type: Dict[type, Dict[type, Tuple[Callable[..., Any], bool]]]
+
+    def visit(self, node: Optional[ast27.AST]) -> Any:
+        """Convert an AST node (or None) to the corresponding mypy node.
+
+        This is called for every AST node, so instead of building the method
+        name and calling getattr() each time like NodeTransformer.visit(), it
+        caches visit methods by node type.
+        """
+        if node is None:
+            return None
+        typeobj = type(node)
+        entry = self.visitor_cache.get(typeobj)
+        if entry is None:
+            cls = type(self)
+            method = getattr(cls, 'visit_' + typeobj.__name__, cls.generic_visit)
+            entry = (method, getattr(method, 'with_line', False))
+            self.visitor_cache[typeobj] = entry
+        method, set_line = entry
+        result = method(self, node)
+        if set_line:
+            result.line = node.lineno
+            result.column = node.col_offset
+        return result
 
     def generic_visit(self, node: ast27.AST) -> None:
         raise RuntimeError('AST node not implemented: ' + str(type(node)))
 
-    def visit_NoneType(self, n: Any) -> Optional[Node]:
-        return None
-
     def translate_expr_list(self, l: Sequence[ast27.AST]) -> List[Expression]:
         res = []  # type: List[Expression]
         for e in l:
@@ -252,18 +272,19 @@ class ASTConverter(ast27.NodeTransformer):
     def visit_Module(self, mod: ast27.Module) -> MypyFile:
         body = self.fix_function_overloads(self.translate_stmt_list(mod.body))
 
-        return MypyFile(body,
+        tree = MypyFile(body,
                         self.imports,
                         False,
                         {ti.lineno for ti in mod.type_ignores},
                         )
+        tree.node_index = self.node_index
+        return tree
 
     # --- stmt ---
     # FunctionDef(identifier name, arguments args,
     #             stmt* body, expr* decorator_list, expr? returns, string? type_comment)
     # arguments = (arg* args, arg? vararg, arg* kwonlyargs, expr* kw_defaults,
     #              arg? kwarg, expr* defaults)
-    @with_line
     def visit_FunctionDef(self, n: ast27.FunctionDef) -> Statement:
         converter = TypeConverter(line=n.lineno)
         args = self.transform_args(n.args, n.lineno)
@@ -273,7 +294,7 @@ class ASTConverter(ast27.NodeTransformer):
         arg_types = None  # type: List[Type]
         if n.type_comment is not None and len(n.type_comment) > 0:
             try:
-                func_type_ast = ast35.parse(n.type_comment, '<func_type>', 'func_type')
+                func_type_ast = parse_type_comment_ast(n.type_comment, 'func_type')
             except SyntaxError:
                 raise TypeCommentParseError(TYPE_COMMENT_SYNTAX_ERROR, n.lineno, n.col_offset)
             assert isinstance(func_type_ast, ast35.FunctionType)
@@ -308,10 +329,14 @@ class ASTConverter(ast27.NodeTransformer):
                                      return_type if return_type is not None else AnyType(),
                                      None)
 
+        self.node_index.func_depth += 1
+        body = self.as_block(n.body, n.lineno)
+        self.node_index.func_depth -= 1
         func_def = FuncDef(n.name,
                        args,
-                       self.as_block(n.body, n.lineno),
+                       body,
                        func_type)
+        self.node_index.add_func_def(func_def)
         if func_type is not None:
             func_type.definition = func_def
             func_type.line = n.lineno
@@ -324,8 +349,12 @@ class ASTConverter(ast27.NodeTransformer):
             func_def.is_decorated = True
             func_def.set_line(n.lineno + len(n.decorator_list))
             func_def.body.set_line(func_def.get_line())
-            return Decorator(func_def, self.translate_expr_list(n.decorator_list), var)
+            dec = Decorator(func_def, self.translate_expr_list(n.decorator_list), var)
+            dec.set_line(n.lineno, n.col_offset)
+            return dec
         else:
+            # Use set_line() since it also sets the line of the arguments.
+            func_def.set_line(n.lineno, n.col_offset)
             return func_def
 
     def set_type_optional(self, type: Type, initializer: Expression) -> None:
@@ -403,13 +432,17 @@ class ASTConverter(ast27.NodeTransformer):
     def visit_ClassDef(self, n: ast27.ClassDef) -> ClassDef:
         self.class_nesting += 1
 
+        self.node_index.class_depth += 1
+        body = self.as_block(n.body, n.lineno)
+        self.node_index.class_depth -= 1
         cdef = ClassDef(n.name,
-                        self.as_block(n.body, n.lineno),
+                        body,
                         None,
                         self.translate_expr_list(n.bases),
                         metaclass=None)
         cdef.decorators = self.translate_expr_list(n.decorator_list)
         self.class_nesting -= 1
+        self.node_index.add_class_def(cdef)
         return cdef
 
     # Return(expr? value)
@@ -684,14 +717,18 @@ class ASTConverter(ast27.NodeTransformer):
         return UnaryExpr(op, self.visit(n.operand))
 
     # Lambda(arguments args, expr body)
-    @with_line
     def visit_Lambda(self, n: ast27.Lambda) -> FuncExpr:
         body = ast27.Return(n.body)
         body.lineno = n.lineno
         body.col_offset = n.col_offset
 
-        return FuncExpr(self.transform_args(n.args, n.lineno),
-                        self.as_block([body], n.lineno))
+        args = self.transform_args(n.args, n.lineno)
+        self.node_index.func_depth += 1
+        e = FuncExpr(args, self.as_block([body], n.lineno))
+        self.node_index.func_depth -= 1
+        # Use set_line() since it also sets the line of the arguments.
+        e.set_line(n.lineno, n.col_offset)
+        return e
 
     # IfExp(expr test, expr body, expr orelse)
     @with_line
@@ -734,15 +771,17 @@ class ASTConverter(ast27.NodeTransformer):
                                        ifs_list)
 
     # GeneratorExp(expr elt, comprehension* generators)
-    @with_line
+    # (Also called directly for ListComp and SetComp, so set the line here.)
     def visit_GeneratorExp(self, n: ast27.GeneratorExp) -> GeneratorExpr:
         targets = [self.visit(c.target) for c in n.generators]
         iters = [self.visit(c.iter) for c in n.generators]
         ifs_list = [self.translate_expr_list(c.ifs) for c in n.generators]
-        return GeneratorExpr(self.visit(n.elt),
-                             targets,
-                             iters,
-                             ifs_list)
+        e = GeneratorExpr(self.visit(n.elt),
+                          targets,
+                          iters,
+                          ifs_list)
+        e.set_line(n.lineno, n.col_offset)
+        return e
 
     # Yield(expr? value)
     @with_line
@@ -782,10 +821,12 @@ class ASTConverter(ast27.NodeTransformer):
             arg_kinds.append(ARG_STAR2)
             signature.append(None)
 
-        return CallExpr(self.visit(n.func),
-                        self.translate_expr_list(arg_types),
-                        arg_kinds,
-                        cast("List[str]", signature))
+        e = CallExpr(self.visit(n.func),
+                     self.translate_expr_list(arg_types),
+                     arg_kinds,
+                     cast("List[str]", signature))
+        self.node_index.add_call_expr(e)
+        return e
 
     # Num(object n) -- a number as a PyObject.
     @with_line
@@ -12,8 +12,16 @@ from mypy.types import (CallableType, EllipsisType, Instance, Overloaded, TupleT
 from mypy.visitor import NodeVisitor
 
 
-def fixup_module_pass_one(tree: MypyFile, modules: Dict[str, MypyFile]) -> None:
-    node_fixer = NodeFixer(modules)
+def fixup_module_pass_one(tree: MypyFile, modules: Dict[str, MypyFile],
+                          index: Dict[str, SymbolTableNode] = None) -> None:
+    """Fix up cross-references in a deserialized module.
+
+    If index is given, it is used to remember the targets of resolved
+    cross-references by full name.  It can be shared by all modules
+    loaded from the cache in a build, since their symbol tables aren't
+    modified after loading.
+    """
+    node_fixer = NodeFixer(modules, index=index)
     node_fixer.visit_symbol_table(tree.names)
 
 
@@ -34,10 +42,14 @@ def compute_all_mros(symtab: SymbolTable, modules: Dict[str, MypyFile]) -> None:
 class NodeFixer(NodeVisitor[None]):
     current_info = None  # type: Optional[TypeInfo]
 
-    def __init__(self, modules: Dict[str, MypyFile], type_fixer: 'TypeFixer' = None) -> None:
+    def __init__(self, modules: Dict[str, MypyFile], type_fixer: 'TypeFixer' = None,
+                 index: Dict[str, SymbolTableNode] = None) -> None:
         self.modules = modules
+        if index is None:
+            index = {}
+        self.index = index
         if type_fixer is None:
-            type_fixer = TypeFixer(self.modules)
+            type_fixer = TypeFixer(self.modules, index)
         self.type_fixer = type_fixer
 
     # NOTE: This method isn't (yet) part of the NodeVisitor API.
@@ -68,11 +80,11 @@ class NodeFixer(NodeVisitor[None]):
         for key, value in list(symtab.items()):
             cross_ref = value.cross_ref
             if cross_ref is not None:  # Fix up cross-reference.
-                del value.cross_ref
+                value.cross_ref = None
                 if cross_ref in self.modules:
                     value.node = self.modules[cross_ref]
                 else:
-                    stnode = lookup_qualified_stnode(self.modules, cross_ref)
+                    stnode = lookup_qualified_stnode(self.modules, cross_ref, self.index)
                     assert stnode is not None, "Could not find cross-ref %s" % (cross_ref,)
                     value.node = stnode.node
                     value.type_override = stnode.type_override
@@ -128,16 +140,20 @@ class NodeFixer(NodeVisitor[None]):
 
 
 class TypeFixer(TypeVisitor[None]):
-    def __init__(self, modules: Dict[str, MypyFile]) -> None:
+    def __init__(self, modules: Dict[str, MypyFile],
+                 index: Dict[str, SymbolTableNode] = None) -> None:
         self.modules = modules
+        if index is None:
+            index = {}
+        self.index = index
 
     def visit_instance(self, inst: Instance) -> None:
         # TODO: Combine Instances that are exactly the same?
         type_ref = inst.type_ref
         if type_ref is None:
             return  # We've already been here.
-        del inst.type_ref
-        node = lookup_qualified(self.modules, type_ref)
+        inst.type_ref = None
+        node = lookup_qualified(self.modules, type_ref, self.index)
         if isinstance(node, TypeInfo):
             inst.type = node
             # TODO: Is this needed or redundant?
@@ -219,15 +235,28 @@ class TypeFixer(TypeVisitor[None]):
         t.item.accept(self)
 
 
-def lookup_qualified(modules: Dict[str, MypyFile], name: str) -> SymbolNode:
-    stnode = lookup_qualified_stnode(modules, name)
+def lookup_qualified(modules: Dict[str, MypyFile], name: str,
+                     index: Dict[str, SymbolTableNode] = None) -> SymbolNode:
+    stnode = lookup_qualified_stnode(modules, name, index)
     if stnode is None:
         return None
     else:
         return stnode.node
 
 
-def lookup_qualified_stnode(modules: Dict[str, MypyFile], name: str) -> SymbolTableNode:
+def lookup_qualified_stnode(modules: Dict[str, MypyFile], name: str,
+                            index: Dict[str, SymbolTableNode] = None) -> SymbolTableNode:
+    """Find the symbol table node for a full name.
+
+    If index is given, use it as a cache of previously found nodes by
+    full name.
+    """
+    if index is not None:
+        stnode = index.get(name)
+        if stnode is None:
+            stnode = lookup_qualified_stnode(modules, name)
+            index[name] = stnode
+        return stnode
     head = name
     rest = []
     while True:
@@ -6,9 +6,14 @@ from mypy.types import TypeVisitor
 from mypy.nodes import MODULE_REF
 import mypy.nodes as nodes
 import mypy.types as types
+from mypy.typeintern import is_interned, TypeCache
 from mypy.util import split_module_names
 
 
+# Modules referred to by interned types
+indirection_cache = TypeCache('indirection')
+
+
 def extract_module_names(type_name: Optional[str]) -> List[str]:
     """Returns the module names of a fully qualified type name."""
     if type_name is not None:
@@ -19,85 +24,131 @@ def extract_module_names(type_name: Optional[str]) -> List[str]:
         return []
 
 
-class TypeIndirectionVisitor(TypeVisitor[Set[str]]):
-    """Returns all module references within a particular type."""
+class TypeIndirectionVisitor(TypeVisitor[None]):
+    """Returns all module references within a particular type.
+
+    The modules are collected into a single set while visiting the types.
+    The results for interned types are remembered for the whole build, and
+    those for plain instances (without type arguments) for each TypeInfo.
+    Other types are only skipped if they are seen again during the same call
+    to find_modules(), since they aren't shared between modules and keeping
+    them would keep all types of the build alive.  The sets in the caches
+    must not be modified.
+    """
 
     def __init__(self) -> None:
-        self.cache = {}  # type: Dict[types.Type, Set[str]]
+        self.output = set()  # type: Set[str]
+        # Ids of types that aren't interned that have been visited
+        self.seen = set()  # type: Set[int]
+        # Results for plain instances of each class
+        self.info_cache = {}  # type: Dict[nodes.TypeInfo, Set[str]]
 
     def find_modules(self, typs: Iterable[types.Type]) -> Set[str]:
-        return self._visit(*typs)
-
-    def _visit(self, *typs: types.Type) -> Set[str]:
-        output = set()  # type: Set[str]
+        self.output = set()
+        try:
+            self._visit(typs)
+            return self.output
+        finally:
+            self.seen.clear()
+
+    def _visit(self, typs: Iterable[types.Type]) -> None:
         for typ in typs:
-            if typ in self.cache:
-                modules = self.cache[typ]
-            else:
-                modules = typ.accept(self)
-                self.cache[typ] = set(modules)
-            output.update(modules)
-        return output
-
-    def visit_unbound_type(self, t: types.UnboundType) -> Set[str]:
-        return self._visit(*t.args)
-
-    def visit_type_list(self, t: types.TypeList) -> Set[str]:
-        return self._visit(*t.items)
-
-    def visit_error_type(self, t: types.ErrorType) -> Set[str]:
-        return set()
-
-    def visit_any(self, t: types.AnyType) -> Set[str]:
-        return set()
-
-    def visit_void(self, t: types.Void) -> Set[str]:
-        return set()
-
-    def visit_none_type(self, t: types.NoneTyp) -> Set[str]:
-        return set()
-
-    def visit_uninhabited_type(self, t: types.UninhabitedType) -> Set[str]:
-        return set()
-
-    def visit_erased_type(self, t: types.ErasedType) -> Set[str]:
-        return set()
-
-    def visit_deleted_type(self, t: types.DeletedType) -> Set[str]:
-        return set()
-
-    def visit_type_var(self, t: types.TypeVarType) -> Set[str]:
-        return self._visit(*t.values) | self._visit(t.upper_bound)
-
-    def visit_instance(self, t: types.Instance) -> Set[str]:
-        out = self._visit(*t.args)
+            if isinstance(typ, types.Instance) and not typ.args and typ.type is not None:
+                modules = self.info_cache.get(typ.type)
+                if modules is None:
+                    modules = set(split_module_names(typ.type.module_name))
+                    self.info_cache[typ.type] = modules
+                self.output.update(modules)
+            elif is_interned(typ):
+                self.output.update(self.interned_modules(typ))
+            elif id(typ) not in self.seen:
+                indirection_cache.uncached += 1
+                self.seen.add(id(typ))
+                typ.accept(self)
+
+    def interned_modules(self, typ: types.Type) -> Set[str]:
+        """Return the modules referred to by an interned type.
+
+        Not all components of an interned type are canonical (the item of a
+        TypeType isn't, for example), so the result is computed without the
+        types seen so far in order not to leave any out.
+        """
+        modules = indirection_cache.get(typ)
+        if modules is None:
+            output = self.output
+            seen = self.seen
+            self.output = set()
+            self.seen = set()
+            try:
+                typ.accept(self)
+                modules = self.output
+            finally:
+                self.output = output
+                self.seen = seen
+            indirection_cache.set(typ, modules)
+        return modules
+
+    def visit_unbound_type(self, t: types.UnboundType) -> None:
+        self._visit(t.args)
+
+    def visit_type_list(self, t: types.TypeList) -> None:
+        self._visit(t.items)
+
+    def visit_error_type(self, t: types.ErrorType) -> None:
+        pass
+
+    def visit_any(self, t: types.AnyType) -> None:
+        pass
+
+    def visit_void(self, t: types.Void) -> None:
+        pass
+
+    def visit_none_type(self, t: types.NoneTyp) -> None:
+        pass
+
+    def visit_uninhabited_type(self, t: types.UninhabitedType) -> None:
+        pass
+
+    def visit_erased_type(self, t: types.ErasedType) -> None:
+        pass
+
+    def visit_deleted_type(self, t: types.DeletedType) -> None:
+        pass
+
+    def visit_type_var(self, t: types.TypeVarType) -> None:
+        self._visit(t.values)
+        self._visit([t.upper_bound])
+
+    def visit_instance(self, t: types.Instance) -> None:
+        self._visit(t.args)
         if t.type is not None:
-            out.update(split_module_names(t.type.module_name))
-        return out
+            self.output.update(split_module_names(t.type.module_name))
 
-    def visit_callable_type(self, t: types.CallableType) -> Set[str]:
-        out = self._visit(*t.arg_types) | self._visit(t.ret_type)
+    def visit_callable_type(self, t: types.CallableType) -> None:
+        self._visit(t.arg_types)
+        self._visit([t.ret_type])
         if t.definition is not None:
-            out.update(extract_module_names(t.definition.fullname()))
-        return out
+            self.output.update(extract_module_names(t.definition.fullname()))
 
-    def visit_overloaded(self, t: types.Overloaded) -> Set[str]:
-        return self._visit(*t.items()) | self._visit(t.fallback)
+    def visit_overloaded(self, t: types.Overloaded) -> None:
+        self._visit(t.items())
+        self._visit([t.fallback])
 
-    def visit_tuple_type(self, t: types.TupleType) -> Set[str]:
-        return self._visit(*t.items) | self._visit(t.fallback)
+    def visit_tuple_type(self, t: types.TupleType) -> None:
+        self._visit(t.items)
+        self._visit([t.fallback])
 
-    def visit_star_type(self, t: types.StarType) -> Set[str]:
-        return set()
+    def visit_star_type(self, t: types.StarType) -> None:
+        pass
 
-    def visit_union_type(self, t: types.UnionType) -> Set[str]:
-        return self._visit(*t.items)
+    def visit_union_type(self, t: types.UnionType) -> None:
+        self._visit(t.items)
 
-    def visit_partial_type(self, t: types.PartialType) -> Set[str]:
-        return set()
+    def visit_partial_type(self, t: types.PartialType) -> None:
+        pass
 
-    def visit_ellipsis_type(self, t: types.EllipsisType) -> Set[str]:
-        return set()
+    def visit_ellipsis_type(self, t: types.EllipsisType) -> None:
+        pass
 
-    def visit_type_type(self, t: types.TypeType) -> Set[str]:
-        return self._visit(t.item)
+    def visit_type_type(self, t: types.TypeType) -> None:
+        self._visit([t.item])
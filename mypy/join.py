@@ -10,10 +10,15 @@ from mypy.types import (
 )
 from mypy.maptype import map_instance_to_supertype
 from mypy.subtypes import is_subtype, is_equivalent, is_subtype_ignoring_tvars
+from mypy.typeintern import intern_copy, is_interned_without_type_vars, TypeCache
 
 from mypy import experiments
 
 
+# Joins of interned types that don't contain type variables
+join_cache = TypeCache('Join')
+
+
 def join_simple(declaration: Type, s: Type, t: Type) -> Type:
     """Return a simple least upper bound given the declared type."""
 
@@ -64,7 +69,21 @@ def join_types(s: Type, t: Type) -> Type:
     For example, the join of 'int' and 'object' is 'object'.
 
     If the join does not exist, return an ErrorType instance.
+
+    Joins of interned types without type variables are memoized.
     """
+    if is_interned_without_type_vars(s) and is_interned_without_type_vars(t):
+        key = (s, t)
+        result = join_cache.get(key)
+        if result is None:
+            result = intern_copy(join_types_uncached(s, t))
+            join_cache.set(key, result)
+        return result
+    join_cache.uncached += 1
+    return join_types_uncached(s, t)
+
+
+def join_types_uncached(s: Type, t: Type) -> Type:
     if (s.can_be_true, s.can_be_false) != (t.can_be_true, t.can_be_false):
         # if types are restricted in different ways, use the more general versions
         s = true_or_false(s)
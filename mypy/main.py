@@ -178,6 +178,9 @@ def process_options(args: List[str],
                         help="enable experimental fast parser")
     parser.add_argument('-i', '--incremental', action='store_true',
                         help="enable experimental module cache")
+    parser.add_argument('--interface-only-deps', action='store_true',
+                        help="skip function bodies of imported modules that aren't "
+                        "being checked (experimental)")
     parser.add_argument('--cache-dir', action='store', metavar='DIR',
                         help="store module cache info in the given folder in incremental mode "
                         "(defaults to '{}')".format(defaults.CACHE_DIR))
@@ -239,6 +242,10 @@ def process_options(args: List[str],
         report_group.add_argument('--%s-report' % report_type.replace('_', '-'),
                                   metavar='DIR',
                                   dest='special-opts:%s_report' % report_type)
+    report_group.add_argument('--validate-xml-reports', action='store_true',
+                              help="check XML reports against the schema (slow)")
+    report_group.add_argument('--report-jobs', type=int, metavar='N',
+                              help="render the reports of the files using N processes")
 
     code_group = parser.add_argument_group(title='How to specify the code to type check')
     code_group.add_argument('-m', '--module', action='append', metavar='MODULE',
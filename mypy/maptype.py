@@ -2,7 +2,7 @@ from typing import Dict, List, cast
 
 from mypy.expandtype import expand_type
 from mypy.nodes import TypeInfo
-from mypy.types import Type, TypeVarId, Instance, AnyType
+from mypy.types import Type, TypeVarId, Instance, AnyType, TypeVarType
 
 
 def map_instance_to_supertype(instance: Instance,
@@ -20,7 +20,17 @@ def map_instance_to_supertype(instance: Instance,
         # Fast path: `superclass` has no type variables to map to.
         return Instance(superclass, [])
 
-    return map_instance_to_supertypes(instance, superclass)[0]
+    # The mapping only depends on the classes, so it's computed once for the
+    # class applied to its own type variables, and the actual type arguments
+    # are substituted into the result.
+    maps = instance.type.supertype_maps()
+    generic = maps.get(superclass)
+    if generic is None:
+        self_type = Instance(instance.type,
+                             [TypeVarType(tv) for tv in instance.type.defn.type_vars])
+        generic = map_instance_to_supertypes(self_type, superclass)[0]
+        maps[superclass] = generic
+    return cast(Instance, expand_type(generic, instance_to_type_environment(instance)))
 
 
 def map_instance_to_supertypes(instance: Instance,
@@ -7,14 +7,34 @@ from mypy.types import (
     DeletedType, UninhabitedType, TypeType
 )
 from mypy.subtypes import is_subtype
+from mypy.typeintern import intern_copy, is_interned_without_type_vars, TypeCache
 
 from mypy import experiments
 
 # TODO Describe this module.
 
 
+# Meets of interned types that don't contain type variables
+meet_cache = TypeCache('Meet')
+
+
 def meet_types(s: Type, t: Type) -> Type:
-    """Return the greatest lower bound of two types."""
+    """Return the greatest lower bound of two types.
+
+    Meets of interned types without type variables are memoized.
+    """
+    if is_interned_without_type_vars(s) and is_interned_without_type_vars(t):
+        key = (s, t)
+        result = meet_cache.get(key)
+        if result is None:
+            result = intern_copy(meet_types_uncached(s, t))
+            meet_cache.set(key, result)
+        return result
+    meet_cache.uncached += 1
+    return meet_types_uncached(s, t)
+
+
+def meet_types_uncached(s: Type, t: Type) -> Type:
     if isinstance(s, ErasedType):
         return s
     if isinstance(s, AnyType):
@@ -147,6 +147,9 @@ class MessageBuilder:
 
         Mostly behave like format_simple below, but never return an empty string.
         """
+        if self.disable_count > 0:
+            # Nothing will be reported, so don't bother formatting the type.
+            return 'object'
         s = self.format_simple(typ, verbosity)
         if s != '':
             # If format_simple returns a non-trivial result, use that.
@@ -190,6 +193,8 @@ class MessageBuilder:
           None -> None
           callable type -> "" (empty string)
         """
+        if self.disable_count > 0:
+            return ''
         if isinstance(typ, Instance):
             itype = typ
             # Get the short name of the type.
@@ -278,6 +283,8 @@ class MessageBuilder:
 
         Increase the verbosity of the type strings until they become distinct.
         """
+        if self.disable_count > 0:
+            return ('object', 'object')
         verbosity = 0
         for verbosity in range(3):
             str1 = self.format(type1, verbosity=verbosity)
@@ -10,11 +10,14 @@ from typing import (
 from mypy.lex import Token
 import mypy.strconv
 from mypy.visitor import NodeVisitor
-from mypy.util import dump_tagged, short_type
+from mypy.util import dump_tagged, short_type, SlotDefaultsMeta
 
 
 class Context:
     """Base type for objects that are valid as error message locations."""
+
+    __slots__ = ()
+
     @abstractmethod
     def get_line(self) -> int: pass
 
@@ -31,6 +34,11 @@ T = TypeVar('T')
 
 JsonDict = Dict[str, Any]
 
+# Values of type variables with value restrictions and the types of expressions
+# in a function type checked using these values
+Expansion = Tuple[Dict['mypy.types.TypeVarId', 'mypy.types.Type'],
+                  Dict['Expression', 'mypy.types.Type']]
+
 
 # Symbol table node kinds
 #
@@ -94,8 +102,16 @@ reverse_type_aliases = dict((name.replace('__builtins__', 'builtins'), alias)
 Key = tuple
 
 
-class Node(Context):
-    """Common base class for all non-type parse tree nodes."""
+class Node(Context, metaclass=SlotDefaultsMeta):
+    """Common base class for all non-type parse tree nodes.
+
+    Nodes are the bulk of the memory used by mypy, so all node classes
+    define __slots__.  Class-level attribute values are used as defaults
+    for the corresponding slots (see SlotDefaultsMeta), and subclasses can
+    override them.
+    """
+
+    __slots__ = ('line', 'column', 'literal', 'literal_hash')
 
     line = -1
     column = -1
@@ -140,10 +156,14 @@ class Node(Context):
 class Statement(Node):
     """A statement node."""
 
+    __slots__ = ()
+
 
 class Expression(Node):
     """An expression node."""
 
+    __slots__ = ()
+
 # TODO:
 # Lvalue = Union['NameExpr', 'MemberExpr', 'IndexExpr', 'SuperExpr', 'StarExpr'
 #                'TupleExpr', 'ListExpr']; see #1783.
@@ -189,6 +209,8 @@ Lvalue = Expression
 #   of an index expression, or the operands of an operator expression).
 
 class SymbolNode(Node):
+    __slots__ = ()
+
     # Nodes that can be stored in a symbol table.
 
     # TODO do not use methods for these
@@ -216,6 +238,9 @@ class SymbolNode(Node):
 class MypyFile(SymbolNode):
     """The abstract syntax tree of a single source file."""
 
+    __slots__ = ('_name', '_fullname', 'path', 'defs', 'is_bom', 'names', 'imports',
+                 'ignored_lines', 'is_stub', 'node_index')
+
     # Module name ('__main__' for initial file)
     _name = None      # type: str
     # Fully qualified module name
@@ -233,6 +258,9 @@ class MypyFile(SymbolNode):
     ignored_lines = None  # type: Set[int]
     # Is this file represented by a stub file (.pyi)?
     is_stub = False
+    # Definitions and calls within the file, as collected by the parser (None
+    # if not available, such as for deserialized trees)
+    node_index = None  # type: NodeIndex
 
     def __init__(self,
                  defs: List[Statement],
@@ -282,8 +310,41 @@ class MypyFile(SymbolNode):
         return tree
 
 
+class NodeIndex:
+    """Function definitions, class definitions and calls within a file.
+
+    The parser collects these (also nested ones) so that tools that are
+    only interested in them don't need to traverse the whole tree.  Each
+    entry is a tuple (node, functions, classes), where functions and
+    classes are the numbers of functions (including lambdas) and classes
+    whose bodies contain the node.  The entries are in the order in which
+    the parser created the nodes, which isn't always source order.
+    """
+
+    def __init__(self) -> None:
+        self.func_defs = []  # type: List[Tuple[FuncDef, int, int]]
+        self.class_defs = []  # type: List[Tuple[ClassDef, int, int]]
+        self.call_exprs = []  # type: List[Tuple[CallExpr, int, int]]
+        # Numbers of function and class bodies around the current position
+        # during parsing
+        self.func_depth = 0
+        self.class_depth = 0
+
+    def add_func_def(self, node: 'FuncDef') -> None:
+        self.func_defs.append((node, self.func_depth, self.class_depth))
+
+    def add_class_def(self, node: 'ClassDef') -> None:
+        self.class_defs.append((node, self.func_depth, self.class_depth))
+
+    def add_call_expr(self, node: 'CallExpr') -> None:
+        self.call_exprs.append((node, self.func_depth, self.class_depth))
+
+
 class ImportBase(Statement):
     """Base class for all import statements."""
+
+    __slots__ = ('is_unreachable', 'is_top_level', 'assignments')
+
     is_unreachable = False
     is_top_level = False  # Set by semanal.FirstPass
     # If an import replaces existing definitions, we construct dummy assignment
@@ -301,6 +362,8 @@ class ImportBase(Statement):
 class Import(ImportBase):
     """import m [as n]"""
 
+    __slots__ = ('ids',)
+
     ids = None  # type: List[Tuple[str, Optional[str]]]     # (module id, as id)
 
     def __init__(self, ids: List[Tuple[str, Optional[str]]]) -> None:
@@ -314,6 +377,8 @@ class Import(ImportBase):
 class ImportFrom(ImportBase):
     """from m import x [as y], ..."""
 
+    __slots__ = ('id', 'relative', 'names')
+
     id = None  # type: str
     relative = None  # type: int
     names = None  # type: List[Tuple[str, Optional[str]]]  # Tuples (name, as name)
@@ -330,6 +395,9 @@ class ImportFrom(ImportBase):
 
 class ImportAll(ImportBase):
     """from m import *"""
+
+    __slots__ = ('id', 'relative')
+
     id = None  # type: str
     relative = None  # type: int
 
@@ -345,6 +413,8 @@ class ImportAll(ImportBase):
 class FuncBase(Node):
     """Abstract base class for function-like nodes"""
 
+    __slots__ = ('type', 'info', 'is_property', '_fullname')
+
     # Type signature. This is usually CallableType or Overloaded, but it can be something else for
     # decorated functions/
     type = None  # type: mypy.types.Type
@@ -367,6 +437,8 @@ class OverloadedFuncDef(FuncBase, SymbolNode, Statement):
     Overloaded variants must be consecutive in the source file.
     """
 
+    __slots__ = ('items',)
+
     items = None  # type: List[Decorator]
 
     def __init__(self, items: List['Decorator']) -> None:
@@ -402,6 +474,8 @@ class OverloadedFuncDef(FuncBase, SymbolNode, Statement):
 class Argument(Node):
     """A single argument in a FuncItem."""
 
+    __slots__ = ('variable', 'type_annotation', 'initializer', 'kind', 'initialization_statement')
+
     variable = None  # type: Var
     type_annotation = None  # type: Optional[mypy.types.Type]
     initializer = None  # type: Optional[Expression]
@@ -447,6 +521,10 @@ class Argument(Node):
 
 
 class FuncItem(FuncBase):
+    __slots__ = ('arguments', 'arg_names', 'arg_kinds', 'min_args', 'max_pos', 'body',
+                 'is_overload', 'is_generator', 'is_coroutine', 'is_awaitable_coroutine',
+                 'is_static', 'is_class', 'expansions')
+
     arguments = []  # type: List[Argument]
     arg_names = []  # type: List[str]
     arg_kinds = []  # type: List[int]
@@ -462,8 +540,9 @@ class FuncItem(FuncBase):
     is_awaitable_coroutine = False  # Decorated with '@{typing,asyncio}.coroutine'?
     is_static = False      # Uses @staticmethod?
     is_class = False       # Uses @classmethod?
-    # Variants of function with type variables with values expanded
-    expanded = None  # type: List[FuncItem]
+    # Expansions for each combination of values of type variables with value
+    # restrictions (empty if there are no such type variables)
+    expansions = None  # type: List[Expansion]
 
     FLAGS = [
         'is_overload', 'is_generator', 'is_coroutine', 'is_awaitable_coroutine',
@@ -478,7 +557,7 @@ class FuncItem(FuncBase):
         self.max_pos = self.arg_kinds.count(ARG_POS) + self.arg_kinds.count(ARG_OPT)
         self.body = body
         self.type = typ
-        self.expanded = []
+        self.expansions = []
 
         self.min_args = 0
         for i in range(len(self.arguments)):
@@ -503,6 +582,8 @@ class FuncDef(FuncItem, SymbolNode, Statement):
     This is a non-lambda function defined using 'def'.
     """
 
+    __slots__ = ('_name', 'is_decorated', 'is_conditional', 'is_abstract', 'original_def')
+
     is_decorated = False
     is_conditional = False             # Defined conditionally (within block)?
     is_abstract = False
@@ -541,7 +622,7 @@ class FuncDef(FuncItem, SymbolNode, Statement):
                 'arg_kinds': self.arg_kinds,
                 'type': None if self.type is None else self.type.serialize(),
                 'flags': get_flags(self, FuncDef.FLAGS),
-                # TODO: Do we need expanded, original_def?
+                # TODO: Do we need expansions, original_def?
                 }
 
     @classmethod
@@ -571,6 +652,8 @@ class Decorator(SymbolNode, Statement):
     A single Decorator object can include any number of function decorators.
     """
 
+    __slots__ = ('func', 'decorators', 'var', 'is_overload')
+
     func = None  # type: FuncDef                # Decorated function
     decorators = None  # type: List[Expression] # Decorators, at least one  # XXX Not true
     var = None  # type: Var                     # Represents the decorated function obj
@@ -615,6 +698,10 @@ class Var(SymbolNode):
     It can refer to global/local variable or a data attribute.
     """
 
+    __slots__ = ('_name', '_fullname', 'info', 'type', 'is_self', 'is_ready',
+                 'is_initialized_in_class', 'is_staticmethod', 'is_classmethod', 'is_property',
+                 'is_settable_property', 'is_suppressed_import')
+
     _name = None      # type: str   # Name without module prefix
     _fullname = None  # type: str   # Name with module prefix
     info = None  # type: TypeInfo   # Defining class (for member variables)
@@ -678,6 +765,9 @@ class Var(SymbolNode):
 class ClassDef(Statement):
     """Class definition"""
 
+    __slots__ = ('name', 'fullname', 'defs', 'type_vars', 'base_type_exprs', 'info', 'metaclass',
+                 'decorators', 'has_incompatible_baseclass')
+
     name = None  # type: str       # Name of the class without module prefix
     fullname = None  # type: str   # Fully qualified name of the class
     defs = None  # type: Block
@@ -732,6 +822,8 @@ class ClassDef(Statement):
 class GlobalDecl(Statement):
     """Declaration global x, y, ..."""
 
+    __slots__ = ('names',)
+
     names = None  # type: List[str]
 
     def __init__(self, names: List[str]) -> None:
@@ -744,6 +836,8 @@ class GlobalDecl(Statement):
 class NonlocalDecl(Statement):
     """Declaration nonlocal x, y, ..."""
 
+    __slots__ = ('names',)
+
     names = None  # type: List[str]
 
     def __init__(self, names: List[str]) -> None:
@@ -754,6 +848,8 @@ class NonlocalDecl(Statement):
 
 
 class Block(Statement):
+    __slots__ = ('body', 'is_unreachable')
+
     body = None  # type: List[Statement]
     # True if we can determine that this block is not executed. For example,
     # this applies to blocks that are protected by something like "if PY3:"
@@ -772,6 +868,9 @@ class Block(Statement):
 
 class ExpressionStmt(Statement):
     """An expression as a statement, such as print(s)."""
+
+    __slots__ = ('expr',)
+
     expr = None  # type: Expression
 
     def __init__(self, expr: Expression) -> None:
@@ -790,6 +889,8 @@ class AssignmentStmt(Statement):
     An lvalue can be NameExpr, TupleExpr, ListExpr, MemberExpr, IndexExpr.
     """
 
+    __slots__ = ('lvalues', 'rvalue', 'type', 'new_syntax')
+
     lvalues = None  # type: List[Lvalue]
     rvalue = None  # type: Expression
     # Declared type in a comment, may be None.
@@ -811,6 +912,8 @@ class AssignmentStmt(Statement):
 class OperatorAssignmentStmt(Statement):
     """Operator assignment statement such as x += 1"""
 
+    __slots__ = ('op', 'lvalue', 'rvalue')
+
     op = ''
     lvalue = None  # type: Lvalue
     rvalue = None  # type: Expression
@@ -825,6 +928,8 @@ class OperatorAssignmentStmt(Statement):
 
 
 class WhileStmt(Statement):
+    __slots__ = ('expr', 'body', 'else_body')
+
     expr = None  # type: Expression
     body = None  # type: Block
     else_body = None  # type: Block
@@ -839,6 +944,8 @@ class WhileStmt(Statement):
 
 
 class ForStmt(Statement):
+    __slots__ = ('index', 'expr', 'body', 'else_body', 'is_async')
+
     # Index variables
     index = None  # type: Lvalue
     # Expression to iterate
@@ -859,6 +966,8 @@ class ForStmt(Statement):
 
 
 class ReturnStmt(Statement):
+    __slots__ = ('expr',)
+
     expr = None  # type: Optional[Expression]
 
     def __init__(self, expr: Optional[Expression]) -> None:
@@ -869,6 +978,8 @@ class ReturnStmt(Statement):
 
 
 class AssertStmt(Statement):
+    __slots__ = ('expr',)
+
     expr = None  # type: Expression
 
     def __init__(self, expr: Expression) -> None:
@@ -879,6 +990,8 @@ class AssertStmt(Statement):
 
 
 class DelStmt(Statement):
+    __slots__ = ('expr',)
+
     expr = None  # type: Lvalue
 
     def __init__(self, expr: Lvalue) -> None:
@@ -889,21 +1002,29 @@ class DelStmt(Statement):
 
 
 class BreakStmt(Statement):
+    __slots__ = ()
+
     def accept(self, visitor: NodeVisitor[T]) -> T:
         return visitor.visit_break_stmt(self)
 
 
 class ContinueStmt(Statement):
+    __slots__ = ()
+
     def accept(self, visitor: NodeVisitor[T]) -> T:
         return visitor.visit_continue_stmt(self)
 
 
 class PassStmt(Statement):
+    __slots__ = ()
+
     def accept(self, visitor: NodeVisitor[T]) -> T:
         return visitor.visit_pass_stmt(self)
 
 
 class IfStmt(Statement):
+    __slots__ = ('expr', 'body', 'else_body')
+
     expr = None  # type: List[Expression]
     body = None  # type: List[Block]
     else_body = None  # type: Block
@@ -919,6 +1040,8 @@ class IfStmt(Statement):
 
 
 class RaiseStmt(Statement):
+    __slots__ = ('expr', 'from_expr')
+
     expr = None  # type: Expression
     from_expr = None  # type: Expression
 
@@ -931,6 +1054,8 @@ class RaiseStmt(Statement):
 
 
 class TryStmt(Statement):
+    __slots__ = ('body', 'types', 'vars', 'handlers', 'else_body', 'finally_body')
+
     body = None  # type: Block                # Try body
     types = None  # type: List[Expression]    # Except type expressions
     vars = None  # type: List[NameExpr]     # Except variable names
@@ -953,6 +1078,8 @@ class TryStmt(Statement):
 
 
 class WithStmt(Statement):
+    __slots__ = ('expr', 'target', 'body', 'is_async')
+
     expr = None  # type: List[Expression]
     target = None  # type: List[Lvalue]
     body = None  # type: Block
@@ -971,6 +1098,8 @@ class WithStmt(Statement):
 class PrintStmt(Statement):
     """Python 2 print statement"""
 
+    __slots__ = ('args', 'newline', 'target')
+
     args = None  # type: List[Expression]
     newline = False
     # The file-like target object (given using >>).
@@ -988,6 +1117,8 @@ class PrintStmt(Statement):
 class ExecStmt(Statement):
     """Python 2 exec statement"""
 
+    __slots__ = ('expr', 'variables1', 'variables2')
+
     expr = None  # type: Expression
     variables1 = None  # type: Optional[Expression]
     variables2 = None  # type: Optional[Expression]
@@ -1009,6 +1140,8 @@ class ExecStmt(Statement):
 class IntExpr(Expression):
     """Integer literal"""
 
+    __slots__ = ('value',)
+
     value = 0
     literal = LITERAL_YES
 
@@ -1034,6 +1167,8 @@ class IntExpr(Expression):
 class StrExpr(Expression):
     """String literal"""
 
+    __slots__ = ('value',)
+
     value = ''
     literal = LITERAL_YES
 
@@ -1048,6 +1183,8 @@ class StrExpr(Expression):
 class BytesExpr(Expression):
     """Bytes literal"""
 
+    __slots__ = ('value',)
+
     value = ''  # TODO use bytes
     literal = LITERAL_YES
 
@@ -1062,6 +1199,8 @@ class BytesExpr(Expression):
 class UnicodeExpr(Expression):
     """Unicode literal (Python 2.x)"""
 
+    __slots__ = ('value',)
+
     value = ''  # TODO use bytes
     literal = LITERAL_YES
 
@@ -1076,6 +1215,8 @@ class UnicodeExpr(Expression):
 class FloatExpr(Expression):
     """Float literal"""
 
+    __slots__ = ('value',)
+
     value = 0.0
     literal = LITERAL_YES
 
@@ -1090,6 +1231,8 @@ class FloatExpr(Expression):
 class ComplexExpr(Expression):
     """Complex literal"""
 
+    __slots__ = ('value',)
+
     value = 0.0j
     literal = LITERAL_YES
 
@@ -1104,6 +1247,8 @@ class ComplexExpr(Expression):
 class EllipsisExpr(Expression):
     """Ellipsis (...)"""
 
+    __slots__ = ()
+
     def accept(self, visitor: NodeVisitor[T]) -> T:
         return visitor.visit_ellipsis(self)
 
@@ -1111,6 +1256,8 @@ class EllipsisExpr(Expression):
 class StarExpr(Expression):
     """Star expression"""
 
+    __slots__ = ('expr', 'valid')
+
     expr = None  # type: Expression
 
     def __init__(self, expr: Expression) -> None:
@@ -1128,6 +1275,8 @@ class StarExpr(Expression):
 class RefExpr(Expression):
     """Abstract base class for name-like constructs"""
 
+    __slots__ = ('kind', 'node', 'fullname', 'is_def')
+
     kind = None  # type: int      # LDEF/GDEF/MDEF/... (None if not available)
     node = None  # type: SymbolNode  # Var, FuncDef or TypeInfo that describes this
     fullname = None  # type: str  # Fully qualified name (or name if not global)
@@ -1145,6 +1294,8 @@ class NameExpr(RefExpr):
     This refers to a local name, global name or a module.
     """
 
+    __slots__ = ('name',)
+
     name = None  # type: str      # Name referred to (may be qualified)
 
     literal = LITERAL_TYPE
@@ -1183,6 +1334,8 @@ class NameExpr(RefExpr):
 class MemberExpr(RefExpr):
     """Member access expression x.y"""
 
+    __slots__ = ('expr', 'name', 'def_var')
+
     expr = None  # type: Expression
     name = None  # type: str
     # The variable node related to a definition.
@@ -1219,6 +1372,8 @@ class CallExpr(Expression):
     such as cast(...) and None  # type: ....
     """
 
+    __slots__ = ('callee', 'args', 'arg_kinds', 'arg_names', 'analyzed')
+
     callee = None  # type: Expression
     args = None  # type: List[Expression]
     arg_kinds = None  # type: List[int]  # ARG_ constants
@@ -1244,6 +1399,8 @@ class CallExpr(Expression):
 
 
 class YieldFromExpr(Expression):
+    __slots__ = ('expr',)
+
     expr = None  # type: Expression
 
     def __init__(self, expr: Expression) -> None:
@@ -1254,6 +1411,8 @@ class YieldFromExpr(Expression):
 
 
 class YieldExpr(Expression):
+    __slots__ = ('expr',)
+
     expr = None  # type: Optional[Expression]
 
     def __init__(self, expr: Optional[Expression]) -> None:
@@ -1269,6 +1428,8 @@ class IndexExpr(Expression):
     Also wraps type application such as List[int] as a special form.
     """
 
+    __slots__ = ('base', 'index', 'method_type', 'analyzed')
+
     base = None  # type: Expression
     index = None  # type: Expression
     # Inferred __getitem__ method type
@@ -1293,6 +1454,8 @@ class IndexExpr(Expression):
 class UnaryExpr(Expression):
     """Unary operation"""
 
+    __slots__ = ('op', 'expr', 'method_type')
+
     op = ''
     expr = None  # type: Expression
     # Inferred operator method type
@@ -1374,6 +1537,8 @@ class OpExpr(Expression):
     """Binary operation (other than . or [] or comparison operators,
     which have specific nodes)."""
 
+    __slots__ = ('op', 'left', 'right', 'method_type')
+
     op = ''
     left = None  # type: Expression
     right = None  # type: Expression
@@ -1394,6 +1559,8 @@ class OpExpr(Expression):
 class ComparisonExpr(Expression):
     """Comparison expression (e.g. a < b > c < d)."""
 
+    __slots__ = ('operators', 'operands', 'method_types')
+
     operators = None  # type: List[str]
     operands = None  # type: List[Expression]
     # Inferred type for the operator methods (when relevant; None for 'is').
@@ -1417,6 +1584,8 @@ class SliceExpr(Expression):
     This is only valid as index in index expressions.
     """
 
+    __slots__ = ('begin_index', 'end_index', 'stride')
+
     begin_index = None  # type: Optional[Expression]
     end_index = None  # type: Optional[Expression]
     stride = None  # type: Optional[Expression]
@@ -1435,6 +1604,8 @@ class SliceExpr(Expression):
 class CastExpr(Expression):
     """Cast expression cast(type, expr)."""
 
+    __slots__ = ('expr', 'type')
+
     expr = None  # type: Expression
     type = None  # type: mypy.types.Type
 
@@ -1449,6 +1620,8 @@ class CastExpr(Expression):
 class RevealTypeExpr(Expression):
     """Reveal type expression reveal_type(expr)."""
 
+    __slots__ = ('expr',)
+
     expr = None  # type: Expression
 
     def __init__(self, expr: Expression) -> None:
@@ -1461,6 +1634,8 @@ class RevealTypeExpr(Expression):
 class SuperExpr(Expression):
     """Expression super().name"""
 
+    __slots__ = ('name', 'info')
+
     name = ''
     info = None  # type: TypeInfo  # Type that contains this super expression
 
@@ -1474,6 +1649,8 @@ class SuperExpr(Expression):
 class FuncExpr(FuncItem, Expression):
     """Lambda expression"""
 
+    __slots__ = ()
+
     def name(self) -> str:
         return '<lambda>'
 
@@ -1489,6 +1666,8 @@ class FuncExpr(FuncItem, Expression):
 class ListExpr(Expression):
     """List literal expression [...]."""
 
+    __slots__ = ('items',)
+
     items = None  # type: List[Expression]
 
     def __init__(self, items: List[Expression]) -> None:
@@ -1504,6 +1683,8 @@ class ListExpr(Expression):
 class DictExpr(Expression):
     """Dictionary literal expression {key: value, ...}."""
 
+    __slots__ = ('items',)
+
     items = None  # type: List[Tuple[Expression, Expression]]
 
     def __init__(self, items: List[Tuple[Expression, Expression]]) -> None:
@@ -1523,6 +1704,8 @@ class DictExpr(Expression):
 class TupleExpr(Expression):
     """Tuple literal expression (..., ...)"""
 
+    __slots__ = ('items',)
+
     items = None  # type: List[Expression]
 
     def __init__(self, items: List[Expression]) -> None:
@@ -1538,6 +1721,8 @@ class TupleExpr(Expression):
 class SetExpr(Expression):
     """Set literal expression {value, ...}."""
 
+    __slots__ = ('items',)
+
     items = None  # type: List[Expression]
 
     def __init__(self, items: List[Expression]) -> None:
@@ -1553,6 +1738,8 @@ class SetExpr(Expression):
 class GeneratorExpr(Expression):
     """Generator expression ... for ... in ... [ for ...  in ... ] [ if ... ]."""
 
+    __slots__ = ('left_expr', 'sequences', 'condlists', 'indices')
+
     left_expr = None  # type: Expression
     sequences = None  # type: List[Expression]
     condlists = None  # type: List[List[Expression]]
@@ -1572,6 +1759,8 @@ class GeneratorExpr(Expression):
 class ListComprehension(Expression):
     """List comprehension (e.g. [x + 1 for x in a])"""
 
+    __slots__ = ('generator',)
+
     generator = None  # type: GeneratorExpr
 
     def __init__(self, generator: GeneratorExpr) -> None:
@@ -1584,6 +1773,8 @@ class ListComprehension(Expression):
 class SetComprehension(Expression):
     """Set comprehension (e.g. {x + 1 for x in a})"""
 
+    __slots__ = ('generator',)
+
     generator = None  # type: GeneratorExpr
 
     def __init__(self, generator: GeneratorExpr) -> None:
@@ -1596,6 +1787,8 @@ class SetComprehension(Expression):
 class DictionaryComprehension(Expression):
     """Dictionary comprehension (e.g. {k: v for k, v in a}"""
 
+    __slots__ = ('key', 'value', 'sequences', 'condlists', 'indices')
+
     key = None  # type: Expression
     value = None  # type: Expression
     sequences = None  # type: List[Expression]
@@ -1617,6 +1810,8 @@ class DictionaryComprehension(Expression):
 class ConditionalExpr(Expression):
     """Conditional expression (e.g. x if y else z)"""
 
+    __slots__ = ('cond', 'if_expr', 'else_expr')
+
     cond = None  # type: Expression
     if_expr = None  # type: Expression
     else_expr = None  # type: Expression
@@ -1633,6 +1828,8 @@ class ConditionalExpr(Expression):
 class BackquoteExpr(Expression):
     """Python 2 expression `...`."""
 
+    __slots__ = ('expr',)
+
     expr = None  # type: Expression
 
     def __init__(self, expr: Expression) -> None:
@@ -1645,6 +1842,8 @@ class BackquoteExpr(Expression):
 class TypeApplication(Expression):
     """Type application expr[type, ...]"""
 
+    __slots__ = ('expr', 'types')
+
     expr = None  # type: Expression
     types = None  # type: List[mypy.types.Type]
 
@@ -1673,6 +1872,8 @@ CONTRAVARIANT = 2  # type: int
 class TypeVarExpr(SymbolNode, Expression):
     """Type variable expression TypeVar(...)."""
 
+    __slots__ = ('_name', '_fullname', 'values', 'upper_bound', 'variance')
+
     _name = ''
     _fullname = ''
     # Value restriction: only types in the list are valid as values. If the
@@ -1728,6 +1929,8 @@ class TypeVarExpr(SymbolNode, Expression):
 class TypeAliasExpr(Expression):
     """Type alias expression (rvalue)."""
 
+    __slots__ = ('type',)
+
     type = None  # type: mypy.types.Type
 
     def __init__(self, type: 'mypy.types.Type') -> None:
@@ -1740,6 +1943,8 @@ class TypeAliasExpr(Expression):
 class NamedTupleExpr(Expression):
     """Named tuple expression namedtuple(...) or NamedTuple(...)."""
 
+    __slots__ = ('info',)
+
     # The class representation of this named tuple (its tuple_type attribute contains
     # the tuple item types)
     info = None  # type: TypeInfo
@@ -1754,6 +1959,8 @@ class NamedTupleExpr(Expression):
 class TypedDictExpr(Expression):
     """Typed dict expression TypedDict(...)."""
 
+    __slots__ = ('info',)
+
     # The class representation of this typed dict
     info = None  # type: TypeInfo
 
@@ -1767,6 +1974,8 @@ class TypedDictExpr(Expression):
 class PromoteExpr(Expression):
     """Ducktype class decorator expression _promote(...)."""
 
+    __slots__ = ('type',)
+
     type = None  # type: mypy.types.Type
 
     def __init__(self, type: 'mypy.types.Type') -> None:
@@ -1778,6 +1987,9 @@ class PromoteExpr(Expression):
 
 class NewTypeExpr(Expression):
     """NewType expression NewType(...)."""
+
+    __slots__ = ('name', 'old_type', 'info')
+
     name = None  # type: str
     old_type = None  # type: mypy.types.Type
 
@@ -1794,6 +2006,8 @@ class NewTypeExpr(Expression):
 class AwaitExpr(Expression):
     """Await expression (await ...)."""
 
+    __slots__ = ('expr',)
+
     expr = None  # type: Expression
 
     def __init__(self, expr: Expression) -> None:
@@ -1814,6 +2028,8 @@ class TempNode(Expression):
     some fixed type.
     """
 
+    __slots__ = ('type',)
+
     type = None  # type: mypy.types.Type
 
     def __init__(self, typ: 'mypy.types.Type') -> None:
@@ -1839,6 +2055,12 @@ class TypeInfo(SymbolNode):
     the appropriate number of arguments.
     """
 
+    __slots__ = ('_fullname', 'module_name', 'defn', 'mro', 'subtypes', 'names', 'is_abstract',
+                 'abstract_attributes', 'is_enum', 'fallback_to_any', 'type_vars', 'bases',
+                 '_promote', 'tuple_type', 'is_named_tuple', 'is_typed_dict', 'is_newtype',
+                 'alt_fullname', '_mro_cache_key', '_ancestor_names', '_supertype_maps',
+                 '_members', '_members_version', '_mro_versions')
+
     _fullname = None  # type: str          # Fully qualified name
     # Fully qualified name for the module this type was defined in. This
     # information is also in the fullname, but is harder to extract in the
@@ -1895,6 +2117,23 @@ class TypeInfo(SymbolNode):
     # Alternative to fullname() for 'anonymous' classes.
     alt_fullname = None  # type: Optional[str]
 
+    # Tables derived from the MRO: the full names of the classes in the MRO,
+    # and a map from each generic class in the MRO to this class (applied to
+    # its own type variables) mapped to it.  They are recomputed when the MRO
+    # is replaced; _mro_cache_key is the MRO they were computed from.
+    _mro_cache_key = None  # type: List[TypeInfo]
+    _ancestor_names = None  # type: Set[str]
+    _supertype_maps = None  # type: Dict[TypeInfo, mypy.types.Instance]
+    # Results of get() for this class.  They are discarded when the MRO is
+    # replaced or when the symbol table of a class in the MRO has changed.
+    # _mro_versions are the versions of these symbol tables when the results
+    # were cached.  Comparing them is only needed when some symbol table has
+    # changed since they were last compared (_members_version is the value of
+    # symbol_table_version at that time).
+    _members = None  # type: Dict[str, Optional[SymbolTableNode]]
+    _members_version = -1
+    _mro_versions = None  # type: List[int]
+
     FLAGS = [
         'is_abstract', 'is_enum', 'fallback_to_any', 'is_named_tuple',
         'is_typed_dict', 'is_newtype'
@@ -1929,11 +2168,21 @@ class TypeInfo(SymbolNode):
         return len(self.type_vars) > 0
 
     def get(self, name: str) -> 'SymbolTableNode':
+        if self._members is None or self._mro_cache_key is not self.mro:
+            self.reset_mro_caches()
+        elif self._members_version != symbol_table_version:
+            self.check_mro_versions()
+        members = self._members
+        if name in members:
+            return members[name]
+        result = None  # type: SymbolTableNode
         for cls in self.mro:
             n = cls.names.get(name)
             if n:
-                return n
-        return None
+                result = n
+                break
+        members[name] = result
+        return result
 
     def __getitem__(self, name: str) -> 'SymbolTableNode':
         n = self.get(name)
@@ -1957,13 +2206,9 @@ class TypeInfo(SymbolNode):
     def get_method(self, name: str) -> FuncBase:
         if self.mro is None:  # Might be because of a previous error.
             return None
-        for cls in self.mro:
-            if name in cls.names:
-                node = cls.names[name].node
-                if isinstance(node, FuncBase):
-                    return node
-                else:
-                    return None
+        n = self.get(name)
+        if n and isinstance(n.node, FuncBase):
+            return n.node
         return None
 
     def calculate_mro(self) -> None:
@@ -1974,8 +2219,31 @@ class TypeInfo(SymbolNode):
         mro = linearize_hierarchy(self)
         assert mro, "Could not produce a MRO at all for %s" % (self,)
         self.mro = mro
+        self.reset_mro_caches()
         self.is_enum = self._calculate_is_enum()
 
+    def reset_mro_caches(self) -> None:
+        self._mro_cache_key = self.mro
+        self._ancestor_names = {cls.fullname() for cls in self.mro or []}
+        self._supertype_maps = {}
+        self._members = {}
+        self._members_version = symbol_table_version
+        self._mro_versions = [cls.names.version for cls in self.mro or []]
+
+    def check_mro_versions(self) -> None:
+        """Discard the results of get() if a symbol table in the MRO has changed."""
+        versions = [cls.names.version for cls in self.mro]
+        if versions != self._mro_versions:
+            self._members = {}
+            self._mro_versions = versions
+        self._members_version = symbol_table_version
+
+    def supertype_maps(self) -> 'Dict[TypeInfo, mypy.types.Instance]':
+        """Return the table of supertypes used by map_instance_to_supertype."""
+        if self._supertype_maps is None or self._mro_cache_key is not self.mro:
+            self.reset_mro_caches()
+        return self._supertype_maps
+
     def _calculate_is_enum(self) -> bool:
         """
         If this is "enum.Enum" itself, then yes, it's an enum.
@@ -1992,11 +2260,9 @@ class TypeInfo(SymbolNode):
 
         This can be either via extension or via implementation.
         """
-        if self.mro:
-            for cls in self.mro:
-                if cls.fullname() == fullname:
-                    return True
-        return False
+        if self._ancestor_names is None or self._mro_cache_key is not self.mro:
+            self.reset_mro_caches()
+        return fullname in self._ancestor_names
 
     def direct_base_classes(self) -> 'List[TypeInfo]':
         """Return a direct base classes.
@@ -2056,7 +2322,10 @@ class TypeInfo(SymbolNode):
         return ti
 
 
-class SymbolTableNode:
+class SymbolTableNode(metaclass=SlotDefaultsMeta):
+    __slots__ = ('kind', 'node', 'tvar_def', 'mod_id', 'type_override', 'module_public',
+                 'cross_ref')
+
     # Kind of node. Possible values:
     #  - LDEF: local definition (of any kind)
     #  - GDEF: global (module-level) definition
@@ -2184,7 +2453,50 @@ class SymbolTableNode:
         return stnode
 
 
+# Incremented whenever an entry of any symbol table is set or deleted, so that
+# cached name lookups can be invalidated (see TypeInfo.get)
+symbol_table_version = 0
+
+
 class SymbolTable(Dict[str, SymbolTableNode]):
+    # Incremented whenever an entry of this table is set or deleted
+    version = 0
+
+    def changed(self) -> None:
+        global symbol_table_version
+        symbol_table_version += 1
+        self.version += 1
+
+    def __setitem__(self, key: str, value: SymbolTableNode) -> None:
+        self.changed()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self.changed()
+        super().__delitem__(key)
+
+    # These don't go through __setitem__ and __delitem__.
+
+    def update(self, *args: Any, **kwargs: SymbolTableNode) -> None:
+        self.changed()
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key: str, default: SymbolTableNode = None) -> SymbolTableNode:
+        self.changed()
+        return super().setdefault(key, default)
+
+    def pop(self, key: str, *default: Any) -> Any:
+        self.changed()
+        return super().pop(key, *default)
+
+    def popitem(self) -> Tuple[str, SymbolTableNode]:
+        self.changed()
+        return super().popitem()
+
+    def clear(self) -> None:
+        self.changed()
+        super().clear()
+
     def __str__(self) -> str:
         a = []  # type: List[str]
         for key, value in self.items():
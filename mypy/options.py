@@ -37,6 +37,10 @@ class Options:
         self.custom_typing_module = None  # type: Optional[str]
         self.custom_typeshed_dir = None  # type: Optional[str]
         self.report_dirs = {}  # type: Dict[str, str]
+        # Check the XML reports against the schema (slow; for debugging reports)
+        self.validate_xml_reports = False
+        # Number of processes used to render the reports
+        self.report_jobs = 1
         self.silent_imports = False
         self.almost_silent = False
 
@@ -103,6 +107,8 @@ class Options:
         # -- experimental options --
         self.fast_parser = False
         self.incremental = False
+        # Only analyze the signatures of modules that aren't build sources
+        self.interface_only_deps = False
         self.cache_dir = defaults.CACHE_DIR
         self.debug_cache = False
         self.hide_error_context = False  # Hide "note: In function "foo":" messages.
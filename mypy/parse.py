@@ -26,7 +26,7 @@ from mypy.nodes import (
     UnaryExpr, FuncExpr, PrintStmt, ImportBase, ComparisonExpr,
     StarExpr, YieldFromExpr, NonlocalDecl, DictionaryComprehension,
     SetComprehension, ComplexExpr, EllipsisExpr, YieldExpr, ExecStmt, Argument,
-    BackquoteExpr
+    BackquoteExpr, NodeIndex
 )
 from mypy import defaults
 from mypy import nodes
@@ -128,6 +128,8 @@ class Parser:
     is_class_body = False
     # All import nodes encountered so far in this parse unit.
     imports = None  # type: List[ImportBase]
+    # Definitions and calls encountered so far in this parse unit.
+    node_index = None  # type: NodeIndex
     # Names imported from __future__.
     future_options = None  # type: List[str]
     # Lines to ignore (using # type: ignore).
@@ -153,6 +155,7 @@ class Parser:
                                                is_stub_file=self.is_stub_file)
         self.ind = 0
         self.imports = []
+        self.node_index = NodeIndex()
         self.future_options = []
         file = self.parse_file()
         if self.raise_on_error and self.errors.is_errors():
@@ -165,6 +168,7 @@ class Parser:
         defs = self.parse_defs()
         self.expect_type(Eof)
         node = MypyFile(defs, self.imports, is_bom, self.ignored_lines)
+        node.node_index = self.node_index
         return node
 
     # Parse the initial part
@@ -341,9 +345,14 @@ class Parser:
             except ParseError:
                 pass
 
-            defs, _ = self.parse_block()
+            self.node_index.class_depth += 1
+            try:
+                defs, _ = self.parse_block()
+            finally:
+                self.node_index.class_depth -= 1
 
             node = ClassDef(name, defs, None, base_types, metaclass=metaclass)
+            self.node_index.add_class_def(node)
             return node
         finally:
             self.errors.pop_type()
@@ -415,7 +424,11 @@ class Parser:
             arg_kinds = [arg.kind for arg in args]
             arg_names = [arg.variable.name() for arg in args]
 
-            body, comment_type = self.parse_block(allow_type=True)
+            self.node_index.func_depth += 1
+            try:
+                body, comment_type = self.parse_block(allow_type=True)
+            finally:
+                self.node_index.func_depth -= 1
             # Potentially insert extra assignment statements to the beginning of the
             # body, used to decompose Python 2 tuple arguments.
             body.body[:0] = extra_stmts
@@ -477,6 +490,7 @@ class Parser:
 
             node = FuncDef(name, args, body, typ)
             node.set_line(def_tok)
+            self.node_index.add_func_def(node)
             if typ is not None:
                 typ.definition = node
             return node
@@ -1625,7 +1639,9 @@ class Parser:
         self.expect('(')
         args, kinds, names = self.parse_arg_expr()
         self.expect(')')
-        return CallExpr(callee, args, kinds, names)
+        node = CallExpr(callee, args, kinds, names)
+        self.node_index.add_call_expr(node)
+        return node
 
     def parse_arg_expr(self) -> Tuple[List[Expression], List[int], List[str]]:
         """Parse arguments in a call expression (within '(' and ')').
@@ -1794,7 +1810,11 @@ class Parser:
 
         colon = self.expect(':')
 
-        expr = self.parse_expression(precedence[','])
+        self.node_index.func_depth += 1
+        try:
+            expr = self.parse_expression(precedence[','])
+        finally:
+            self.node_index.func_depth -= 1
 
         return_stmt = ReturnStmt(expr)
         return_stmt.set_line(lambda_tok)
@@ -3,12 +3,13 @@
 from abc import ABCMeta, abstractmethod
 import cgi
 import json
+import multiprocessing
 import os
 import shutil
 import tokenize
 from operator import attrgetter
 
-from typing import Any, Callable, Dict, List, Optional, Tuple, cast
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, cast
 
 import time
 
@@ -16,7 +17,7 @@ import sys
 
 from mypy.nodes import MypyFile, Expression, FuncDef
 from mypy import stats
-from mypy.traverser import TraverserVisitor
+from mypy.traverser import TraverserVisitor, traverse_all
 from mypy.types import Type
 from mypy.version import __version__
 
@@ -31,10 +32,30 @@ reporter_classes = {}  # type: Dict[str, Tuple[Callable[[Reports, str], Abstract
 
 
 class Reports:
-    def __init__(self, data_dir: str, report_dirs: Dict[str, str]) -> None:
+    """The reports of a build.
+
+    Each build source is reported on in two steps.  First the data that the
+    reporters need about the file is collected from its tree (see
+    AbstractReporter.collect_file_data).  The data is JSON-serializable, so
+    that it can be cached with the module in incremental mode and reported
+    on again when the module is fresh.  The files are then rendered when the
+    build finishes, using several processes if jobs > 1.
+    """
+
+    def __init__(self, data_dir: str, report_dirs: Dict[str, str],
+                 validate_xml: bool = False, jobs: int = 1) -> None:
         self.data_dir = data_dir
+        self.report_dirs = report_dirs
+        # Check the XML documents against the schema
+        self.validate_xml = validate_xml
+        # Number of processes used to render the files
+        self.jobs = jobs
         self.reporters = []  # type: List[AbstractReporter]
         self.named_reporters = {}  # type: Dict[str, AbstractReporter]
+        # Shared visitor for the current file (see statistics_visitor)
+        self.statistics = None  # type: Optional[stats.StatisticsVisitor]
+        # (path, module, data) of the files that haven't been rendered yet
+        self.pending = []  # type: List[Tuple[str, str, Dict[str, Any]]]
 
         for report_type, report_dir in sorted(report_dirs.items()):
             self.add_report(report_type, report_dir)
@@ -56,21 +77,119 @@ class Reports:
         self.named_reporters[report_type] = reporter
         return reporter
 
-    def file(self, tree: MypyFile, type_map: Dict[Expression, Type]) -> None:
-        for reporter in self.reporters:
-            reporter.on_file(tree, type_map)
+    def data_keys(self) -> Set[str]:
+        """Return the keys of the data about a file that the reporters need."""
+        return {key for reporter in self.reporters for key in reporter.data_keys}
+
+    def file(self, tree: MypyFile, type_map: Dict[Expression, Type]) -> Dict[str, Any]:
+        """Report on a file, and return the data collected about it.
+
+        The visitors of the reporters (see AbstractReporter.file_visitor) are
+        run first.  Reporters that need the precision of each line share a
+        single visitor, so it only walks the tree once.
+        """
+        self.statistics = None
+        file_visitors = [reporter.file_visitor(tree, type_map) for reporter in self.reporters]
+        traverse_all(tree, [visitor for visitor in file_visitors if visitor is not None])
+        data = {}  # type: Dict[str, Any]
+        for reporter, visitor in zip(self.reporters, file_visitors):
+            reporter.collect_file_data(tree, type_map, visitor, data)
+        self.statistics = None
+        self.add_file(tree.path, tree._fullname, data)
+        return data
+
+    def add_file(self, path: str, module: str, data: Dict[str, Any]) -> None:
+        """Report on a file using data collected by file() (possibly in an earlier run)."""
+        self.pending.append((path, module, data))
+
+    def statistics_visitor(self, type_map: Dict[Expression, Type]) -> stats.StatisticsVisitor:
+        """Return a visitor that computes the precision of each line of the current file.
+
+        All reporters that ask for it share the same visitor.
+        """
+        if self.statistics is None:
+            self.statistics = stats.StatisticsVisitor(inferred=True, typemap=type_map,
+                                                      all_nodes=True)
+        return self.statistics
+
+    def render_file(self, path: str, module: str, data: Dict[str, Any]) -> List[Any]:
+        return [reporter.render_file(path, module, data) for reporter in self.reporters]
+
+    def render_pending(self) -> None:
+        """Render the files that have been reported on and pass the results to the reporters."""
+        files = self.pending
+        self.pending = []
+        if self.jobs > 1 and len(files) > 1:
+            jobs = min(self.jobs, len(files))
+            with multiprocessing.Pool(jobs, initializer=init_render_worker,
+                                      initargs=(self.data_dir, self.report_dirs,
+                                                self.validate_xml)) as pool:
+                results = pool.map(render_in_worker, files,
+                                   chunksize=max(1, len(files) // (4 * jobs)))
+        else:
+            results = [self.render_file(*file) for file in files]
+        for (path, module, data), rendered in zip(files, results):
+            for reporter, result in zip(self.reporters, rendered):
+                reporter.on_file(path, module, data, result)
 
     def finish(self) -> None:
+        self.render_pending()
         for reporter in self.reporters:
             reporter.on_finish()
 
 
+# The reports used to render files in a worker process
+worker_reports = None  # type: Optional[Reports]
+
+
+def init_render_worker(data_dir: str, report_dirs: Dict[str, str], validate_xml: bool) -> None:
+    global worker_reports
+    worker_reports = Reports(data_dir, report_dirs, validate_xml)
+
+
+def render_in_worker(file: Tuple[str, str, Dict[str, Any]]) -> List[Any]:
+    assert worker_reports is not None
+    return worker_reports.render_file(*file)
+
+
 class AbstractReporter(metaclass=ABCMeta):
+    # Keys of the entries this reporter adds to the data about a file
+    data_keys = ()  # type: Tuple[str, ...]
+
     def __init__(self, reports: Reports, output_dir: str) -> None:
+        self.reports = reports
         self.output_dir = output_dir
 
+    def file_visitor(self, tree: MypyFile,
+                     type_map: Dict[Expression, Type]) -> Optional[TraverserVisitor]:
+        """Return a visitor that collects data for collect_file_data(), or None.
+
+        The visitor is run before collect_file_data() is called and then
+        passed to it.
+        """
+        return None
+
+    def collect_file_data(self, tree: MypyFile, type_map: Dict[Expression, Type],
+                          visitor: Optional[TraverserVisitor], data: Dict[str, Any]) -> None:
+        """Add the data about a file that the reporter needs to the data dictionary.
+
+        The values must be JSON-serializable.  The dictionary is shared by all
+        reporters, so an entry may already have been added by another one.
+        """
+        pass
+
+    def render_file(self, path: str, module: str, data: Dict[str, Any]) -> Any:
+        """Write the output for a single file and return what on_file() needs.
+
+        This may run in a worker process, with a separate copy of the
+        reporter, so the result must be picklable.  It must not change the
+        state of the reporter, except for passing data about the same file to
+        the reporters after it.
+        """
+        return None
+
     @abstractmethod
-    def on_file(self, tree: MypyFile, type_map: Dict[Expression, Type]) -> None:
+    def on_file(self, path: str, module: str, data: Dict[str, Any], rendered: Any) -> None:
         pass
 
     @abstractmethod
@@ -78,6 +197,26 @@ class AbstractReporter(metaclass=ABCMeta):
         pass
 
 
+def add_line_precision(data: Dict[str, Any], visitor: Optional[TraverserVisitor]) -> None:
+    """Add the precision of each line (computed by a StatisticsVisitor) to file data.
+
+    The precisions are stored as a list indexed by line number, with None
+    for lines that have none.
+    """
+    if 'precision' not in data:
+        line_map = cast(stats.StatisticsVisitor, visitor).line_map
+        precision = [None] * (max(line_map) + 1 if line_map else 0)  # type: List[Optional[int]]
+        for line, status in line_map.items():
+            precision[line] = status
+        data['precision'] = precision
+
+
+def line_precision(data: Dict[str, Any]) -> Dict[int, int]:
+    """Return the map from line number to precision in file data."""
+    return {line: status for line, status in enumerate(data['precision'])
+            if status is not None}
+
+
 def register_reporter(report_name: str,
                       reporter: Callable[[Reports, str], AbstractReporter],
                       needs_lxml: bool = False) -> None:
@@ -98,27 +237,50 @@ class FuncCounterVisitor(TraverserVisitor):
 
 
 class LineCountReporter(AbstractReporter):
+    data_keys = ('funcs',)
+
     def __init__(self, reports: Reports, output_dir: str) -> None:
         super().__init__(reports, output_dir)
         self.counts = {}  # type: Dict[str, Tuple[int, int, int, int]]
 
         stats.ensure_dir_exists(output_dir)
 
-    def on_file(self, tree: MypyFile, type_map: Dict[Expression, Type]) -> None:
+    def file_visitor(self, tree: MypyFile,
+                     type_map: Dict[Expression, Type]) -> Optional[TraverserVisitor]:
+        if tree.node_index is not None:
+            return None
+        return FuncCounterVisitor()
+
+    def collect_file_data(self, tree: MypyFile, type_map: Dict[Expression, Type],
+                          visitor: Optional[TraverserVisitor], data: Dict[str, Any]) -> None:
+        if visitor is None:
+            # Count the functions that aren't nested within another function.
+            counts = [0, 0]
+            for defn, funcs, _ in tree.node_index.func_defs:
+                if funcs == 0:
+                    counts[defn.type is not None] += 1
+        else:
+            counts = cast(FuncCounterVisitor, visitor).counts
+        data['funcs'] = counts
+
+    def render_file(self, path: str, module: str,
+                    data: Dict[str, Any]) -> Tuple[int, int, int, int]:
         # Count physical lines.  This assumes the file's encoding is a
         # superset of ASCII (or at least uses \n in its line endings).
-        physical_lines = len(open(tree.path, 'rb').readlines())
+        with open(path, 'rb') as f:
+            physical_lines = len(f.readlines())
 
-        func_counter = FuncCounterVisitor()
-        tree.accept(func_counter)
-        unannotated_funcs, annotated_funcs = func_counter.counts
+        unannotated_funcs, annotated_funcs = data['funcs']
         total_funcs = annotated_funcs + unannotated_funcs
 
         imputed_annotated_lines = (physical_lines * annotated_funcs // total_funcs
                                    if total_funcs else physical_lines)
 
-        self.counts[tree._fullname] = (imputed_annotated_lines, physical_lines,
-                                       annotated_funcs, total_funcs)
+        return (imputed_annotated_lines, physical_lines, annotated_funcs, total_funcs)
+
+    def on_file(self, path: str, module: str, data: Dict[str, Any],
+                rendered: Tuple[int, int, int, int]) -> None:
+        self.counts[module] = rendered
 
     def on_finish(self) -> None:
         counts = sorted(((c, p) for p, c in self.counts.items()),
@@ -217,24 +379,29 @@ class LineCoverageReporter(AbstractReporter):
     source file's absolute pathname the list of line numbers that
     belong to typed functions in that file.
     """
+    data_keys = ('covered',)
+
     def __init__(self, reports: Reports, output_dir: str) -> None:
         super().__init__(reports, output_dir)
         self.lines_covered = {}  # type: Dict[str, List[int]]
 
         stats.ensure_dir_exists(output_dir)
 
-    def on_file(self, tree: MypyFile, type_map: Dict[Expression, Type]) -> None:
-        tree_source = open(tree.path).readlines()
-
-        coverage_visitor = LineCoverageVisitor(tree_source)
-        tree.accept(coverage_visitor)
+    def file_visitor(self, tree: MypyFile,
+                     type_map: Dict[Expression, Type]) -> Optional[TraverserVisitor]:
+        return LineCoverageVisitor(open(tree.path).readlines())
 
+    def collect_file_data(self, tree: MypyFile, type_map: Dict[Expression, Type],
+                          visitor: Optional[TraverserVisitor], data: Dict[str, Any]) -> None:
         covered_lines = []
-        for line_number, (_, typed) in enumerate(coverage_visitor.lines_covered):
+        for line_number, (_, typed) in enumerate(
+                cast(LineCoverageVisitor, visitor).lines_covered):
             if typed:
                 covered_lines.append(line_number + 1)
+        data['covered'] = covered_lines
 
-        self.lines_covered[os.path.abspath(tree.path)] = covered_lines
+    def on_file(self, path: str, module: str, data: Dict[str, Any], rendered: None) -> None:
+        self.lines_covered[os.path.abspath(path)] = data['covered']
 
     def on_finish(self) -> None:
         with open(os.path.join(self.output_dir, 'coverage.json'), 'w') as f:
@@ -247,11 +414,21 @@ class OldHtmlReporter(AbstractReporter):
     """Old HTML reporter.
 
     This just calls the old functions in `stats`, which use global
-    variables to preserve state for the index.
+    variables to preserve state for the index.  Because of that, the files
+    are always rendered in the main process.
     """
+    data_keys = ('precision',)
 
-    def on_file(self, tree: MypyFile, type_map: Dict[Expression, Type]) -> None:
-        stats.generate_html_report(tree, tree.path, type_map, self.output_dir)
+    def file_visitor(self, tree: MypyFile,
+                     type_map: Dict[Expression, Type]) -> Optional[TraverserVisitor]:
+        return self.reports.statistics_visitor(type_map)
+
+    def collect_file_data(self, tree: MypyFile, type_map: Dict[Expression, Type],
+                          visitor: Optional[TraverserVisitor], data: Dict[str, Any]) -> None:
+        add_line_precision(data, visitor)
+
+    def on_file(self, path: str, module: str, data: Dict[str, Any], rendered: None) -> None:
+        stats.generate_html_report(path, line_precision(data), self.output_dir)
 
     def on_finish(self) -> None:
         stats.generate_html_index(self.output_dir)
@@ -273,10 +450,16 @@ class FileInfo:
 
 
 class MemoryXmlReporter(AbstractReporter):
-    """Internal reporter that generates XML in memory.
+    """Internal reporter that collects the data for the XML-based reporters.
 
     This is used by all other XML-based reporters to avoid duplication.
+    The lines of the file being rendered are kept in memory, and the
+    reporters write them out one at a time instead of building a document
+    for the file.  Only the index is built as an XML document.  The
+    documents are checked against the schema if --validate-xml-reports is
+    given.
     """
+    data_keys = ('precision',)
 
     def __init__(self, reports: Reports, output_dir: str) -> None:
         super().__init__(reports, output_dir)
@@ -284,48 +467,106 @@ class MemoryXmlReporter(AbstractReporter):
         self.xslt_html_path = os.path.join(reports.data_dir, 'xml', 'mypy-html.xslt')
         self.xslt_txt_path = os.path.join(reports.data_dir, 'xml', 'mypy-txt.xslt')
         self.css_html_path = os.path.join(reports.data_dir, 'xml', 'mypy-html.css')
-        xsd_path = os.path.join(reports.data_dir, 'xml', 'mypy.xsd')
-        self.schema = etree.XMLSchema(etree.parse(xsd_path))
+        self.schema = None  # type: etree.XMLSchema
+        if reports.validate_xml:
+            xsd_path = os.path.join(reports.data_dir, 'xml', 'mypy.xsd')
+            self.schema = etree.XMLSchema(etree.parse(xsd_path))
+        # The file being rendered, or None if it isn't reported on
+        self.last_file = None  # type: Optional[FileInfo]
+        # (line number, precision name, content) for each line of the file
+        self.last_lines = []  # type: List[Tuple[int, str, str]]
+        # The index, after on_finish()
         self.last_xml = None  # type: etree._ElementTree
         self.files = []  # type: List[FileInfo]
 
-    def on_file(self, tree: MypyFile, type_map: Dict[Expression, Type]) -> None:
-        self.last_xml = None
-        path = os.path.relpath(tree.path)
+    def file_visitor(self, tree: MypyFile,
+                     type_map: Dict[Expression, Type]) -> Optional[TraverserVisitor]:
+        return self.reports.statistics_visitor(type_map)
+
+    def collect_file_data(self, tree: MypyFile, type_map: Dict[Expression, Type],
+                          visitor: Optional[TraverserVisitor], data: Dict[str, Any]) -> None:
+        add_line_precision(data, visitor)
+
+    def render_file(self, path: str, module: str, data: Dict[str, Any]) -> Optional[List[int]]:
+        """Read the lines of a file for the reporters after this one.
+
+        Return the number of lines of each precision, or None if the file
+        isn't reported on.
+        """
+        self.last_file = None
+        self.last_lines = []
+        path = os.path.relpath(path)
         if stats.is_special_module(path):
-            return
+            return None
         if path.startswith('..'):
-            return
+            return None
         if 'stubs' in path.split('/'):
-            return
-
-        visitor = stats.StatisticsVisitor(inferred=True, typemap=type_map, all_nodes=True)
-        tree.accept(visitor)
-
-        root = etree.Element('mypy-report-file', name=path, module=tree._fullname)
-        doc = etree.ElementTree(root)
-        file_info = FileInfo(path, tree._fullname)
+            return None
+        line_map = line_precision(data)
+        file_info = FileInfo(path, module)
 
         with tokenize.open(path) as input_file:
             for lineno, line_text in enumerate(input_file, 1):
-                status = visitor.line_map.get(lineno, stats.TYPE_EMPTY)
+                status = line_map.get(lineno, stats.TYPE_EMPTY)
                 file_info.counts[status] += 1
-                etree.SubElement(root, 'line',
-                                 number=str(lineno),
-                                 precision=stats.precision_names[status],
-                                 content=line_text[:-1])
-        # Assumes a layout similar to what XmlReporter uses.
-        xslt_path = os.path.relpath('mypy-html.xslt', path)
-        transform_pi = etree.ProcessingInstruction('xml-stylesheet',
-                'type="text/xsl" href="%s"' % cgi.escape(xslt_path, True))
-        root.addprevious(transform_pi)
-        self.schema.assertValid(doc)
-
-        self.last_xml = doc
-        self.files.append(file_info)
+                self.last_lines.append((lineno, stats.precision_names[status], line_text[:-1]))
+
+        self.last_file = file_info
+        if self.schema is not None:
+            self.schema.assertValid(self.file_xml())
+        return file_info.counts
+
+    def on_file(self, path: str, module: str, data: Dict[str, Any],
+                rendered: Optional[List[int]]) -> None:
+        if rendered is not None:
+            file_info = FileInfo(os.path.relpath(path), module)
+            file_info.counts = rendered
+            self.files.append(file_info)
+
+    def stylesheet_path(self, path: str) -> str:
+        """Return the path of the XSLT stylesheet relative to the report of a file.
+
+        Assumes a layout similar to what XmlReporter uses.
+        """
+        return os.path.relpath('mypy-html.xslt', path)
+
+    def stylesheet_pi(self, path: str) -> Any:
+        return etree.ProcessingInstruction('xml-stylesheet',
+                'type="text/xsl" href="%s"' % cgi.escape(self.stylesheet_path(path), True))
+
+    def file_xml(self) -> Any:
+        """Build the XML document of the last file (only used for validation)."""
+        root = etree.Element('mypy-report-file', name=self.last_file.name,
+                             module=self.last_file.module)
+        doc = etree.ElementTree(root)
+        for lineno, precision, content in self.last_lines:
+            etree.SubElement(root, 'line', number=str(lineno), precision=precision,
+                             content=content)
+        root.addprevious(self.stylesheet_pi(self.last_file.name))
+        return doc
+
+    def write_file_xml(self, out_path: str) -> None:
+        """Write the XML document of the last file incrementally."""
+        file_info = self.last_file
+        with etree.xmlfile(out_path, encoding='utf-8') as xf:
+            xf.write(self.stylesheet_pi(file_info.name))
+            attrib = {'name': file_info.name, 'module': file_info.module}
+            if not self.last_lines:
+                # Write an empty element the same way as a document would.
+                xf.write(etree.Element('mypy-report-file', attrib))
+                return
+            with xf.element('mypy-report-file', attrib):
+                # Each line is serialized right away, so a single element is reused.
+                element = etree.Element('line')
+                for lineno, precision, content in self.last_lines:
+                    element.set('number', str(lineno))
+                    element.set('precision', precision)
+                    element.set('content', content)
+                    xf.write(element)
 
     def on_finish(self) -> None:
-        self.last_xml = None
+        self.last_file = None
+        self.last_lines = []
         # index_path = os.path.join(self.output_dir, 'index.xml')
         output_files = sorted(self.files, key=lambda x: x.module)
 
@@ -338,11 +579,9 @@ class MemoryXmlReporter(AbstractReporter):
                              total=str(file_info.total()),
                              name=file_info.name,
                              module=file_info.module)
-        xslt_path = os.path.relpath('mypy-html.xslt', '.')
-        transform_pi = etree.ProcessingInstruction('xml-stylesheet',
-                'type="text/xsl" href="%s"' % cgi.escape(xslt_path, True))
-        root.addprevious(transform_pi)
-        self.schema.assertValid(doc)
+        root.addprevious(self.stylesheet_pi('.'))
+        if self.schema is not None:
+            self.schema.assertValid(doc)
 
         self.last_xml = doc
 
@@ -388,6 +627,7 @@ class CoberturaPackage(object):
 class CoberturaXmlReporter(AbstractReporter):
     """Reporter for generating Cobertura compliant XML.
     """
+    data_keys = ('precision',)
 
     def __init__(self, reports: Reports, output_dir: str) -> None:
         super().__init__(reports, output_dir)
@@ -398,13 +638,25 @@ class CoberturaXmlReporter(AbstractReporter):
         self.doc = etree.ElementTree(self.root)
         self.root_package = CoberturaPackage('.')
 
-    def on_file(self, tree: MypyFile, type_map: Dict[Expression, Type]) -> None:
-        path = os.path.relpath(tree.path)
-        visitor = stats.StatisticsVisitor(inferred=True, typemap=type_map, all_nodes=True)
-        tree.accept(visitor)
+    def file_visitor(self, tree: MypyFile,
+                     type_map: Dict[Expression, Type]) -> Optional[TraverserVisitor]:
+        return self.reports.statistics_visitor(type_map)
+
+    def collect_file_data(self, tree: MypyFile, type_map: Dict[Expression, Type],
+                          visitor: Optional[TraverserVisitor], data: Dict[str, Any]) -> None:
+        add_line_precision(data, visitor)
+
+    def render_file(self, path: str, module: str,
+                    data: Dict[str, Any]) -> Tuple[bytes, int, int]:
+        """Return the serialized class element of a file and its line counts.
+
+        The element is serialized since elements can't be passed between
+        processes.
+        """
+        path = os.path.relpath(path)
+        line_map = line_precision(data)
 
         class_name = os.path.basename(path)
-        file_info = FileInfo(path, tree._fullname)
         class_element = etree.Element('class',
                                       filename=path,
                                       complexity='1.0',
@@ -416,7 +668,7 @@ class CoberturaXmlReporter(AbstractReporter):
             class_lines_covered = 0
             class_total_lines = 0
             for lineno, _ in enumerate(input_file, 1):
-                status = visitor.line_map.get(lineno, stats.TYPE_EMPTY)
+                status = line_map.get(lineno, stats.TYPE_EMPTY)
                 hits = 0
                 branch = False
                 if status == stats.TYPE_EMPTY:
@@ -427,7 +679,6 @@ class CoberturaXmlReporter(AbstractReporter):
                     hits = 1
                 if status == stats.TYPE_IMPRECISE:
                     branch = True
-                file_info.counts[status] += 1
                 line_element = etree.SubElement(lines_element, 'line',
                                                 number=str(lineno),
                                                 precision=stats.precision_names[status],
@@ -438,21 +689,28 @@ class CoberturaXmlReporter(AbstractReporter):
             class_element.attrib['branch-rate'] = '0'
             class_element.attrib['line-rate'] = get_line_rate(class_lines_covered,
                                                               class_total_lines)
-            # parent_module is set to whichever module contains this file.  For most files, we want
-            # to simply strip the last element off of the module.  But for __init__.py files,
-            # the module == the parent module.
-            parent_module = file_info.module.rsplit('.', 1)[0]
-            if file_info.name.endswith('__init__.py'):
-                parent_module = file_info.module
-
-            if parent_module not in self.root_package.packages:
-                self.root_package.packages[parent_module] = CoberturaPackage(parent_module)
-            current_package = self.root_package.packages[parent_module]
-            packages_to_update = [self.root_package, current_package]
-            for package in packages_to_update:
-                package.total_lines += class_total_lines
-                package.covered_lines += class_lines_covered
-            current_package.classes[class_name] = class_element
+        return etree.tostring(class_element), class_total_lines, class_lines_covered
+
+    def on_file(self, path: str, module: str, data: Dict[str, Any],
+                rendered: Tuple[bytes, int, int]) -> None:
+        class_xml, class_total_lines, class_lines_covered = rendered
+        path = os.path.relpath(path)
+        class_name = os.path.basename(path)
+        # parent_module is set to whichever module contains this file.  For most files, we want
+        # to simply strip the last element off of the module.  But for __init__.py files,
+        # the module == the parent module.
+        parent_module = module.rsplit('.', 1)[0]
+        if path.endswith('__init__.py'):
+            parent_module = module
+
+        if parent_module not in self.root_package.packages:
+            self.root_package.packages[parent_module] = CoberturaPackage(parent_module)
+        current_package = self.root_package.packages[parent_module]
+        packages_to_update = [self.root_package, current_package]
+        for package in packages_to_update:
+            package.total_lines += class_total_lines
+            package.covered_lines += class_lines_covered
+        current_package.classes[class_name] = etree.fromstring(class_xml)
 
     def on_finish(self) -> None:
         self.root.attrib['line-rate'] = get_line_rate(self.root_package.covered_lines,
@@ -476,7 +734,7 @@ class AbstractXmlReporter(AbstractReporter):
         super().__init__(reports, output_dir)
 
         memory_reporter = reports.add_report('memory-xml', '<memory>')
-        # The dependency will be called first.
+        # The dependency will be called first (and renders each file first).
         self.memory_xml = cast(MemoryXmlReporter, memory_reporter)
 
 
@@ -490,16 +748,18 @@ class XmlReporter(AbstractXmlReporter):
     that makes it fail from file:// URLs but work on http:// URLs.
     """
 
-    def on_file(self, tree: MypyFile, type_map: Dict[Expression, Type]) -> None:
-        last_xml = self.memory_xml.last_xml
-        if last_xml is None:
+    def render_file(self, path: str, module: str, data: Dict[str, Any]) -> None:
+        if self.memory_xml.last_file is None:
             return
-        path = os.path.relpath(tree.path)
+        path = os.path.relpath(path)
         if path.startswith('..'):
             return
         out_path = os.path.join(self.output_dir, 'xml', path + '.xml')
         stats.ensure_dir_exists(os.path.dirname(out_path))
-        last_xml.write(out_path, encoding='utf-8')
+        self.memory_xml.write_file_xml(out_path)
+
+    def on_file(self, path: str, module: str, data: Dict[str, Any], rendered: None) -> None:
+        pass
 
     def on_finish(self) -> None:
         last_xml = self.memory_xml.last_xml
@@ -518,7 +778,9 @@ class XsltHtmlReporter(AbstractXmlReporter):
     """Public reporter that exports HTML via XSLT.
 
     This is slightly different than running `xsltproc` on the .xml files,
-    because it passes a parameter to rewrite the links.
+    because it passes a parameter to rewrite the links.  Only the index is
+    transformed with XSLT; the page of each file is written directly, one
+    line at a time, in the same format as the stylesheet produces.
     """
 
     def __init__(self, reports: Reports, output_dir: str) -> None:
@@ -527,18 +789,37 @@ class XsltHtmlReporter(AbstractXmlReporter):
         self.xslt_html = etree.XSLT(etree.parse(self.memory_xml.xslt_html_path))
         self.param_html = etree.XSLT.strparam('html')
 
-    def on_file(self, tree: MypyFile, type_map: Dict[Expression, Type]) -> None:
-        last_xml = self.memory_xml.last_xml
-        if last_xml is None:
+    def render_file(self, path: str, module: str, data: Dict[str, Any]) -> None:
+        file_info = self.memory_xml.last_file
+        if file_info is None:
             return
-        path = os.path.relpath(tree.path)
+        path = os.path.relpath(path)
         if path.startswith('..'):
             return
         out_path = os.path.join(self.output_dir, 'html', path + '.html')
         stats.ensure_dir_exists(os.path.dirname(out_path))
-        transformed_html = bytes(self.xslt_html(last_xml, ext=self.param_html))
-        with open(out_path, 'wb') as out_file:
-            out_file.write(transformed_html)
+        # The stylesheet name is the path of the XSLT file without the extension.
+        css_path = os.path.splitext(self.memory_xml.stylesheet_path(path))[0] + '.css'
+        lines = self.memory_xml.last_lines
+        with open(out_path, 'w', encoding='utf-8') as out_file:
+            write = out_file.write
+            write('<html>\n<head>\n'
+                  '<meta http-equiv="Content-Type" content="text/html; charset=UTF-8">\n'
+                  '<link rel="stylesheet" type="text/css" href="%s">\n'
+                  '</head>\n<body>\n' % cgi.escape(css_path, True))
+            write('<h2>%s</h2>\n' % cgi.escape(file_info.module))
+            write('<table>\n<caption>%s</caption>\n' % cgi.escape(file_info.name))
+            write('<tbody><tr>\n<td class="table-lines"><pre>')
+            for lineno, _, _ in lines:
+                write('<span id="L%d" class="lineno"><a class="lineno" href="#L%d">%d</a>'
+                      '</span>\n' % (lineno, lineno, lineno))
+            write('</pre></td>\n<td class="table-code"><pre>')
+            for _, precision, content in lines:
+                write('<span class="line-%s">%s</span>\n' % (precision, cgi.escape(content)))
+            write('</pre></td>\n</tr></tbody>\n</table>\n</body>\n</html>\n')
+
+    def on_file(self, path: str, module: str, data: Dict[str, Any], rendered: None) -> None:
+        pass
 
     def on_finish(self) -> None:
         last_xml = self.memory_xml.last_xml
@@ -564,7 +845,7 @@ class XsltTxtReporter(AbstractXmlReporter):
 
         self.xslt_txt = etree.XSLT(etree.parse(self.memory_xml.xslt_txt_path))
 
-    def on_file(self, tree: MypyFile, type_map: Dict[Expression, Type]) -> None:
+    def on_file(self, path: str, module: str, data: Dict[str, Any], rendered: None) -> None:
         pass
 
     def on_finish(self) -> None:
@@ -5,6 +5,7 @@ from mypy.types import (
     TypeVarType, Instance, TypeVisitor, ErasedType, TypeList, Overloaded, PartialType,
     DeletedType, UninhabitedType, TypeType
 )
+from mypy.typeintern import is_interned
 
 
 def is_same_type(left: Type, right: Type) -> bool:
@@ -14,6 +15,8 @@ def is_same_type(left: Type, right: Type) -> bool:
         # Make unbound types same as anything else to reduce the number of
         # generated spurious error messages.
         return True
+    elif left is right and is_interned(left):
+        return True
     else:
         # Simplify types to canonical forms.
         #
@@ -74,6 +74,7 @@ from mypy.types import (
     FunctionLike, UnboundType, TypeList, TypeVarDef,
     replace_leading_arg_type, TupleType, UnionType, StarType, EllipsisType, TypeType)
 from mypy.nodes import function_type, implicit_module_attrs
+import mypy.nodes
 from mypy.typeanal import TypeAnalyser, TypeAnalyserPass3, analyze_type_alias
 from mypy.exprtotype import expr_to_unanalyzed_type, TypeTranslationError
 from mypy.sametypes import is_same_type
@@ -149,6 +150,18 @@ class SemanticAnalyzer(NodeVisitor):
     lib_path = None  # type: List[str]
     # Module name space
     modules = None  # type: Dict[str, MypyFile]
+    # Symbol tables of modules by the prefixes of fully qualified names that
+    # refer to them (see lookup_fully_qualified)
+    prefix_tables = None  # type: Dict[str, SymbolTable]
+    # Results of successful name lookups in the current scope, valid while
+    # lookup_cache_version is equal to mypy.nodes.symbol_table_version (see lookup)
+    lookup_cache = None  # type: Dict[str, SymbolTableNode]
+    lookup_cache_version = -1
+    # Numbers of name lookups that did and didn't use lookup_cache, and of
+    # times the cache was invalidated
+    lookup_hits = 0
+    lookup_misses = 0
+    lookup_invalidations = 0
     # Global name space for current module
     globals = None  # type: SymbolTable
     # Names declared using "global" (separate set for each scope)
@@ -209,6 +222,8 @@ class SemanticAnalyzer(NodeVisitor):
         self.lib_path = lib_path
         self.errors = errors
         self.modules = {}
+        self.prefix_tables = {}
+        self.lookup_cache = {}
         self.postpone_nested_functions_stack = [FUNCTION_BOTH_PHASES]
         self.postponed_functions_stack = []
         self.all_exports = set()  # type: Set[str]
@@ -220,6 +235,7 @@ class SemanticAnalyzer(NodeVisitor):
         self.cur_mod_id = file_node.fullname()
         self.is_stub_file = fnam.lower().endswith('.pyi')
         self.globals = file_node.names
+        self.invalidate_lookup_cache()
 
         if 'builtins' in self.modules:
             self.globals['__builtins__'] = SymbolTableNode(
@@ -577,6 +593,7 @@ class SemanticAnalyzer(NodeVisitor):
         self.block_depth.append(-1)  # The class body increments this to 0
         self.postpone_nested_functions_stack.append(FUNCTION_BOTH_PHASES)
         self.type = defn.info
+        self.invalidate_lookup_cache()
 
     def leave_class(self) -> None:
         """ Restore analyzer state. """
@@ -584,6 +601,7 @@ class SemanticAnalyzer(NodeVisitor):
         self.block_depth.pop()
         self.locals.pop()
         self.type = self.type_stack.pop()
+        self.invalidate_lookup_cache()
 
     def bind_class_type_vars(self, defn: ClassDef) -> None:
         """ Unbind type variables of previously active class and bind
@@ -837,7 +855,7 @@ class SemanticAnalyzer(NodeVisitor):
         # If there are cyclic imports, we may be missing 'object' in
         # the MRO. Fix MRO if needed.
         if info.mro and info.mro[-1].fullname() != 'builtins.object':
-            info.mro.append(self.object_type().type)
+            info.mro = info.mro + [self.object_type().type]
 
     def expr_to_analyzed_type(self, expr: Expression) -> Type:
         if isinstance(expr, CallExpr):
@@ -2088,6 +2106,7 @@ class SemanticAnalyzer(NodeVisitor):
             if name in self.nonlocal_decls[-1]:
                 self.fail("Name '{}' is nonlocal and global".format(name), g)
             self.global_decls[-1].add(name)
+        self.invalidate_lookup_cache()
 
     def visit_nonlocal_decl(self, d: NonlocalDecl) -> None:
         if not self.is_func_scope():
@@ -2107,6 +2126,7 @@ class SemanticAnalyzer(NodeVisitor):
                 if name in self.global_decls[-1]:
                     self.fail("Name '{}' is nonlocal and global".format(name), d)
                 self.nonlocal_decls[-1].add(name)
+            self.invalidate_lookup_cache()
 
     def visit_print_stmt(self, s: PrintStmt) -> None:
         for arg in s.args:
@@ -2472,6 +2492,45 @@ class SemanticAnalyzer(NodeVisitor):
 
     def lookup(self, name: str, ctx: Context) -> SymbolTableNode:
         """Look up an unqualified name in all active namespaces."""
+        node = self.cached_lookup(name)
+        if node is None:
+            node = self.lookup_in_scopes(name, ctx)
+            if node is not None:
+                self.lookup_cache[name] = node
+        return node
+
+    def cached_lookup(self, name: str) -> Optional[SymbolTableNode]:
+        """Return the remembered result of looking up a name in the current scope.
+
+        Return None if there is none.  Lookups that fail aren't remembered,
+        since they report an error.  The results are forgotten whenever
+        the scope changes or a name is bound or deleted in any symbol
+        table (which also covers tables outside the current scope, but
+        is cheap to check).
+        """
+        if self.lookup_cache_version != mypy.nodes.symbol_table_version:
+            self.invalidate_lookup_cache()
+        node = self.lookup_cache.get(name)
+        if node is None:
+            self.lookup_misses += 1
+        else:
+            self.lookup_hits += 1
+        return node
+
+    def invalidate_lookup_cache(self) -> None:
+        if self.lookup_cache:
+            self.lookup_cache.clear()
+            self.lookup_invalidations += 1
+        self.lookup_cache_version = mypy.nodes.symbol_table_version
+
+    def format_lookup_stats(self) -> str:
+        total = self.lookup_hits + self.lookup_misses
+        return 'name lookup cache: {} of {} lookups hit ({:.1%}), {} invalidations'.format(
+            self.lookup_hits, total, self.lookup_hits / total if total else 0.0,
+            self.lookup_invalidations)
+
+    def lookup_in_scopes(self, name: str, ctx: Context) -> SymbolTableNode:
+        """Look up an unqualified name in all active namespaces (without caching)."""
         # 1a. Name declared using 'global x' takes precedence
         if name in self.global_decls[-1]:
             if name in self.globals:
@@ -2523,10 +2582,17 @@ class SemanticAnalyzer(NodeVisitor):
         if '.' not in name:
             return self.lookup(name, ctx)
         else:
+            n = self.cached_lookup(name)
+            if n:
+                return n
             parts = name.split('.')
-            n = self.lookup(parts[0], ctx)  # type: SymbolTableNode
+            n = self.lookup(parts[0], ctx)
+            # Only remember names that are found through modules, since
+            # looking up names in classes also depends on the MRO
+            only_modules = True
             if n:
                 for i in range(1, len(parts)):
+                    only_modules = only_modules and isinstance(n.node, MypyFile)
                     if isinstance(n.node, TypeInfo):
                         if n.node.mro is None:
                             # We haven't yet analyzed the class `n.node`.  Fall back to direct
@@ -2551,6 +2617,8 @@ class SemanticAnalyzer(NodeVisitor):
                         break
                 if n:
                     n = self.normalize_type_alias(n, ctx)
+                    if n and only_modules:
+                        self.lookup_cache[name] = n
             return n
 
     def builtin_type(self, fully_qualified_name: str) -> Instance:
@@ -2565,11 +2633,10 @@ class SemanticAnalyzer(NodeVisitor):
         module namespace is ignored.
         """
         assert '.' in name
-        parts = name.split('.')
-        n = self.modules[parts[0]]
-        for i in range(1, len(parts) - 1):
-            n = cast(MypyFile, n.names[parts[i]].node)
-        return n.names[parts[-1]]
+        prefix, _, last = name.rpartition('.')
+        table = self.prefix_table(prefix)
+        assert table is not None, name
+        return table[last]
 
     def lookup_fully_qualified_or_none(self, name: str) -> SymbolTableNode:
         """Lookup a fully qualified name.
@@ -2578,14 +2645,35 @@ class SemanticAnalyzer(NodeVisitor):
         module namespace is ignored.
         """
         assert '.' in name
-        parts = name.split('.')
-        n = self.modules[parts[0]]
-        for i in range(1, len(parts) - 1):
-            next_sym = n.names.get(parts[i])
-            if not next_sym:
-                return None
-            n = cast(MypyFile, next_sym.node)
-        return n.names.get(parts[-1])
+        prefix, _, last = name.rpartition('.')
+        table = self.prefix_table(prefix)
+        if table is None:
+            return None
+        return table.get(last)
+
+    def prefix_table(self, prefix: str) -> Optional[SymbolTable]:
+        """Return the symbol table of the module referred to by a dotted prefix.
+
+        The first component is a module, and the rest are looked up in the
+        previous module.  Return None if something isn't defined.  Modules
+        and the names that refer to them don't change, so the tables of
+        modules are remembered for each prefix.
+        """
+        table = self.prefix_tables.get(prefix)
+        if table is None:
+            parts = prefix.split('.')
+            module = self.modules[parts[0]]
+            only_modules = True
+            for part in parts[1:]:
+                sym = module.names.get(part)
+                if not sym:
+                    return None
+                module = cast(MypyFile, sym.node)
+                only_modules = only_modules and isinstance(module, MypyFile)
+            table = module.names
+            if only_modules:
+                self.prefix_tables[prefix] = table
+        return table
 
     def qualified_name(self, n: str) -> str:
         return self.cur_mod_id + '.' + n
@@ -2596,12 +2684,14 @@ class SemanticAnalyzer(NodeVisitor):
         self.nonlocal_decls.append(set())
         # -1 since entering block will increment this to 0.
         self.block_depth.append(-1)
+        self.invalidate_lookup_cache()
 
     def leave(self) -> None:
         self.locals.pop()
         self.global_decls.pop()
         self.nonlocal_decls.pop()
         self.block_depth.pop()
+        self.invalidate_lookup_cache()
 
     def is_func_scope(self) -> bool:
         return self.locals[-1] is not None
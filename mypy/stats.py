@@ -8,8 +8,9 @@ from typing import Any, Dict, List, cast, Tuple
 from mypy.traverser import TraverserVisitor
 from mypy.types import (
     Type, AnyType, Instance, FunctionLike, TupleType, Void, TypeVarType,
-    TypeQuery, ANY_TYPE_STRATEGY, CallableType
+    TypeQuery, ANY_TYPE_STRATEGY, CallableType, TypeVarId, HAS_ANY
 )
+from mypy.expandtype import expand_type
 from mypy import nodes
 from mypy.nodes import (
     Expression, FuncDef, TypeApplication, AssignmentStmt, NameExpr, CallExpr, MypyFile,
@@ -36,6 +37,8 @@ class StatisticsVisitor(TraverserVisitor):
         self.inferred = inferred
         self.typemap = typemap
         self.all_nodes = all_nodes
+        # Values of type variables in the function being visited
+        self.typevar_values = {}  # type: Dict[TypeVarId, Type]
 
         self.num_precise = 0
         self.num_imprecise = 0
@@ -57,26 +60,32 @@ class StatisticsVisitor(TraverserVisitor):
         TraverserVisitor.__init__(self)
 
     def visit_func_def(self, o: FuncDef) -> None:
-        self.line = o.line
-        if len(o.expanded) > 1:
-            if o in o.expanded:
-                print('ERROR: cycle in function expansion; skipping')
-                return
-            for defn in o.expanded:
-                self.visit_func_def(cast(FuncDef, defn))
+        if len(o.expansions) > 1 and self.inferred:
+            # The function was type checked once for each combination of
+            # values of type variables; visit it once for each combination.
+            typemap, typevar_values = self.typemap, self.typevar_values
+            for values, types in o.expansions:
+                self.typevar_values = values
+                self.typemap = types
+                self.visit_func_signature_and_body(o)
+            self.typemap, self.typevar_values = typemap, typevar_values
         else:
-            if o.type:
-                sig = cast(CallableType, o.type)
-                arg_types = sig.arg_types
-                if (sig.arg_names and sig.arg_names[0] == 'self' and
-                        not self.inferred):
-                    arg_types = arg_types[1:]
-                for arg in arg_types:
-                    self.type(arg)
-                self.type(sig.ret_type)
-            elif self.all_nodes:
-                self.record_line(self.line, TYPE_ANY)
-            super().visit_func_def(o)
+            self.visit_func_signature_and_body(o)
+
+    def visit_func_signature_and_body(self, o: FuncDef) -> None:
+        self.line = o.line
+        if o.type:
+            sig = cast(CallableType, o.type)
+            arg_types = sig.arg_types
+            if (sig.arg_names and sig.arg_names[0] == 'self' and
+                    not self.inferred):
+                arg_types = arg_types[1:]
+            for arg in arg_types:
+                self.type(arg)
+            self.type(sig.ret_type)
+        elif self.all_nodes:
+            self.record_line(self.line, TYPE_ANY)
+        super().visit_func_def(o)
 
     def visit_type_application(self, o: TypeApplication) -> None:
         self.line = o.line
@@ -156,6 +165,8 @@ class StatisticsVisitor(TraverserVisitor):
                 self.type(typ)
 
     def type(self, t: Type) -> None:
+        if self.typevar_values:
+            t = expand_type(t, self.typevar_values)
         if isinstance(t, AnyType):
             self.log('  !! Any type around line %d' % self.line)
             self.num_any += 1
@@ -198,26 +209,44 @@ class StatisticsVisitor(TraverserVisitor):
 
 
 def dump_type_stats(tree: MypyFile, path: str, inferred: bool = False,
-                    typemap: Dict[Expression, Type] = None) -> None:
+                    typemap: Dict[Expression, Type] = None) -> List[str]:
+    """Print statistics about the types in a file and return the printed lines.
+
+    The lines are cached in incremental mode, so that they can be printed
+    again when the module is fresh.
+    """
+    lines = type_stats(tree, path, inferred, typemap)
+    print_type_stats(lines)
+    return lines
+
+
+def print_type_stats(lines: List[str]) -> None:
+    """Print statistics lines produced by type_stats()."""
+    for line in lines:
+        print(line)
+
+
+def type_stats(tree: MypyFile, path: str, inferred: bool = False,
+               typemap: Dict[Expression, Type] = None) -> List[str]:
     if is_special_module(path):
-        return
-    print(path)
+        return []
     visitor = StatisticsVisitor(inferred, typemap)
     tree.accept(visitor)
-    for line in visitor.output:
-        print(line)
-    print('  ** precision **')
-    print('  precise  ', visitor.num_precise)
-    print('  imprecise', visitor.num_imprecise)
-    print('  any      ', visitor.num_any)
-    print('  ** kinds **')
-    print('  simple   ', visitor.num_simple)
-    print('  generic  ', visitor.num_generic)
-    print('  function ', visitor.num_function)
-    print('  tuple    ', visitor.num_tuple)
-    print('  TypeVar  ', visitor.num_typevar)
-    print('  complex  ', visitor.num_complex)
-    print('  any      ', visitor.num_any)
+    lines = [path]
+    lines.extend(visitor.output)
+    lines.append('  ** precision **')
+    lines.append('  precise   {}'.format(visitor.num_precise))
+    lines.append('  imprecise {}'.format(visitor.num_imprecise))
+    lines.append('  any       {}'.format(visitor.num_any))
+    lines.append('  ** kinds **')
+    lines.append('  simple    {}'.format(visitor.num_simple))
+    lines.append('  generic   {}'.format(visitor.num_generic))
+    lines.append('  function  {}'.format(visitor.num_function))
+    lines.append('  tuple     {}'.format(visitor.num_tuple))
+    lines.append('  TypeVar   {}'.format(visitor.num_typevar))
+    lines.append('  complex   {}'.format(visitor.num_complex))
+    lines.append('  any       {}'.format(visitor.num_any))
+    return lines
 
 
 def is_special_module(path: str) -> bool:
@@ -225,10 +254,16 @@ def is_special_module(path: str) -> bool:
 
 
 def is_imprecise(t: Type) -> bool:
-    return t.accept(HasAnyQuery())
+    return bool(t.properties() & HAS_ANY) or t.accept(HasAnyQuery())
 
 
 class HasAnyQuery(TypeQuery):
+    """Query whether a type has an Any component or is (or has) a bare tuple.
+
+    Unlike the HAS_ANY property, this also treats tuple instances as
+    imprecise.
+    """
+
     def __init__(self) -> None:
         super().__init__(False, ANY_TYPE_STRATEGY)
 
@@ -265,8 +300,11 @@ def is_complex(t: Type) -> bool:
 html_files = []  # type: List[Tuple[str, str, int, int]]
 
 
-def generate_html_report(tree: MypyFile, path: str, type_map: Dict[Expression, Type],
-                         output_dir: str) -> None:
+def generate_html_report(path: str, line_map: Dict[int, int], output_dir: str) -> None:
+    """Write the HTML report of a file, given the precision of each line.
+
+    The line map is the one computed by StatisticsVisitor.
+    """
     if is_special_module(path):
         return
     # There may be more than one right answer for "what should we do here?"
@@ -274,8 +312,6 @@ def generate_html_report(tree: MypyFile, path: str, type_map: Dict[Expression, T
     path = os.path.relpath(path)
     if path.startswith('..'):
         return
-    visitor = StatisticsVisitor(inferred=True, typemap=type_map, all_nodes=True)
-    tree.accept(visitor)
     assert not os.path.isabs(path) and not path.startswith('..')
     # This line is *wrong* if the preceding assert fails.
     target_path = os.path.join(output_dir, 'html', path)
@@ -302,7 +338,7 @@ def generate_html_report(tree: MypyFile, path: str, type_map: Dict[Expression, T
     with open(path) as input_file:
         for i, line in enumerate(input_file):
             lineno = i + 1
-            status = visitor.line_map.get(lineno, TYPE_PRECISE)
+            status = line_map.get(lineno, TYPE_PRECISE)
             style_map = {TYPE_PRECISE: 'white',
                          TYPE_IMPRECISE: 'yellow',
                          TYPE_ANY: 'red'}
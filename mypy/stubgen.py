@@ -564,6 +564,9 @@ def find_self_initializers(fdef: FuncBase) -> List[Tuple[str, Expression]]:
 
 
 def find_classes(node: MypyFile) -> Set[str]:
+    if node.node_index is not None:
+        # Classes that aren't nested within another class.
+        return {cdef.name for cdef, _, classes in node.node_index.class_defs if classes == 0}
     results = set()  # type: Set[str]
 
     class ClassTraverser(mypy.traverser.TraverserVisitor):
@@ -12,12 +12,20 @@ import mypy.constraints
 from mypy import messages, sametypes
 from mypy.nodes import CONTRAVARIANT, COVARIANT
 from mypy.maptype import map_instance_to_supertype
+from mypy.typeintern import (
+    intern_copy, is_interned, is_interned_without_type_vars, TypeCache
+)
 
 from mypy import experiments
 
 
 TypeParameterChecker = Callable[[Type, Type, int], bool]
 
+# Results of is_subtype() for pairs of interned instance types that don't
+# contain type variables, using the default type parameter checker.  The
+# results don't depend on anything else that can change during a build.
+subtype_cache = TypeCache('Subtype')
+
 
 def check_type_parameter(lefta: Type, righta: Type, variance: int) -> bool:
     if variance == COVARIANT:
@@ -44,11 +52,23 @@ def is_subtype(left: Type, right: Type,
     if (isinstance(right, AnyType) or isinstance(right, UnboundType)
             or isinstance(right, ErasedType)):
         return True
+    elif left is right and is_interned(left):
+        return True
     elif isinstance(right, UnionType) and not isinstance(left, UnionType):
         return any(is_subtype(left, item, type_parameter_checker)
                    for item in right.items)
-    else:
-        return left.accept(SubtypeVisitor(right, type_parameter_checker))
+    elif isinstance(left, Instance) and isinstance(right, Instance):
+        if (type_parameter_checker is check_type_parameter
+                and is_interned_without_type_vars(left)
+                and is_interned_without_type_vars(right)):
+            key = (left, right)
+            result = subtype_cache.get(key)
+            if result is None:
+                result = left.accept(SubtypeVisitor(right, type_parameter_checker))
+                subtype_cache.set(key, result)
+            return result
+        subtype_cache.uncached += 1
+    return left.accept(SubtypeVisitor(right, type_parameter_checker))
 
 
 def is_subtype_ignoring_tvars(left: Type, right: Type) -> bool:
@@ -121,9 +141,15 @@ class SubtypeVisitor(TypeVisitor[bool]):
             return True
         right = self.right
         if isinstance(right, Instance):
-            if left.type._promote and is_subtype(left.type._promote,
-                                                 self.right,
-                                                 self.check_type_parameter):
+            # Intern copies of the derived types as well to let the nested
+            # checks use the subtype cache.
+            intern = is_interned(left) and is_interned(right)
+            promote = left.type._promote
+            if promote and intern:
+                promote = intern_copy(promote)
+            if promote and is_subtype(promote,
+                                      self.right,
+                                      self.check_type_parameter):
                 return True
             rname = right.type.fullname()
             if not left.type.has_base(rname) and rname != 'builtins.object':
@@ -131,6 +157,8 @@ class SubtypeVisitor(TypeVisitor[bool]):
 
             # Map left type to corresponding right instances.
             t = map_instance_to_supertype(left, right.type)
+            if intern:
+                t = cast(Instance, intern_copy(t))
 
             return all(self.check_type_parameter(lefta, righta, tvar.variance)
                        for lefta, righta, tvar in
@@ -356,6 +384,8 @@ def is_proper_subtype(t: Type, s: Type) -> bool:
     For proper subtypes, there's no need to rely on compatibility due to
     Any types. Any instance type t is also a proper subtype of t.
     """
+    if t is s and is_interned(t):
+        return True
     # FIX tuple types
     if isinstance(t, Instance):
         if isinstance(s, Instance):
@@ -3,9 +3,10 @@
 import typing
 
 from mypy.myunit import Suite, assert_equal, assert_true
-from mypy.checkexpr import map_actuals_to_formals
+from mypy.checkexpr import map_actuals_to_formals, filter_items_by_shape
 from mypy.nodes import ARG_POS, ARG_OPT, ARG_STAR, ARG_STAR2, ARG_NAMED
-from mypy.types import AnyType, TupleType
+from mypy.types import AnyType, TupleType, CallableType
+from mypy.typefixture import TypeFixture
 
 
 class MapActualsToFormalsSuite(Suite):
@@ -187,6 +188,43 @@ class MapActualsToFormalsSuite(Suite):
         assert_equal(result, expected)
 
 
+class FilterOverloadItemsSuite(Suite):
+    """Test cases for checkexpr.filter_items_by_shape."""
+
+    def set_up(self):
+        self.fx = TypeFixture()
+
+    def test_positional(self):
+        items = [self.callable([ARG_POS]),
+                 self.callable([ARG_POS, ARG_POS]),
+                 self.callable([ARG_POS, ARG_OPT]),
+                 self.callable([ARG_STAR])]
+        self.assert_filter([], items, [3])
+        self.assert_filter([ARG_POS], items, [0, 2, 3])
+        self.assert_filter([ARG_POS, ARG_POS], items, [1, 2, 3])
+        self.assert_filter([ARG_POS] * 3, items, [3])
+
+    def test_named(self):
+        items = [self.callable([(ARG_POS, 'x')]),
+                 self.callable([(ARG_POS, 'y')]),
+                 self.callable([(ARG_OPT, 'x'), ARG_STAR2])]
+        self.assert_filter(['x'], items, [0, 2])
+        self.assert_filter(['y'], items, [1, 2])
+        # Duplicate values for 'y' are only rejected by the full check.
+        self.assert_filter([ARG_POS, 'y'], items, [1, 2])
+        self.assert_filter([ARG_POS, 'z'], items, [2])
+
+    def callable(self, kinds_and_names):
+        kinds, names = expand_callee_kinds(kinds_and_names)
+        return CallableType([AnyType()] * len(kinds), kinds, names, AnyType(),
+                            self.fx.function)
+
+    def assert_filter(self, caller_kinds, items, expected):
+        caller_kinds, caller_names = expand_caller_kinds(caller_kinds)
+        result = filter_items_by_shape(items, caller_kinds, caller_names)
+        assert_equal([items.index(item) for item in result], expected)
+
+
 def expand_caller_kinds(kinds_or_names):
     kinds = []
     names = []
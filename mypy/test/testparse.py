@@ -3,9 +3,12 @@
 import os.path
 
 import typing
+from typing import List, Tuple
 
 from mypy import defaults
-from mypy.myunit import Suite, AssertionFailure
+from mypy.myunit import Suite, AssertionFailure, assert_equal
+from mypy.nodes import FuncDef, ClassDef, CallExpr, FuncExpr, Node
+from mypy.traverser import TraverserVisitor
 from mypy.test.helpers import assert_string_arrays_equal
 from mypy.test.data import parse_test_cases
 from mypy.test import config
@@ -77,3 +80,80 @@ def test_parse_error(testcase):
             testcase.output, e.messages,
             'Invalid compiler output ({}, line {})'.format(testcase.file,
                                                            testcase.line))
+
+
+NODE_INDEX_PROGRAM = """
+import m
+def f(x=g(1)):
+    class A:
+        def m(self, y=h()):
+            return lambda z=k(): z(l())
+    return A().m()
+
+@d(2)
+class B(C(1)):
+    class D:
+        pass
+    x = [e() for e in range(f())]
+    if x:
+        def n(self) -> None: pass
+"""
+
+
+class NodeIndexSuite(Suite):
+    def test_index_matches_tree(self) -> None:
+        tree = parse(NODE_INDEX_PROGRAM, fnam='main', errors=None, options=Options())
+        collector = DepthCollector()
+        tree.accept(collector)
+        index = tree.node_index
+        assert_equal(sorted_entries(collector.entries),
+                     sorted_entries(index.func_defs + index.class_defs + index.call_exprs))
+        assert_equal(12, len(index.call_exprs))
+
+
+def sorted_entries(entries: List[Tuple[Node, int, int]]) -> List[Tuple[str, int, int, int]]:
+    return sorted((type(node).__name__, node.line, funcs, classes)
+                  for node, funcs, classes in entries)
+
+
+class DepthCollector(TraverserVisitor):
+    """Collect definitions and calls with the numbers of enclosing functions and classes."""
+
+    def __init__(self) -> None:
+        self.entries = []  # type: List[Tuple[Node, int, int]]
+        self.funcs = 0
+        self.classes = 0
+
+    def add(self, node: Node) -> None:
+        self.entries.append((node, self.funcs, self.classes))
+
+    def visit_func_def(self, o: FuncDef) -> None:
+        self.add(o)
+        for arg in o.arguments:
+            if arg.initialization_statement:
+                arg.initialization_statement.accept(self)
+        self.funcs += 1
+        o.body.accept(self)
+        self.funcs -= 1
+
+    def visit_func_expr(self, o: FuncExpr) -> None:
+        for arg in o.arguments:
+            if arg.initialization_statement:
+                arg.initialization_statement.accept(self)
+        self.funcs += 1
+        o.body.accept(self)
+        self.funcs -= 1
+
+    def visit_class_def(self, o: ClassDef) -> None:
+        self.add(o)
+        for base in o.base_type_exprs:
+            base.accept(self)
+        for decorator in o.decorators:
+            decorator.accept(self)
+        self.classes += 1
+        o.defs.accept(self)
+        self.classes -= 1
+
+    def visit_call_expr(self, o: CallExpr) -> None:
+        self.add(o)
+        super().visit_call_expr(o)
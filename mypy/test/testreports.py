@@ -1,7 +1,17 @@
 """Test cases for reports generated by mypy."""
+import io
+import json
+import os
+import tempfile
 import textwrap
+from contextlib import redirect_stdout
 
+from typing import Any, Dict, List, Tuple
+
+from mypy import build
+from mypy.build import BuildManager, BuildSource, find_module_clear_caches
 from mypy.myunit import Suite, assert_equal
+from mypy.options import Options
 from mypy.report import CoberturaPackage, get_line_rate
 
 import lxml.etree as etree
@@ -38,3 +48,88 @@ class CoberturaReportSuite(Suite):
         ''').encode('ascii')
         assert_equal(expected_output,
                      etree.tostring(cobertura_package.as_xml(), pretty_print=True))
+
+
+class IncrementalReportSuite(Suite):
+    """Test reports of modules that are fresh in incremental mode."""
+
+    def set_up(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory(prefix='mypy-test-')
+        self.sources = []  # type: List[BuildSource]
+        for id, text in [('a', 'import b\ndef f(x: int) -> None:\n    y = b.g(x)\n'),
+                         ('b', 'def g(x):\n    return x\n')]:
+            path = os.path.join(self.tmpdir.name, id + '.py')
+            with open(path, 'w') as f:
+                f.write(text)
+            self.sources.append(BuildSource(path, id, None))
+
+    def tear_down(self) -> None:
+        self.tmpdir.cleanup()
+
+    def build(self, reports: List[str], dump_type_stats: bool = False,
+              dump_inference_stats: bool = False) -> BuildManager:
+        find_module_clear_caches()
+        options = Options()
+        options.incremental = True
+        options.use_builtins_fixtures = True
+        options.dump_type_stats = dump_type_stats
+        options.dump_inference_stats = dump_inference_stats
+        options.cache_dir = os.path.join(self.tmpdir.name, 'cache')
+        for report in reports:
+            options.report_dirs[report] = self.report_dir(report)
+        return build.build(sources=self.sources, options=options).manager
+
+    def build_stats(self, **stats: bool) -> Tuple[BuildManager, List[str]]:
+        """Build with the given statistics enabled and return the printed lines."""
+        output = io.StringIO()
+        with redirect_stdout(output):
+            manager = self.build([], **stats)
+        return manager, sorted(output.getvalue().splitlines())
+
+    def report_dir(self, report: str) -> str:
+        return os.path.join(self.tmpdir.name, report)
+
+    def read_reports(self, reports: List[str]) -> Dict[str, Any]:
+        result = {}  # type: Dict[str, Any]
+        for report in reports:
+            for name in os.listdir(self.report_dir(report)):
+                with open(os.path.join(self.report_dir(report), name)) as f:
+                    if name.endswith('.json'):
+                        result[report + '/' + name] = json.load(f)
+                    else:
+                        result[report + '/' + name] = f.read()
+        return result
+
+    def test_fresh_modules_are_reported(self) -> None:
+        reports = ['linecount', 'linecoverage']
+        manager = self.build(reports)
+        assert_equal({'a', 'b'}, manager.rechecked_modules & {'a', 'b'})
+        expected = self.read_reports(reports)
+        manager = self.build(reports)
+        assert_equal(set(), manager.rechecked_modules)
+        assert_equal(expected, self.read_reports(reports))
+
+    def test_missing_report_data_is_abandoned(self) -> None:
+        self.build(['linecount'])
+        manager = self.build(['linecount', 'linecoverage'])
+        assert_equal({'a', 'b'}, manager.rechecked_modules)
+        expected = self.read_reports(['linecoverage'])
+        manager = self.build(['linecoverage'])
+        assert_equal(set(), manager.rechecked_modules)
+        assert_equal(expected, self.read_reports(['linecoverage']))
+
+    def test_fresh_modules_are_in_stats(self) -> None:
+        manager, expected = self.build_stats(dump_type_stats=True, dump_inference_stats=True)
+        assert_equal({'a', 'b'}, manager.rechecked_modules & {'a', 'b'})
+        assert_equal(2, expected.count(self.sources[0].path))
+        manager, output = self.build_stats(dump_type_stats=True, dump_inference_stats=True)
+        assert_equal(set(), manager.rechecked_modules)
+        assert_equal(expected, output)
+
+    def test_missing_stats_are_abandoned(self) -> None:
+        self.build_stats(dump_type_stats=True)
+        manager, expected = self.build_stats(dump_inference_stats=True)
+        assert_equal({'a', 'b'}, manager.rechecked_modules & {'a', 'b'})
+        manager, output = self.build_stats(dump_inference_stats=True)
+        assert_equal(set(), manager.rechecked_modules)
+        assert_equal(expected, output)
@@ -7,15 +7,27 @@ from mypy.myunit import (
 )
 from mypy.erasetype import erase_type
 from mypy.expandtype import expand_type
-from mypy.join import join_types, join_simple
-from mypy.meet import meet_types
+from mypy.indirection import TypeIndirectionVisitor
+from mypy.join import join_types, join_simple, join_cache
+from mypy.maptype import map_instance_to_supertype
+from mypy.meet import meet_types, meet_cache
 from mypy.types import (
     UnboundType, AnyType, Void, CallableType, TupleType, TypeVarDef, Type,
     Instance, NoneTyp, ErrorType, Overloaded, TypeType, UnionType, UninhabitedType,
-    true_only, false_only
+    ErasedType, PartialType, true_only, false_only, HAS_ERASED, HAS_ERASED_INSTANCE, HAS_UNION,
+    HAS_ANY, HAS_PARTIAL
+)
+from mypy.nodes import (
+    ARG_POS, ARG_OPT, ARG_STAR, CONTRAVARIANT, INVARIANT, COVARIANT, MDEF, SymbolTableNode, Var
+)
+from mypy.subtypes import (
+    is_subtype, is_more_precise, is_proper_subtype, subtype_cache
+)
+from mypy import typeintern
+from mypy.typeintern import (
+    intern_type, intern_copy, is_interned, is_interned_without_type_vars,
+    reset_interned_types
 )
-from mypy.nodes import ARG_POS, ARG_OPT, ARG_STAR, CONTRAVARIANT, INVARIANT, COVARIANT
-from mypy.subtypes import is_subtype, is_more_precise, is_proper_subtype
 from mypy.typefixture import TypeFixture, InterfaceTypeFixture
 
 
@@ -117,6 +129,25 @@ class TypeOpsSuite(Suite):
     def test_expand_basic_generic_types(self):
         self.assert_expand(self.fx.gt, [(self.fx.t.id, self.fx.a)], self.fx.ga)
 
+    def test_expand_without_type_vars_returns_same_object(self):
+        ga = self.fx.ga
+        assert_true(expand_type(ga, {self.fx.t.id: self.fx.b}) is ga)
+        assert_true(expand_type(self.fx.gt, {}) is not self.fx.gt)
+        union = UnionType([self.fx.a, self.fx.b])
+        assert_equal(str(expand_type(union, {})), 'A')
+
+    def test_type_properties(self):
+        assert_false(self.fx.ga.has_type_vars())
+        assert_true(self.fx.gt.has_type_vars())
+        assert_true(self.callable([], self.fx.a, self.fx.gt).has_type_vars())
+        assert_equal(self.fx.ga.properties(), 0)
+        assert_equal(UnionType([self.fx.a, ErasedType()]).properties(),
+                     HAS_UNION | HAS_ERASED)
+        assert_equal(Instance(self.fx.gi, [self.fx.a], erased=True).properties(),
+                     HAS_ERASED_INSTANCE)
+        assert_equal(self.callable([], self.fx.anyt, self.fx.a).properties(), HAS_ANY)
+        assert_equal(PartialType(None, Var('x'), []).properties(), HAS_PARTIAL)
+
     # IDEA: Add test cases for
     #   tuple types
     #   callable types
@@ -322,6 +353,220 @@ class TypeOpsSuite(Suite):
         assert_true(fo.items[0].can_be_false)
         assert_true(fo.items[1] is tup_type)
 
+    # intern_type
+
+    def test_intern_structurally_equal_types(self):
+        reset_interned_types()
+        ga = intern_type(Instance(self.fx.gi, [self.fx.a]))
+        assert_true(intern_type(Instance(self.fx.gi, [Instance(self.fx.ai, [])])) is ga)
+        assert_true(intern_type(ga) is ga)
+        assert_true(intern_type(Instance(self.fx.gi, [self.fx.b])) is not ga)
+        assert_true(ga.args[0] is intern_type(Instance(self.fx.ai, [])))
+
+        c1 = intern_type(self.callable([], ga, UnionType([self.fx.a, self.fx.b])))
+        c2 = intern_type(self.callable([], Instance(self.fx.gi, [self.fx.a]),
+                                       UnionType([self.fx.a, self.fx.b])))
+        assert_true(c1 is c2)
+        assert_true(intern_type(self.callable([], ga, self.fx.a)) is not c1)
+
+    def test_intern_copy_does_not_modify_type(self):
+        reset_interned_types()
+        a = intern_type(Instance(self.fx.ai, []))
+        arg = Instance(self.fx.ai, [])
+        ga = Instance(self.fx.gi, [arg])
+        canonical = intern_copy(ga)
+        assert_true(canonical is not ga)
+        assert_true(canonical.args[0] is a)
+        assert_true(ga.args[0] is arg)
+        assert_false(is_interned(ga))
+        assert_false(is_interned(arg))
+        assert_true(intern_copy(Instance(self.fx.gi, [self.fx.a])) is canonical)
+        # The components of a type interned with intern_type() are copied too.
+        b = Instance(self.fx.bi, [])
+        gb = Instance(self.fx.gi, [b])
+        assert_true(intern_type(gb) is gb)
+        assert_true(gb.args[0] is not b)
+        assert_false(is_interned(b))
+
+    def test_intern_table_cleared_when_full(self):
+        reset_interned_types()
+        table_size = typeintern.INTERN_TABLE_SIZE
+        typeintern.INTERN_TABLE_SIZE = 3
+        try:
+            for arg in [self.fx.a, self.fx.b, self.fx.t, self.fx.a]:
+                # The table gets full while the components are interned.
+                t = intern_type(self.callable([], Instance(self.fx.gi, [arg]), arg,
+                                              Instance(self.fx.gi, [self.fx.b])))
+                assert_true(is_interned(t))
+                assert_true(all(is_interned(item) for item in t.arg_types + [t.ret_type]))
+                assert_equal(is_interned_without_type_vars(t), arg is not self.fx.t)
+        finally:
+            typeintern.INTERN_TABLE_SIZE = table_size
+            reset_interned_types()
+
+    def test_intern_keeps_truthiness(self):
+        reset_interned_types()
+        a = intern_type(Instance(self.fx.ai, []))
+        assert_true(intern_type(true_only(a)) is not a)
+        assert_true(intern_type(Instance(self.fx.ai, [])) is a)
+
+    def test_types_that_are_not_interned(self):
+        reset_interned_types()
+        for t in [Instance(self.fx.gi, [UnboundType('X')]),
+                  Instance(self.fx.gi, [ErrorType()]),
+                  ErrorType()]:
+            assert_true(intern_type(t) is t)
+            assert_false(is_interned(t))
+        err = ErrorType()
+        assert_false(is_subtype(err, err))
+
+    def test_interned_type_is_subtype_of_itself(self):
+        reset_interned_types()
+        ga = intern_type(Instance(self.fx.gi, [self.fx.a]))
+        assert_true(is_interned(ga))
+        assert_true(is_subtype(ga, ga))
+        assert_true(is_proper_subtype(ga, ga))
+
+    def test_interned_types_with_type_vars(self):
+        reset_interned_types()
+        assert_true(is_interned_without_type_vars(intern_type(self.fx.ga)))
+        assert_false(is_interned_without_type_vars(intern_type(self.fx.gt)))
+        assert_false(is_interned_without_type_vars(intern_type(self.fx.t)))
+        assert_false(is_interned_without_type_vars(self.fx.gb))
+
+    # Subtype cache
+
+    def test_subtype_cache(self):
+        reset_interned_types()
+        subtype_cache.reset_stats()
+        a = intern_type(self.fx.a)
+        b = intern_type(self.fx.b)
+        ga = intern_type(self.fx.ga)
+        gb = intern_type(self.fx.gb)
+        for i in range(2):
+            assert_true(is_subtype(b, a))
+            assert_false(is_subtype(a, b))
+            assert_false(is_subtype(ga, gb))
+        # Checking the (invariant) type argument of G reuses the result for A and B.
+        assert_equal(subtype_cache.misses, 3)
+        assert_equal(subtype_cache.hits, 4)
+        assert_equal(subtype_cache.table[b, a], True)
+        assert_equal(subtype_cache.table[ga, gb], False)
+        reset_interned_types()
+        assert_equal(len(subtype_cache.table), 0)
+
+    def test_join_and_meet_caches(self):
+        reset_interned_types()
+        join_cache.reset_stats()
+        meet_cache.reset_stats()
+        a = intern_type(Instance(self.fx.ai, []))
+        b = intern_type(Instance(self.fx.bi, []))
+        c = intern_type(Instance(self.fx.ci, []))
+        j = join_types(b, c)
+        assert_equal(str(j), 'A')
+        assert_true(is_interned(j))
+        assert_true(join_types(b, c) is j)
+        assert_equal(join_cache.hits, 1)
+        m = meet_types(a, b)
+        assert_true(meet_types(a, b) is m)
+        assert_equal(meet_cache.hits, 1)
+        join_types(intern_type(self.fx.gt), intern_type(self.fx.ga))
+        assert_equal(join_cache.uncached, 1)
+        # Types that aren't interned are neither interned nor memoized.
+        assert_equal(str(join_types(self.fx.b, self.fx.c)), 'A')
+        assert_false(is_interned(self.fx.b))
+        assert_equal(join_cache.uncached, 2)
+
+    def test_subtype_cache_bypassed(self):
+        reset_interned_types()
+        subtype_cache.reset_stats()
+        gt = intern_type(self.fx.gt)
+        assert_true(is_subtype(gt, gt))
+        assert_true(is_subtype(self.fx.b, self.fx.a))
+        assert_true(is_subtype(intern_type(self.fx.gt), intern_type(self.fx.gdyn)))
+        assert_equal(subtype_cache.uncached, 2)
+        assert_equal(len(subtype_cache.table), 0)
+
+    # Module references (mypy.indirection)
+
+    def test_indirection_cache_of_interned_types(self):
+        reset_interned_types()
+        ci = self.fx.make_type_info('modc.C', typevars=['T'])
+        d = Instance(self.fx.make_type_info('modd.D'), [])
+        intern_type(Instance(ci, [d]))
+        # The item of an interned TypeType isn't replaced with the canonical
+        # object, so it can be seen before the TypeType is visited.
+        inst = Instance(ci, [d])
+        tt = intern_type(TypeType(inst))
+        assert_true(is_interned(tt))
+        visitor = TypeIndirectionVisitor()
+        assert_equal(sorted(visitor.find_modules([inst, tt])), ['modc', 'modd'])
+        assert_equal(sorted(visitor.find_modules([tt])), ['modc', 'modd'])
+
+    # map_instance_to_supertype and has_base
+
+    def test_map_instance_to_supertype(self):
+        gsab = Instance(self.fx.gsi, [self.fx.a, self.fx.b])
+        assert_equal(str(map_instance_to_supertype(gsab, self.fx.gi)), 'G[B*]')
+        assert_true(self.fx.gi in self.fx.gsi.supertype_maps())
+        gsba = Instance(self.fx.gsi, [self.fx.b, self.fx.a])
+        assert_equal(str(map_instance_to_supertype(gsba, self.fx.gi)), 'G[A*]')
+        assert_equal(str(map_instance_to_supertype(gsab, self.fx.gsi)), 'GS[A, B]')
+
+    def test_has_base_after_mro_change(self):
+        info = self.fx.bi
+        assert_true(info.has_base('A'))
+        assert_false(info.has_base('D'))
+        info.mro = [info, self.fx.di, self.fx.oi]
+        assert_false(info.has_base('A'))
+        assert_true(info.has_base('D'))
+        assert_true(info.has_base('builtins.object'))
+
+    def test_member_lookup_sees_new_names(self):
+        assert_equal(self.fx.bi.get('x'), None)
+        node = SymbolTableNode(MDEF, Var('x'))
+        self.fx.ai.names['x'] = node
+        assert_true(self.fx.bi.get('x') is node)
+        node2 = SymbolTableNode(MDEF, Var('x'))
+        self.fx.bi.names['x'] = node2
+        assert_true(self.fx.bi.get('x') is node2)
+        del self.fx.bi.names['x']
+        assert_true(self.fx.bi.get('x') is node)
+        self.fx.ai.names.pop('x')
+        assert_equal(self.fx.bi.get('x'), None)
+        self.fx.ai.names.update({'x': node})
+        assert_true(self.fx.bi.get('x') is node)
+        self.fx.ai.names.clear()
+        assert_equal(self.fx.bi.get('x'), None)
+        self.fx.ai.names.setdefault('x', node)
+        assert_true(self.fx.bi.get('x') is node)
+
+    def test_member_lookup_ignores_unrelated_names(self):
+        assert_equal(self.fx.bi.get('x'), None)
+        members = self.fx.bi._members
+        supertype_maps = self.fx.bi.supertype_maps()
+        # C is not in the MRO of B.
+        self.fx.ci.names['x'] = SymbolTableNode(MDEF, Var('x'))
+        assert_equal(self.fx.bi.get('x'), None)
+        assert_true(self.fx.bi._members is members)
+        assert_true(self.fx.bi.supertype_maps() is supertype_maps)
+
+    # make_simplified_union
+
+    def test_simplified_union(self):
+        fx = self.fx
+        self.assert_simplified_union([fx.a, fx.b], 'A')
+        self.assert_simplified_union([fx.b, fx.c, fx.d], 'Union[B, C, D]')
+        self.assert_simplified_union([fx.b, fx.d, fx.a], 'Union[D, A]')
+        self.assert_simplified_union([fx.b, UnionType([fx.c, fx.o])], 'builtins.object')
+        self.assert_simplified_union([fx.ga, fx.gb, fx.d], 'Union[G[A], G[B], D]')
+        self.assert_simplified_union([fx.b, fx.anyt], 'Any')
+        # None is a subtype of B without strict optional checking.
+        self.assert_simplified_union([fx.b, fx.b, fx.nonet], 'B')
+
+    def assert_simplified_union(self, items: List[Type], expected: str) -> None:
+        assert_equal(str(UnionType.make_simplified_union(items)), expected)
+
     # Helpers
 
     def tuple(self, *a):
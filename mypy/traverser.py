@@ -1,8 +1,10 @@
 """Generic node traverser visitor"""
 
+from typing import List, Sequence
+
 from mypy.visitor import NodeVisitor
 from mypy.nodes import (
-    Block, MypyFile, FuncItem, CallExpr, ClassDef, Decorator, FuncDef,
+    Node, Block, MypyFile, FuncItem, CallExpr, ClassDef, Decorator, FuncDef,
     ExpressionStmt, AssignmentStmt, OperatorAssignmentStmt, WhileStmt,
     ForStmt, ReturnStmt, AssertStmt, DelStmt, IfStmt, RaiseStmt,
     TryStmt, WithStmt, MemberExpr, OpExpr, SliceExpr, CastExpr, RevealTypeExpr,
@@ -216,3 +218,16 @@ class TraverserVisitor(NodeVisitor[None]):
 
     def visit_func_expr(self, o: FuncExpr) -> None:
         self.visit_func(o)
+
+
+def traverse_all(tree: Node, visitors: Sequence[TraverserVisitor]) -> None:
+    """Run several traverser visitors over a tree.
+
+    A visitor that is given more than once (for example, because it is
+    shared by several reporters) is only run once.
+    """
+    done = []  # type: List[TraverserVisitor]
+    for visitor in visitors:
+        if not any(visitor is other for other in done):
+            tree.accept(visitor)
+            done.append(visitor)
@@ -0,0 +1,326 @@
+"""Interning (hash-consing) of types.
+
+intern_type() maps structurally equal types to a single canonical
+object.  Comparing two interned types is an identity check, and
+interned types can be used as cheap (identity-based) dictionary keys
+when memoizing type operations.
+
+Interning is only an optimization: types that have not been interned
+(or that can't be, such as types containing UnboundType or PartialType)
+still work everywhere, and code must never assume that structurally
+equal types are the same object.  Interned types are shared and must
+never be modified.  Their line and column are those of the first
+occurrence, so only types whose location doesn't matter should be
+interned.  intern_type() may make its argument canonical, so it is only
+used for types that the caller has just constructed; intern_copy()
+interns a copy instead and can be used for any type.
+
+The table refers to TypeInfos of the current build, so it is cleared by
+reset_interned_types() when a build starts.  Memoization tables keyed on
+interned types are TypeCache objects, which are cleared at the same time.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import copy
+
+from mypy.types import (
+    Type, TypeVisitor, UnboundType, ErrorType, TypeList, AnyType, Void, NoneTyp,
+    UninhabitedType, ErasedType, DeletedType, TypeVarType, TypeVarDef, Instance, CallableType,
+    Overloaded, TupleType, StarType, UnionType, PartialType, EllipsisType, TypeType
+)
+
+
+# Maximum number of interned types; the table is cleared when it gets full
+INTERN_TABLE_SIZE = 100000
+
+# Map from structural key to the canonical object for the type
+interned_types = {}  # type: Dict[tuple, Type]
+# Map from id of a canonical object to whether the type contains type
+# variables; this also makes interning the object again cheap
+interned_ids = {}  # type: Dict[int, bool]
+# Maximum number of entries in a TypeCache; a cache is cleared when it gets full
+TYPE_CACHE_SIZE = 50000
+
+
+def intern_type(t: Type) -> Type:
+    """Return the canonical object for a type (or t itself if it can't be interned).
+
+    If there is no canonical object yet, t becomes one and its components
+    are replaced with canonical ones, so t must have been constructed by
+    the caller.  The components themselves are never modified.
+    """
+    reset_if_full()
+    canonical = intern_component(t, make_copy=False)
+    if canonical is None:
+        return t
+    return canonical
+
+
+def intern_copy(t: Type) -> Type:
+    """Return the canonical object for a type without modifying t.
+
+    If there is no canonical object yet, a copy of t becomes one.  Return t
+    itself if it can't be interned.
+    """
+    reset_if_full()
+    canonical = intern_component(t, make_copy=True)
+    if canonical is None:
+        return t
+    return canonical
+
+
+def reset_if_full() -> None:
+    # This is only done before interning a type, not while interning its
+    # components, since the components interned so far would be dropped.
+    if len(interned_types) >= INTERN_TABLE_SIZE:
+        reset_interned_types()
+
+
+def intern_component(t: Type, make_copy: bool = True) -> Optional[Type]:
+    """Return the canonical object for a type, or None if it can't be interned.
+
+    This never clears the table (see reset_if_full()).
+    """
+    if id(t) in interned_ids:
+        return t
+    key = t.accept(intern_key_visitor)
+    if key is None:
+        return None
+    canonical = interned_types.get(key)
+    if canonical is None:
+        has_type_vars = isinstance(t, TypeVarType) or key_has_type_vars(key)
+        canonical = copy.copy(t) if make_copy else t
+        interned_types[key] = canonical
+        interned_ids[id(canonical)] = has_type_vars
+        replace_components(canonical)
+    return canonical
+
+
+def is_interned(t: Type) -> bool:
+    """Is t the canonical object for its type?
+
+    Interned types never contain ErrorType or PartialType, so each one is a
+    subtype of (and the same type as) itself.
+    """
+    return id(t) in interned_ids
+
+
+def is_interned_without_type_vars(t: Type) -> bool:
+    """Is t an interned type that doesn't contain type variables?"""
+    return interned_ids.get(id(t)) is False
+
+
+def key_has_type_vars(key: tuple) -> bool:
+    for item in key:
+        if isinstance(item, tuple):
+            if key_has_type_vars(item):
+                return True
+        elif isinstance(item, Type) and interned_ids[id(item)]:
+            return True
+    return False
+
+
+def replace_components(t: Type) -> None:
+    """Make a newly interned type refer to the canonical versions of its components.
+
+    The components were interned when computing the key, so this is cheap.
+    """
+    if isinstance(t, Instance):
+        t.args = [intern_component(arg) or arg for arg in t.args]
+    elif isinstance(t, CallableType):
+        t.arg_types = [intern_component(arg) or arg for arg in t.arg_types]
+        t.ret_type = intern_component(t.ret_type) or t.ret_type
+    elif isinstance(t, (TupleType, UnionType)):
+        t.items = [intern_component(item) or item for item in t.items]
+
+
+def type_key(t: Type) -> Optional[tuple]:
+    """Return a hashable key that is equal for structurally equal types.
+
+    Return None if the type can't be interned.  Unlike intern_type(), this
+    doesn't modify the intern table.
+    """
+    return t.accept(structural_key_visitor)
+
+
+def reset_interned_types() -> None:
+    interned_types.clear()
+    interned_ids.clear()
+    for cache in type_caches:
+        cache.clear()
+
+
+class TypeCache:
+    """Memoization table for an operation on interned types.
+
+    The table is cleared whenever the intern table is, since the ids of the
+    canonical objects may be reused after that, and when it gets full.  The
+    numbers of hits and misses are counted, and the user of the cache counts
+    the operations that couldn't use it (usually because the operands
+    aren't interned) in 'uncached'.
+    """
+
+    def __init__(self, name: str, max_size: int = TYPE_CACHE_SIZE) -> None:
+        self.name = name
+        self.max_size = max_size
+        self.table = {}  # type: Dict[Any, Any]
+        self.reset_stats()
+        type_caches.append(self)
+
+    def get(self, key: Any) -> Any:
+        """Return the cached value for key, or None if there is none."""
+        value = self.table.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: Any, value: Any) -> None:
+        if len(self.table) >= self.max_size:
+            self.table.clear()
+        self.table[key] = value
+
+    def clear(self) -> None:
+        self.table.clear()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    def format_stats(self) -> str:
+        total = self.hits + self.misses + self.uncached
+        return '{} cache: {} of {} operations hit ({:.1%}), {} not cacheable'.format(
+            self.name, self.hits, total, self.hits / total if total else 0.0, self.uncached)
+
+
+# All TypeCache objects
+type_caches = []  # type: List[TypeCache]
+
+
+def reset_type_cache_stats() -> None:
+    for cache in type_caches:
+        cache.reset_stats()
+
+
+def type_cache_stats() -> List[str]:
+    """Return a description of the hit rate of each TypeCache."""
+    return [cache.format_stats() for cache in type_caches]
+
+
+class TypeKeyVisitor(TypeVisitor[Optional[tuple]]):
+    """Compute the key of a type from the representations of its components.
+
+    The representation of a component is given by the 'component' function,
+    which returns None if the component can't be interned.  The key includes
+    everything that can affect type checking or error messages, except the
+    line and column.
+    """
+
+    def __init__(self, component: Callable[[Type], Any]) -> None:
+        self.component = component
+
+    def components(self, types: Sequence[Type]) -> Optional[tuple]:
+        result = tuple(self.component(t) for t in types)
+        if any(item is None for item in result):
+            return None
+        return result
+
+    def optional_component(self, t: Optional[Type]) -> Any:
+        return '' if t is None else self.component(t)
+
+    def key(self, t: Type, *items: Any) -> Optional[tuple]:
+        if any(item is None for item in items):
+            return None
+        return (type(t), t.can_be_true, t.can_be_false) + items
+
+    # Types that only exist before semantic analysis, or that are changed
+    # in place during type checking, are not interned.  ErrorType is left
+    # out since it isn't a subtype of itself.
+
+    def visit_unbound_type(self, t: UnboundType) -> Optional[tuple]:
+        return None
+
+    def visit_type_list(self, t: TypeList) -> Optional[tuple]:
+        return None
+
+    def visit_error_type(self, t: ErrorType) -> Optional[tuple]:
+        return None
+
+    def visit_star_type(self, t: StarType) -> Optional[tuple]:
+        return None
+
+    def visit_partial_type(self, t: PartialType) -> Optional[tuple]:
+        return None
+
+    def visit_ellipsis_type(self, t: EllipsisType) -> Optional[tuple]:
+        return None
+
+    def visit_any(self, t: AnyType) -> Optional[tuple]:
+        return self.key(t, t.implicit)
+
+    def visit_void(self, t: Void) -> Optional[tuple]:
+        return self.key(t, t.source or '')
+
+    def visit_none_type(self, t: NoneTyp) -> Optional[tuple]:
+        return self.key(t, t.is_ret_type)
+
+    def visit_uninhabited_type(self, t: UninhabitedType) -> Optional[tuple]:
+        return self.key(t)
+
+    def visit_erased_type(self, t: ErasedType) -> Optional[tuple]:
+        return self.key(t)
+
+    def visit_deleted_type(self, t: DeletedType) -> Optional[tuple]:
+        return self.key(t, t.source or '')
+
+    def visit_type_var(self, t: TypeVarType) -> Optional[tuple]:
+        return self.key(t, t.name, t.id.raw_id, t.id.meta_level,
+                        self.components(t.values), self.optional_component(t.upper_bound),
+                        t.variance)
+
+    def visit_instance(self, t: Instance) -> Optional[tuple]:
+        if t.type is None:
+            # Not fixed up yet after deserialization.
+            return None
+        return self.key(t, t.type, t.erased, self.components(t.args))
+
+    def visit_callable_type(self, t: CallableType) -> Optional[tuple]:
+        return self.key(t, self.components(t.arg_types), tuple(t.arg_kinds),
+                        tuple(t.arg_names), self.component(t.ret_type),
+                        self.optional_component(t.fallback), t.name or '', t.definition or '',
+                        self.type_var_defs(t.variables), t.is_ellipsis_args,
+                        t.is_classmethod_class, t.implicit, t.special_sig or '')
+
+    def type_var_defs(self, defs: Sequence[TypeVarDef]) -> Optional[tuple]:
+        result = []
+        for d in defs:
+            values = self.components(d.values) if d.values is not None else ()
+            upper_bound = self.optional_component(d.upper_bound)
+            if values is None or upper_bound is None:
+                return None
+            result.append((d.name, d.id.raw_id, d.id.meta_level, values, upper_bound,
+                           d.variance))
+        return tuple(result)
+
+    def visit_overloaded(self, t: Overloaded) -> Optional[tuple]:
+        return self.key(t, self.components(t.items()))
+
+    def visit_tuple_type(self, t: TupleType) -> Optional[tuple]:
+        return self.key(t, self.components(t.items), self.optional_component(t.fallback),
+                        t.implicit)
+
+    def visit_union_type(self, t: UnionType) -> Optional[tuple]:
+        return self.key(t, self.components(t.items))
+
+    def visit_type_type(self, t: TypeType) -> Optional[tuple]:
+        return self.key(t, self.component(t.item))
+
+
+# Keys of interned types refer to the interned (canonical) components, so
+# computing them only needs to look at one level of the type.  Components
+# that aren't canonical yet are interned as copies.
+intern_key_visitor = TypeKeyVisitor(intern_component)
+structural_key_visitor = TypeKeyVisitor(type_key)
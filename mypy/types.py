@@ -10,6 +10,7 @@ import mypy.nodes
 from mypy.nodes import INVARIANT, SymbolNode
 
 from mypy import experiments
+from mypy.util import SlotDefaultsMeta
 
 
 T = TypeVar('T')
@@ -17,18 +18,35 @@ T = TypeVar('T')
 JsonDict = Dict[str, Any]
 
 
-class Type(mypy.nodes.Context):
+class Type(mypy.nodes.Context, metaclass=SlotDefaultsMeta):
     """Abstract base class for all types."""
 
+    __slots__ = ('line', 'column', 'can_be_true', 'can_be_false', '_properties')
+
     line = 0
     column = 0
     can_be_true = True
     can_be_false = True
+    # Cached result of properties(), or -1 if not computed yet
+    _properties = -1
 
     def __init__(self, line: int = -1, column: int = -1) -> None:
         self.line = line
         self.column = column
 
+    def properties(self) -> int:
+        """Return the property bits of the type (HAS_TYPE_VARS etc.).
+
+        They are computed on first use, so the components of a type must
+        not be changed after this has been called.
+        """
+        if self._properties < 0:
+            self._properties = self.accept(type_properties_visitor)
+        return self._properties
+
+    def has_type_vars(self) -> bool:
+        return bool(self.properties() & HAS_TYPE_VARS)
+
     def get_line(self) -> int:
         return self.line
 
@@ -55,7 +73,30 @@ class Type(mypy.nodes.Context):
         raise NotImplementedError('unexpected .class {}'.format(classname))
 
 
-class TypeVarId:
+class SharedInstanceMeta(SlotDefaultsMeta):
+    """Metaclass for types that are mostly constructed without arguments.
+
+    Types such as AnyType() are created constantly during type checking.
+    Calling the class without arguments returns an instance shared by all
+    such calls instead of allocating a new object.  Pass the line (and
+    column) explicitly to get a separate instance with a location.
+
+    Shared instances must never be modified; use copy_type() first.
+    """
+
+    def __call__(cls, *args: Any, **kwargs: Any) -> Any:
+        if args or kwargs:
+            return super().__call__(*args, **kwargs)
+        shared = cls.__dict__.get('shared_instance')
+        if shared is None:
+            shared = super().__call__()
+            cls.shared_instance = shared
+        return shared
+
+
+class TypeVarId(metaclass=SlotDefaultsMeta):
+    __slots__ = ('raw_id', 'meta_level')
+
     # A type variable is uniquely identified by its raw id and meta level.
 
     # For plain variables (type parameters of generic classes and
@@ -106,9 +147,11 @@ class TypeVarId:
         return self.meta_level > 0
 
 
-class TypeVarDef(mypy.nodes.Context):
+class TypeVarDef(mypy.nodes.Context, metaclass=SlotDefaultsMeta):
     """Definition of a single type variable."""
 
+    __slots__ = ('name', 'id', 'values', 'upper_bound', 'variance', 'line', 'column')
+
     name = ''
     id = None  # type: TypeVarId
     values = None  # type: List[Type]  # Value restriction, empty list if no restriction
@@ -175,6 +218,8 @@ class TypeVarDef(mypy.nodes.Context):
 class UnboundType(Type):
     """Instance type that has not been bound during semantic analysis."""
 
+    __slots__ = ('name', 'args', 'optional', 'is_ret_type', 'empty_tuple_index')
+
     name = ''
     args = None  # type: List[Type]
     # should this type be wrapped in an Optional?
@@ -217,9 +262,11 @@ class UnboundType(Type):
                            [Type.deserialize(a) for a in data['args']])
 
 
-class ErrorType(Type):
+class ErrorType(Type, metaclass=SharedInstanceMeta):
     """The error type is used as the result of failed type operations."""
 
+    __slots__ = ()
+
     def accept(self, visitor: 'TypeVisitor[T]') -> T:
         return visitor.visit_error_type(self)
 
@@ -232,6 +279,8 @@ class TypeList(Type):
     but a syntactic AST construct.
     """
 
+    __slots__ = ('items',)
+
     items = None  # type: List[Type]
 
     def __init__(self, items: List[Type], line: int = -1, column: int = -1) -> None:
@@ -252,9 +301,11 @@ class TypeList(Type):
         return TypeList([Type.deserialize(t) for t in data['items']])
 
 
-class AnyType(Type):
+class AnyType(Type, metaclass=SharedInstanceMeta):
     """The type 'Any'."""
 
+    __slots__ = ('implicit',)
+
     def __init__(self, implicit: bool = False, line: int = -1, column: int = -1) -> None:
         super().__init__(line, column)
         self.implicit = implicit
@@ -271,13 +322,15 @@ class AnyType(Type):
         return AnyType()
 
 
-class Void(Type):
+class Void(Type, metaclass=SharedInstanceMeta):
     """The return type 'None'.
 
     This can only be used as the return type in a callable type and as
     the result type of calling such callable.
     """
 
+    __slots__ = ('source',)
+
     can_be_true = False
     source = ''   # May be None; function that generated this value
 
@@ -300,7 +353,7 @@ class Void(Type):
         return Void()
 
 
-class UninhabitedType(Type):
+class UninhabitedType(Type, metaclass=SharedInstanceMeta):
     """This type has no members.
 
     This type is almost the bottom type, except it is not a subtype of Void.
@@ -314,6 +367,8 @@ class UninhabitedType(Type):
         is_subtype(UninhabitedType, T) = True
     """
 
+    __slots__ = ()
+
     can_be_true = False
     can_be_false = False
 
@@ -332,7 +387,7 @@ class UninhabitedType(Type):
         return UninhabitedType()
 
 
-class NoneTyp(Type):
+class NoneTyp(Type, metaclass=SharedInstanceMeta):
     """The type of 'None'.
 
     Without strict Optional checking:
@@ -350,6 +405,8 @@ class NoneTyp(Type):
         of a function, where 'None' means Void.
     """
 
+    __slots__ = ('is_ret_type',)
+
     can_be_true = False
 
     def __init__(self, is_ret_type: bool = False, line: int = -1, column: int = -1) -> None:
@@ -370,13 +427,15 @@ class NoneTyp(Type):
         return NoneTyp(is_ret_type=data['is_ret_type'])
 
 
-class ErasedType(Type):
+class ErasedType(Type, metaclass=SharedInstanceMeta):
     """Placeholder for an erased type.
 
     This is used during type inference. This has the special property that
     it is ignored during type inference.
     """
 
+    __slots__ = ()
+
     def accept(self, visitor: 'TypeVisitor[T]') -> T:
         return visitor.visit_erased_type(self)
 
@@ -387,6 +446,8 @@ class DeletedType(Type):
     These can be used as lvalues but not rvalues.
     """
 
+    __slots__ = ('source',)
+
     source = ''   # May be None; name that generated this value
 
     def __init__(self, source: str = None, line: int = -1, column: int = -1) -> None:
@@ -412,6 +473,8 @@ class Instance(Type):
     The list of type variables may be empty.
     """
 
+    __slots__ = ('type', 'args', 'erased', 'type_ref')
+
     type = None  # type: mypy.nodes.TypeInfo
     args = None  # type: List[Type]
     erased = False      # True if result of type variable substitution
@@ -457,6 +520,8 @@ class TypeVarType(Type):
     type variable (id < 0).
     """
 
+    __slots__ = ('name', 'id', 'values', 'upper_bound', 'variance')
+
     name = ''  # Name of the type variable (for messages and debugging)
     id = None  # type: TypeVarId
     values = None  # type: List[Type]  # Value restriction, empty list if no restriction
@@ -505,6 +570,8 @@ class TypeVarType(Type):
 class FunctionLike(Type):
     """Abstract base class for function types."""
 
+    __slots__ = ('fallback',)
+
     can_be_false = False
 
     @abstractmethod
@@ -536,6 +603,10 @@ _dummy = object()  # type: Any
 class CallableType(FunctionLike):
     """Type of a non-overloaded callable object (function)."""
 
+    __slots__ = ('arg_types', 'arg_kinds', 'arg_names', 'min_args', 'is_var_arg', 'ret_type',
+                 'name', 'definition', 'variables', 'is_ellipsis_args', 'is_classmethod_class',
+                 'implicit', 'special_sig')
+
     arg_types = None  # type: List[Type]  # Types of function arguments
     arg_kinds = None  # type: List[int]   # mypy.nodes.ARG_ constants
     arg_names = None  # type: List[str]   # None if not a keyword argument
@@ -708,6 +779,8 @@ class Overloaded(FunctionLike):
     implementation.
     """
 
+    __slots__ = ('_items',)
+
     _items = None  # type: List[CallableType]  # Must not be empty
 
     def __init__(self, items: List[CallableType]) -> None:
@@ -762,6 +835,8 @@ class TupleType(Type):
         implicit: if True, derived from a tuple expression (t,....) instead of Tuple[t, ...]
     """
 
+    __slots__ = ('items', 'fallback', 'implicit')
+
     items = None  # type: List[Type]
     fallback = None  # type: Instance
     implicit = False
@@ -814,6 +889,8 @@ class StarType(Type):
     This is not a real type but a syntactic AST construct.
     """
 
+    __slots__ = ('type',)
+
     type = None  # type: Type
 
     def __init__(self, type: Type, line: int = -1, column: int = -1) -> None:
@@ -827,6 +904,8 @@ class StarType(Type):
 class UnionType(Type):
     """The union type Union[T1, ..., Tn] (at least one type argument)."""
 
+    __slots__ = ('items',)
+
     items = None  # type: List[Type]
 
     def __init__(self, items: List[Type], line: int = -1, column: int = -1) -> None:
@@ -862,12 +941,32 @@ class UnionType(Type):
             return AnyType()
 
         from mypy.subtypes import is_subtype
+        # An instance can only be a subtype of an instance of another class
+        # if that class is in its MRO (or is object), unless its class falls
+        # back to Any or has a promotion.  Index instances by the classes in
+        # their MROs, so that most pairs of items are never compared.  Other
+        # items may be subtypes of anything, so they are compared with all.
+        subclass_items = {}  # type: Dict[str, List[int]]
+        other_items = []  # type: List[int]
+        for j, tj in enumerate(items):
+            if (isinstance(tj, Instance) and not tj.type.fallback_to_any
+                    and not tj.type._promote):
+                for base in tj.type.mro or []:
+                    subclass_items.setdefault(base.fullname(), []).append(j)
+            else:
+                other_items.append(j)
+
         removed = set()  # type: Set[int]
         for i, ti in enumerate(items):
             if i in removed: continue
+            if isinstance(ti, Instance) and ti.type.fullname() != 'builtins.object':
+                candidates = subclass_items.get(ti.type.fullname(), []) + other_items
+            else:
+                candidates = range(len(items))
             # Keep track of the truishness info for deleted subtypes which can be relevant
             cbt = cbf = False
-            for j, tj in enumerate(items):
+            for j in candidates:
+                tj = items[j]
                 if i != j and is_subtype(tj, ti):
                     removed.add(j)
                     cbt = cbt or tj.can_be_true
@@ -923,6 +1022,8 @@ class PartialType(Type):
           x = 1  # Infer actual type int for x
     """
 
+    __slots__ = ('type', 'var', 'inner_types')
+
     # None for the 'None' partial type; otherwise a generic class
     type = None  # type: Optional[mypy.nodes.TypeInfo]
     var = None  # type: mypy.nodes.Var
@@ -948,6 +1049,8 @@ class EllipsisType(Type):
     A semantically analyzed type will never have ellipsis types.
     """
 
+    __slots__ = ()
+
     def accept(self, visitor: 'TypeVisitor[T]') -> T:
         return visitor.visit_ellipsis_type(self)
 
@@ -988,6 +1091,8 @@ class TypeType(Type):
     assumption).
     """
 
+    __slots__ = ('item',)
+
     # This can't be everything, but it can be a class reference,
     # a generic class instance, a union, Any, a type variable...
     item = None  # type: Type
@@ -1426,6 +1531,86 @@ class TypeQuery(TypeVisitor[bool]):
             return res
 
 
+# Property bits of types (see Type.properties()).  They describe the same
+# components of a type as TypeQuery does.
+HAS_TYPE_VARS = 1        # Has a TypeVarType component
+HAS_ERASED = 2           # Has an ErasedType component
+HAS_ERASED_INSTANCE = 4  # Has an Instance component with the erased flag set
+HAS_UNION = 8            # Has a UnionType component
+HAS_ANY = 16             # Has an AnyType component
+HAS_PARTIAL = 32         # Has a PartialType component
+
+
+class TypePropertiesVisitor(TypeVisitor[int]):
+    """Compute the property bits of a type from those of its components."""
+
+    def visit_unbound_type(self, t: UnboundType) -> int:
+        return 0
+
+    def visit_type_list(self, t: TypeList) -> int:
+        return 0
+
+    def visit_error_type(self, t: ErrorType) -> int:
+        return 0
+
+    def visit_any(self, t: AnyType) -> int:
+        return HAS_ANY
+
+    def visit_void(self, t: Void) -> int:
+        return 0
+
+    def visit_none_type(self, t: NoneTyp) -> int:
+        return 0
+
+    def visit_uninhabited_type(self, t: UninhabitedType) -> int:
+        return 0
+
+    def visit_erased_type(self, t: ErasedType) -> int:
+        return HAS_ERASED
+
+    def visit_deleted_type(self, t: DeletedType) -> int:
+        return 0
+
+    def visit_type_var(self, t: TypeVarType) -> int:
+        return HAS_TYPE_VARS
+
+    def visit_partial_type(self, t: PartialType) -> int:
+        return HAS_PARTIAL
+
+    def visit_instance(self, t: Instance) -> int:
+        return (HAS_ERASED_INSTANCE if t.erased else 0) | self.combine(t.args)
+
+    def visit_callable_type(self, t: CallableType) -> int:
+        return self.combine(t.arg_types) | t.ret_type.properties()
+
+    def visit_overloaded(self, t: Overloaded) -> int:
+        return self.combine(t.items())
+
+    def visit_tuple_type(self, t: TupleType) -> int:
+        return self.combine(t.items)
+
+    def visit_star_type(self, t: StarType) -> int:
+        return t.type.properties()
+
+    def visit_union_type(self, t: UnionType) -> int:
+        return HAS_UNION | self.combine(t.items)
+
+    def visit_ellipsis_type(self, t: EllipsisType) -> int:
+        return 0
+
+    def visit_type_type(self, t: TypeType) -> int:
+        return t.item.properties()
+
+    def combine(self, types: Sequence[Type]) -> int:
+        result = 0
+        for t in types:
+            result |= t.properties()
+        return result
+
+
+type_properties_visitor = TypePropertiesVisitor()
+
+
 def strip_type(typ: Type) -> Type:
     """Make a copy of type without 'debugging info' (function name)."""
 
@@ -1504,6 +1689,7 @@ def true_or_false(t: Type) -> Type:
     Unrestricted version of t with both True-ish and False-ish values
     """
     new_t = copy_type(t)
-    new_t.can_be_true = type(new_t).can_be_true
-    new_t.can_be_false = type(new_t).can_be_false
+    # The class-level values are stored as slot defaults (see SlotDefaultsMeta).
+    new_t.can_be_true = type(new_t).slot_defaults['can_be_true']
+    new_t.can_be_false = type(new_t).slot_defaults['can_be_false']
     return new_t
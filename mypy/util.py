@@ -3,7 +3,7 @@
 import re
 import subprocess
 from xml.sax.saxutils import escape
-from typing import TypeVar, List, Tuple, Optional, Sequence
+from typing import TypeVar, List, Tuple, Optional, Sequence, Dict, Any, Callable
 
 
 T = TypeVar('T')
@@ -26,6 +26,71 @@ def split_module_names(mod_name: str) -> List[str]:
     return out
 
 
+class SlotDefaultsMeta(type):
+    """Metaclass that allows class-level defaults for attributes stored in slots.
+
+    Python doesn't allow a class attribute with the same name as a slot,
+    and a class attribute in a subclass would hide the slot of a base class.
+    This metaclass collects class attributes that name a slot (defined in
+    the class or in a base class) into the dictionary 'slot_defaults', which
+    also includes the defaults of the base classes, and assigns them to each
+    new instance before calling __init__.  This way the defaults keep
+    working as if they were ordinary class attributes.
+
+    All nodes and types are created through this, so the assignments are
+    done by a function generated for each class, which is much faster than
+    calling setattr() in a loop.
+    """
+
+    def __new__(mcs, name: str, bases: Tuple[type, ...], namespace: Dict[str, Any]) -> type:
+        slots = set(namespace.get('__slots__', ()))
+        for base in bases:
+            for cls in base.__mro__:
+                slots.update(cls.__dict__.get('__slots__', ()))
+        defaults = {}  # type: Dict[str, Any]
+        # Defaults in earlier base classes take precedence.
+        for base in reversed(bases):
+            defaults.update(getattr(base, 'slot_defaults', {}))
+        for attr in list(namespace):
+            if attr in slots:
+                defaults[attr] = namespace.pop(attr)
+        namespace['slot_defaults'] = defaults
+        namespace['init_slot_defaults'] = make_defaults_initializer(defaults)
+        return super().__new__(mcs, name, bases, namespace)
+
+    def __call__(cls, *args: Any, **kwargs: Any) -> Any:
+        obj = cls.__new__(cls)
+        cls.init_slot_defaults(obj)  # type: ignore
+        obj.__init__(*args, **kwargs)
+        return obj
+
+
+def make_defaults_initializer(defaults: Dict[str, Any]) -> Callable[[Any], None]:
+    """Return a function that assigns default values to attributes of an object."""
+    lines = ['def init(obj):', '    pass']
+    values = {}  # type: Dict[str, Any]
+    for i, (attr, value) in enumerate(defaults.items()):
+        values['v{}'.format(i)] = value
+        lines.append('    obj.{} = v{}'.format(attr, i))
+    exec('\n'.join(lines), values)
+    return values['init']
+
+
+def replace_object_state(new: object, old: object) -> None:
+    """Make new have the same attribute values as old.
+
+    This works for objects with slots as well as objects with a __dict__.
+    """
+    for cls in type(old).__mro__:
+        for attr in cls.__dict__.get('__slots__', ()):
+            if hasattr(old, attr):
+                setattr(new, attr, getattr(old, attr))
+            elif hasattr(new, attr):
+                delattr(new, attr)
+    if hasattr(old, '__dict__'):
+        new.__dict__ = old.__dict__
+
+
 def short_type(obj: object) -> str:
     """Return the last component of the type name of an object.
 